@@ -0,0 +1,24 @@
+"""
+Django settings for issue_tracker project.
+
+The settings profile is selected by the ``DJANGO_ENV`` environment variable:
+
+* ``dev`` (default) - local development with debug tooling,
+* ``test`` - test runs, selected automatically by ``manage.py test``,
+* ``prod`` - production deployment without any debug tooling.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENT = os.environ.get("DJANGO_ENV", "dev")
+
+if ENVIRONMENT == "prod":
+    from .prod import *  # noqa: F401,F403
+elif ENVIRONMENT == "test":
+    from .test import *  # noqa: F401,F403
+elif ENVIRONMENT == "dev":
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured("Unknown DJANGO_ENV %r, use one of: dev, test, prod." % ENVIRONMENT)
@@ -1,5 +1,5 @@
 """
-Django settings for issue_tracker project.
+Django settings for issue_tracker project shared by all profiles.
 
 Generated by 'django-admin startproject' using Django 2.0.
 
@@ -15,7 +15,7 @@ import os
 import dj_database_url
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.0/howto/deployment/checklist/
@@ -24,7 +24,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = 'wc07-(2=ft9vhef-$qv30x8ac2cy3@l#ovi_z8y8&4c9$7)qao'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = []
 
@@ -37,7 +37,6 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'tracker.apps.TrackerConfig',
     'mathfilters',
     'widget_tweaks',
@@ -49,7 +48,6 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -100,6 +98,46 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = [
+    'tracker.backends.CachedModelBackend',
+]
+
+# Seconds for which the permissions of a user are shared between requests.
+TRACKER_PERMISSION_CACHE_TIMEOUT = 3600
+
+# Seconds for which the logged in user is shared between requests, 0 disables the cache.
+TRACKER_USER_CACHE_TIMEOUT = 300
+
+# Publish/subscribe of issue changes streamed to the live pages, see tracker.events.
+TRACKER_EVENT_BUS = 'tracker.events.LocalEventBus'
+
+# Users get at most one notification e-mail per this many seconds.
+TRACKER_NOTIFICATION_WINDOW = 900
+
+# Used for links in e-mails.
+TRACKER_BASE_URL = os.environ.get("TRACKER_BASE_URL", "http://127.0.0.1:8080")
+
+# Done and canceled issues not modified for this many days are moved to the archive.
+TRACKER_ARCHIVE_AFTER = 90
+
+# Open issues with at least this estimated share of common text are offered as duplicates of a new issue.
+TRACKER_SIMILARITY_THRESHOLD = 0.5
+
+# Seconds the counts of saved filters are cached, which bounds staleness after changes bypassing the signals.
+TRACKER_SAVED_FILTER_TIMEOUT = 3600
+
+# Storage of attachment files, keep FILE_UPLOAD_TEMP_DIR on the same file system, so uploads are moved, not copied.
+TRACKER_ATTACHMENT_STORAGE = 'django.core.files.storage.FileSystemStorage'
+TRACKER_ATTACHMENT_STORAGE_OPTIONS = {
+    'location': os.environ.get("ATTACHMENT_ROOT", os.path.join(BASE_DIR, 'attachments')),
+}
+
+# Maximum size of one attachment in bytes for categories without their own limit.
+TRACKER_ATTACHMENT_MAX_SIZE = 10 * 1024 * 1024
+
+# Read sessions from the cache and write them through to the database.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.0/topics/i18n/
 
@@ -118,4 +156,7 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Use third party assets downloaded by `manage.py vendor_static` instead of CDNs.
+TRACKER_VENDOR_STATIC = False
+
 LOGIN_REDIRECT_URL = "/"
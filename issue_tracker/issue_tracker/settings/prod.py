@@ -0,0 +1,71 @@
+"""
+Production settings for issue_tracker project.
+
+Configuration is read from the environment:
+
+* ``SECRET_KEY`` - required,
+* ``ALLOWED_HOSTS`` - comma separated list of host names,
+* ``DATABASE_URL`` - see dj-database-url,
+* ``CACHE_BACKEND`` and ``CACHE_LOCATION`` - cache shared by all workers,
+* ``STATIC_ROOT`` - target directory for ``collectstatic``,
+* ``TRACKER_VENDOR_STATIC`` - set to ``1`` to use assets downloaded by ``vendor_static`` instead of CDNs.
+"""
+
+import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, DATABASES, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ["SECRET_KEY"]
+except KeyError:
+    raise ImproperlyConfigured("The SECRET_KEY environment variable is required in production.")
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get("ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+# Keep database connections open between requests.
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get("CONN_MAX_AGE", 60))
+
+# The tracker shares permissions and other data between workers through the cache,
+# so it has to be one cache for all of them instead of the per process default.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("CACHE_BACKEND", 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get("CACHE_LOCATION", '/var/tmp/issue_tracker_cache'),
+    }
+}
+
+# Fan out issue events to the workers of all processes through Postgres LISTEN/NOTIFY.
+if DATABASES['default']['ENGINE'].startswith('django.db.backends.postgresql'):
+    TRACKER_EVENT_BUS = 'tracker.events.PostgresEventBus'
+
+    # Waiting for the notifications blocks the whole process unless psycopg2 yields to gevent.
+    if "gevent.monkey" in sys.modules and sys.modules["gevent.monkey"].is_module_patched("socket"):
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            raise ImproperlyConfigured("psycogreen is required to run on gevent workers with Postgres.")
+        patch_psycopg()
+
+# Compile every template only once per worker.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+STATIC_ROOT = os.environ.get("STATIC_ROOT", os.path.join(BASE_DIR, 'static'))
+
+# Fingerprint and precompress static files on collectstatic and serve them from the workers.
+STATICFILES_STORAGE = 'tracker.storage.CompressedManifestStaticFilesStorage'
+
+MIDDLEWARE = MIDDLEWARE[:1] + ['tracker.middleware.StaticFilesMiddleware'] + MIDDLEWARE[1:]
+
+TRACKER_VENDOR_STATIC = os.environ.get("TRACKER_VENDOR_STATIC") == "1"
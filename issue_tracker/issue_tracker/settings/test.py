@@ -0,0 +1,13 @@
+"""
+Test settings for issue_tracker project.
+
+Keeps the test runs free of debug tooling and uses a fast password hasher.
+"""
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = False
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
@@ -22,7 +22,7 @@ urlpatterns = [
     path('', include("tracker.urls"))
 ]
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns = [
@@ -4,6 +4,8 @@ import sys
 
 if __name__ == "__main__":
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "issue_tracker.settings")
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        os.environ.setdefault("DJANGO_ENV", "test")
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
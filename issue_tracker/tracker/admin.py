@@ -1,19 +1,111 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
 
 # Register your models here.
-from .models import Issue, IssueCategory
+from .backends import get_user_cache_key
+from .models import ArchivedIssue, Issue, IssueCategory, Label, SavedFilter, SLAPolicy, Task
+from .tasks import purge_deactivated_user
+from .tools import EstimatedCountPaginator
 
-admin.site.register(IssueCategory)
+
+class SLAPolicyInline(admin.StackedInline):
+    model = SLAPolicy
+
+
+@admin.register(IssueCategory)
+class IssueCategoryAdmin(admin.ModelAdmin):
+    list_display = ("name", "attachment_usage", "attachment_quota")
+    search_fields = ("name",)
+    autocomplete_fields = ("solvers",)
+    readonly_fields = ("attachment_usage",)
+    inlines = [SLAPolicyInline]
+
+
+@admin.register(Label)
+class LabelAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(SavedFilter)
+class SavedFilterAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "query")
+    list_select_related = ("user",)
+    readonly_fields = ("query",)
 
 
 @admin.register(Issue)
 class IssueAdmin(admin.ModelAdmin):
     list_display = ("name", "created_by", "solver", "category", "state")
-    fields = ("name", "created_by", "solver", "category", "state", "description")
+    list_select_related = ("created_by", "solver", "category")
+    list_filter = ("state", "category")
+    fields = ("name", "created_by", "solver", "category", "state", "labels", "description")
     readonly_fields = ('created_by',)
+    autocomplete_fields = ("solver", "category", "labels")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["mark_done", "mark_canceled", "assign_to_me"]
+
+    def mark_done(self, request, queryset):
+        count = queryset.mark_done()
+        self.message_user(request, ngettext("%d issue was marked as done.", "%d issues were marked as done.",
+                                            count) % count)
+    mark_done.short_description = _("Mark selected issues as done")
+
+    def mark_canceled(self, request, queryset):
+        count = queryset.mark_canceled()
+        self.message_user(request, ngettext("%d issue was canceled.", "%d issues were canceled.", count) % count)
+    mark_canceled.short_description = _("Cancel selected issues")
+
+    def assign_to_me(self, request, queryset):
+        count = queryset.assign(request.user)
+        self.message_user(request, ngettext("%d issue was assigned to you.", "%d issues were assigned to you.",
+                                            count) % count)
+    assign_to_me.short_description = _("Assign selected issues to me")
 
     def save_model(self, request, obj, form, change):
         """When new objects is created save it's author."""
         if obj.pk is None:
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "state", "attempts", "run_at", "created_at")
+    list_filter = ("state", "name")
+    readonly_fields = ("name", "arguments", "attempts", "locked_by", "locked_until", "last_error", "created_at")
+
+
+@admin.register(ArchivedIssue)
+class ArchivedIssueAdmin(admin.ModelAdmin):
+    list_display = ("name", "created_by", "solver", "category", "state", "archived_at")
+    list_filter = ("state",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return obj is None and super().has_change_permission(request, obj)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class TrackerUserAdmin(UserAdmin):
+    actions = ["purge_users"]
+
+    def purge_users(self, request, queryset):
+        """Deactivate the users right away and delete them with their issues in the background."""
+        users = list(queryset.exclude(pk=request.user.pk).values_list("pk", flat=True))
+        User.objects.filter(pk__in=users).update(is_active=False)
+        cache.delete_many([get_user_cache_key(pk) for pk in users])
+        for pk in users:
+            purge_deactivated_user.enqueue(pk)
+        self.message_user(request, ngettext("%d user will be deleted.", "%d users will be deleted.", len(users))
+                          % len(users))
+    purge_users.short_description = _("Deactivate and delete selected users in the background")
@@ -0,0 +1,114 @@
+"""Archival of closed issues.
+
+Done and canceled issues are never edited again, so once they are older than
+`TRACKER_ARCHIVE_AFTER` days they are moved to `ArchivedIssue` in small transactions together
+with their attachments, labels and dependencies. Issues with notifications waiting for a digest
+are archived once the digest is sent.
+Statistics of the archived issues are kept in `ArchiveTotals`, so they are never scanned.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from .models import (
+    ISSUE_CANCELED, ISSUE_DONE, ArchivedIssue, ArchivedIssueDependency, ArchivedIssueLabel,
+    ArchiveTotals, Attachment, Issue, IssueDependency, Notification)
+from .partitions import ensure_partitions
+
+ARCHIVED_STATES = (ISSUE_DONE, ISSUE_CANCELED)
+
+
+def get_cutoff(now: Optional[datetime] = None) -> datetime:
+    return (now or timezone.now()) - timedelta(days=getattr(settings, "TRACKER_ARCHIVE_AFTER", 90))
+
+
+def archive_batch(cutoff: datetime, batch_size: int = 500) -> int:
+    """Move one batch of closed issues older than cutoff to the archive, return number of the issues."""
+    with transaction.atomic():
+        pending = Notification.objects.filter(sent_at__isnull=True).values("issue_id")
+        issues = list(Issue.objects.select_for_update().filter(
+            state__in=ARCHIVED_STATES, updated_at__lt=cutoff).exclude(pk__in=pending).order_by("pk")[:batch_size])
+        if not issues:
+            return 0
+        ArchivedIssue.objects.bulk_create([ArchivedIssue.from_issue(issue) for issue in issues])
+
+        by_state = defaultdict(list)
+        for issue in issues:
+            by_state[issue.state].append(issue)
+        for state, state_issues in by_state.items():
+            ArchiveTotals.objects.get_or_create(state=state)
+            totals = ArchiveTotals.objects.select_for_update().get(state=state)
+            totals.add(state_issues)
+            totals.save()
+
+        archive_relations([issue.pk for issue in issues])
+        # the receivers get the marked instances, so the live pages aren't told the issues were deleted
+        for issue in issues:
+            issue.archived = True
+        collector = Collector(using=Issue.objects.db)
+        collector.collect(issues)
+        collector.delete()
+    return len(issues)
+
+
+def archive_relations(pks: List[int]):
+    """Keep attachments, labels and dependencies of the issues being archived.
+
+    Attachments are moved to the archived issues, so their URLs keep working and their size stays
+    charged to the category. Labels and dependencies are copied.
+    """
+    Attachment.objects.filter(issue_id__in=pks).update(archived_issue_id=F("issue_id"), issue=None)
+    ArchivedIssueLabel.objects.bulk_create([
+        ArchivedIssueLabel(issue_id=issue_id, label_id=label_id) for issue_id, label_id in
+        Issue.labels.through.objects.filter(issue_id__in=pks).values_list("issue_id", "label_id")])
+    archived = set(pks)
+    ArchivedIssueDependency.objects.bulk_create([
+        ArchivedIssueDependency(issue_id=issue_id, blocker_id=dependency.blocker_id,
+                                blocked_id=dependency.blocked_id, created_at=dependency.created_at)
+        for dependency in IssueDependency.objects.filter(Q(blocker_id__in=pks) | Q(blocked_id__in=pks))
+        for issue_id in {dependency.blocker_id, dependency.blocked_id} & archived])
+
+
+def archive_issues(cutoff: Optional[datetime] = None, batch_size: int = 500) -> int:
+    """Move all closed issues older than cutoff to the archive, return number of the issues."""
+    cutoff = cutoff or get_cutoff()
+    ensure_partitions()
+    archived = 0
+    while True:
+        batch = archive_batch(cutoff, batch_size)
+        if not batch:
+            return archived
+        archived += batch
+
+
+def completion_stats() -> Dict[str, Any]:
+    """Return average, minimal and maximal completion time of active and archived issues.
+
+    `breached` is the number of issues which missed an SLA deadline, `overdue` the number of open
+    issues past their escalated deadline.
+    """
+    active = Issue.objects.aggregate(
+        count=Count("completed_in"), total=Sum("completed_in"), min=Min("completed_in"), max=Max("completed_in"),
+        breached=Count("pk", filter=Q(sla_breached=True)),
+        overdue=Count("pk", filter=Q(sla_escalated_at__isnull=False, due_at__isnull=False)))
+    archived = ArchiveTotals.objects.aggregate(
+        count=Sum("completed_count"), total=Sum("completed_total"), min=Min("completed_min"),
+        max=Max("completed_max"), breached=Sum("breached_count"))
+
+    sla = {"breached": active["breached"] + (archived["breached"] or 0), "overdue": active["overdue"]}
+    count = active["count"] + (archived["count"] or 0)
+    if not count:
+        return dict(sla, avg=None, min=None, max=None)
+    total = (active["total"] or timedelta()) + (archived["total"] or timedelta())
+    return {
+        **sla,
+        "avg": total / count,
+        "min": min(value for value in (active["min"], archived["min"]) if value is not None),
+        "max": max(value for value in (active["max"], archived["max"]) if value is not None),
+    }
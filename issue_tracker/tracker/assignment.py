@@ -0,0 +1,114 @@
+"""Assignment of new issues to the least busy solver of their category.
+
+Every solver has a `SolverWorkload` row counting their assigned issues. The counters are
+updated incrementally by the receivers of issue changes, so an assignment never counts issues.
+Workloads of the candidates are locked while the solver is picked, so concurrent assignments
+wait for each other instead of picking the same solver.
+"""
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from .models import ISSUE_ASSIGNED, ISSUE_CREATED, Issue, IssueCategory, SolverWorkload
+
+
+def workload_delta(issue: Issue, changes: Dict[str, Tuple[Any, Any]]) -> Counter:
+    """Return changes of the open issues counters caused by the change of the issue."""
+    old_solver, _ = changes.get("solver_id", (issue.solver_id, None))
+    old_state, _ = changes.get("state", (issue.state, None))
+    delta = Counter()
+    if old_solver is not None and old_state == ISSUE_ASSIGNED:
+        delta[old_solver] -= 1
+    if issue.solver_id is not None and issue.state == ISSUE_ASSIGNED:
+        delta[issue.solver_id] += 1
+    return delta
+
+
+def ensure_workloads(user_ids: Iterable[int]):
+    """Create missing workloads of the users with their current number of open issues."""
+    user_ids = set(user_ids)
+    missing = user_ids - set(SolverWorkload.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+    if not missing:
+        return
+    counts = dict(Issue.objects.filter(solver_id__in=missing, state=ISSUE_ASSIGNED).values_list(
+        "solver_id").annotate(Count("pk")).order_by())
+    SolverWorkload.objects.bulk_create(
+        [SolverWorkload(user_id=user_id, open_issues=counts.get(user_id, 0)) for user_id in missing])
+
+
+def update_workloads(delta: Counter):
+    """Apply changes of the counters, only the users having a workload are counted."""
+    for user_id, change in sorted(delta.items()):
+        if change:
+            SolverWorkload.objects.filter(user_id=user_id).update(open_issues=F("open_issues") + change)
+
+
+def recount_workloads() -> int:
+    """Fix the counters by counting the open issues, return number of the fixed workloads."""
+    fixed = 0
+    with transaction.atomic():
+        counts = dict(Issue.objects.filter(state=ISSUE_ASSIGNED, solver__isnull=False).values_list(
+            "solver_id").annotate(Count("pk")).order_by())
+        for workload in SolverWorkload.objects.select_for_update():
+            if workload.open_issues != counts.get(workload.user_id, 0):
+                workload.open_issues = counts.get(workload.user_id, 0)
+                workload.save(update_fields=["open_issues"])
+                fixed += 1
+    return fixed
+
+
+def lock_workloads(**filters) -> Dict[int, int]:
+    """Lock workloads of active users matching the filters, return their counters by user."""
+    of = ("self",) if connection.features.has_select_for_update_of else ()
+    return dict(SolverWorkload.objects.select_for_update(of=of).filter(user__is_active=True, **filters).order_by(
+        "user_id").values_list("user_id", "open_issues"))
+
+
+def auto_assign(issue: Issue) -> Optional[User]:
+    """Assign new issue to the solver of its category with the least open issues, return the solver."""
+    if issue.state != ISSUE_CREATED or issue.solver_id is not None or issue.category_id is None:
+        return None
+    with transaction.atomic():
+        workloads = lock_workloads(user__solver_categories=issue.category_id)
+        if not workloads:
+            return None
+        issue.solver = User.objects.get(pk=min(workloads, key=lambda user_id: (workloads[user_id], user_id)))
+        issue.save()
+    return issue.solver
+
+
+def assign_backlog(batch_size: int = 1000) -> int:
+    """Assign all new issues without solver in batches, return number of the assigned issues."""
+    assigned, last_pk = 0, 0
+    solvers = IssueCategory.solvers.through.objects
+    while True:
+        with transaction.atomic():
+            issues = list(Issue.objects.filter(
+                pk__gt=last_pk, state=ISSUE_CREATED, solver__isnull=True, category__isnull=False).order_by(
+                "pk").values_list("pk", "category_id")[:batch_size])
+            if not issues:
+                return assigned
+            last_pk = issues[-1][0]
+
+            eligible = defaultdict(list)
+            for category_id, user_id in solvers.filter(
+                    issuecategory_id__in={category_id for _, category_id in issues}).values_list(
+                    "issuecategory_id", "user_id"):
+                eligible[category_id].append(user_id)
+            workloads = lock_workloads(user_id__in={user_id for users in eligible.values() for user_id in users})
+
+            chosen = defaultdict(list)
+            for pk, category_id in issues:
+                candidates = [user_id for user_id in eligible[category_id] if user_id in workloads]
+                if candidates:
+                    user_id = min(candidates, key=lambda candidate: (workloads[candidate], candidate))
+                    workloads[user_id] += 1
+                    chosen[user_id].append(pk)
+
+            users = User.objects.in_bulk(list(chosen))
+            for user_id, pks in chosen.items():
+                assigned += Issue.objects.filter(pk__in=pks, state=ISSUE_CREATED, solver__isnull=True).assign(
+                    users[user_id])
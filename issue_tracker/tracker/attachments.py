@@ -0,0 +1,210 @@
+"""File attachments of issues.
+
+Uploads are streamed by `HashingUploadHandler` into a temporary file while their SHA-256 is
+computed, so no file is held in memory. Every content is stored once as `AttachmentBlob` in the
+storage configured by `TRACKER_ATTACHMENT_STORAGE`, attachments with the same content share it.
+Sizes of attachments are charged to the category of the issue, which can limit the size of one
+attachment and their total size.
+
+Downloads answer conditional and range requests. Files are passed to the WSGI server as file
+objects, so servers supporting `wsgi.file_wrapper` can send them with sendfile.
+"""
+import hashlib
+import mimetypes
+import re
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.storage import Storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext as _
+
+from .models import Attachment, AttachmentBlob, Issue, IssueCategory
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def get_storage() -> Storage:
+    """Return storage of the attachment files."""
+    storage_class = import_string(getattr(
+        settings, "TRACKER_ATTACHMENT_STORAGE", "django.core.files.storage.FileSystemStorage"))
+    return storage_class(**getattr(settings, "TRACKER_ATTACHMENT_STORAGE_OPTIONS", {}))
+
+
+def get_max_size(category: Optional[IssueCategory]) -> int:
+    """Return the maximum size of one attachment of issues in the category."""
+    if category is not None and category.attachment_max_size is not None:
+        return category.attachment_max_size
+    return getattr(settings, "TRACKER_ATTACHMENT_MAX_SIZE", 10 * 1024 * 1024)
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploaded files into temporary files and compute their SHA-256 on the way.
+
+    Files larger than max_size stop the upload and set `exceeded`.
+    """
+
+    def __init__(self, request=None, max_size: int = None):
+        super().__init__(request)
+        self.max_size = max_size
+        self.exceeded = False
+        self.sha256 = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.max_size is not None and start + len(raw_data) > self.max_size:
+            self.exceeded = True
+            raise StopUpload()
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
+
+
+def blob_name(sha256: str) -> str:
+    return "%s/%s/%s" % (sha256[:2], sha256[2:4], sha256)
+
+
+def get_blob(uploaded: UploadedFile) -> AttachmentBlob:
+    """Return locked blob with the content of the file, the file is stored only when the content is new."""
+    blob = AttachmentBlob.objects.select_for_update().filter(sha256=uploaded.sha256).first()
+    if blob is not None:
+        return blob
+    storage = get_storage()
+    name = storage.save(blob_name(uploaded.sha256), uploaded)
+    try:
+        with transaction.atomic():
+            return AttachmentBlob.objects.create(sha256=uploaded.sha256, size=uploaded.size, file_name=name)
+    except IntegrityError:
+        # stored by a concurrent upload in the meantime
+        storage.delete(name)
+        return AttachmentBlob.objects.select_for_update().get(sha256=uploaded.sha256)
+
+
+def store_attachment(issue: Issue, uploaded: UploadedFile, user: User) -> Attachment:
+    """Attach file uploaded through `HashingUploadHandler` to the issue.
+
+    Raise ValidationError when the file would exceed the attachment quota of the category.
+    """
+    with transaction.atomic():
+        if issue.category_id is not None:
+            category = IssueCategory.objects.select_for_update().get(pk=issue.category_id)
+            if category.attachment_quota is not None and \
+                    category.attachment_usage + uploaded.size > category.attachment_quota:
+                raise ValidationError(_("The attachment quota of category %s is exceeded.") % category)
+            IssueCategory.objects.filter(pk=category.pk).update(
+                attachment_usage=F("attachment_usage") + uploaded.size)
+        content_type = uploaded.content_type
+        if not content_type or content_type == "application/octet-stream":
+            content_type = mimetypes.guess_type(uploaded.name)[0] or "application/octet-stream"
+        attachment = Attachment.objects.create(
+            issue=issue, blob=get_blob(uploaded), category_id=issue.category_id, name=uploaded.name[:254],
+            content_type=content_type, size=uploaded.size, uploaded_by=user)
+        # the detail page lists the attachments
+        Issue.objects.filter(pk=issue.pk).update()
+    return attachment
+
+
+def delete_attachment(attachment: Attachment):
+    """Delete the attachment and its blob when no other attachment has the content."""
+    with transaction.atomic():
+        attachment.delete()
+        Issue.objects.filter(pk=attachment.issue_id).update()
+    delete_unused_blobs([attachment.blob_id])
+
+
+def release_usage(attachment: Attachment):
+    """Stop charging size of the deleted attachment to its category."""
+    if attachment.category_id is not None:
+        IssueCategory.objects.filter(pk=attachment.category_id).update(
+            attachment_usage=F("attachment_usage") - attachment.size)
+
+
+def delete_unused_blobs(pks: Optional[Iterable[int]] = None, batch_size: int = 1000) -> int:
+    """Delete blobs without attachments and their files, return number of the blobs.
+
+    Blobs are locked, so a concurrent upload either gets the blob before it is deleted or stores it again.
+    """
+    unused = AttachmentBlob.objects.exclude(pk__in=Attachment.objects.values("blob_id"))
+    if pks is not None:
+        unused = unused.filter(pk__in=list(pks))
+    storage, deleted = get_storage(), 0
+    while True:
+        with transaction.atomic():
+            blobs = list(unused.select_for_update().order_by("pk")[:batch_size])
+            if not blobs:
+                return deleted
+            AttachmentBlob.objects.filter(pk__in=[blob.pk for blob in blobs]).delete()
+            names = [blob.file_name for blob in blobs]
+            transaction.on_commit(lambda names=names: [storage.delete(name) for name in names])
+        deleted += len(blobs)
+
+
+def recount_usage() -> int:
+    """Fix the attachment usage of the categories, return number of the fixed categories.
+
+    Attachments purged with set based deletes aren't released one by one.
+    """
+    fixed = 0
+    with transaction.atomic():
+        usage = dict(Attachment.objects.filter(category__isnull=False).values_list("category_id").annotate(
+            Sum("size")).order_by())
+        for category in IssueCategory.objects.select_for_update():
+            if category.attachment_usage != usage.get(category.pk, 0):
+                IssueCategory.objects.filter(pk=category.pk).update(attachment_usage=usage.get(category.pk, 0))
+                fixed += 1
+    return fixed
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return first and last byte of a single byte range, None when the whole file should be sent.
+
+    Raise ValueError when the range can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0:
+            raise ValueError("Empty suffix range.")
+        return max(size - int(last), 0), size - 1
+    if last and int(last) < int(first):
+        return None
+    if int(first) >= size:
+        raise ValueError("Range starts after the end of the file.")
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+class FileRange(object):
+    """Part of a file, which keeps `fileno()` so WSGI servers can still send it with sendfile."""
+
+    def __init__(self, file, start: int, length: int):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
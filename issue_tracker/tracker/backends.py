@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .caching import get_version
+
+PERMISSION_CACHE_NAMESPACE = "permissions"
+# version of the user names shown on the issue pages
+USER_CACHE_NAMESPACE = "users"
+
+
+def get_user_cache_key(user_id) -> str:
+    """Return the cache key for the user loaded by `CachedModelBackend.get_user`."""
+    return "tracker:user:%s" % user_id
+
+
+def get_permission_cache_key(user_id) -> str:
+    """Return the cache key for the permissions of the user loaded by `CachedModelBackend`."""
+    return "tracker:perms:%d:%s" % (get_version(PERMISSION_CACHE_NAMESPACE), user_id)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend which shares loaded users and permissions between requests through the cache.
+
+    Permissions are still kept on the user object for the rest of the request, so all
+    `has_perm` calls in views and templates hit the cache at most once per request.
+    The caches are invalidated by `tracker.receivers` on any user, group or permission change, a
+    change of the user (e.g. of `is_superuser` or `is_active`) drops both the user and their permissions.
+    """
+
+    def get_user(self, user_id):
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, getattr(settings, "TRACKER_USER_CACHE_TIMEOUT", 300))
+        return user
+
+    def get_permission_cache_key(self, user_obj) -> str:
+        """Return the cache key for the permissions of the user."""
+        return get_permission_cache_key(user_obj.pk)
+
+    def get_all_permissions(self, user_obj, obj=None) -> set:
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = self.get_permission_cache_key(user_obj)
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj, obj)
+                cache.set(key, perms, getattr(settings, "TRACKER_PERMISSION_CACHE_TIMEOUT", 3600))
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
@@ -0,0 +1,303 @@
+"""Bitmap index of issue labels and states for label filters.
+
+Every label and every state has a bitmap with bit n set when the issue with primary key n has it.
+Bitmaps are split into chunks of 65536 issues, like containers of roaring bitmaps, held as Python
+integers whose &, | and ~ run over a whole chunk at once. Chunks without issues are left out, so
+labels of few issues take little memory. Every chunk is persisted in one `IssueBitmapChunk` row of
+at most 8 kB, a change of one issue rewrites one row. Receivers of issue changes keep the bitmaps
+up to date, `manage.py reconcile_counters` fixes them after changes bypassing the signals.
+
+Every process keeps the bitmaps in memory and reloads only the ones whose version changed, so a
+filter like `bug AND backend AND NOT wontfix` and the numbers of matching issues in every state
+need two small queries however many issues match.
+"""
+import re
+import threading
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from .models import ISSUE_STATE_CHOICES, Issue, IssueBitmap, IssueBitmapChunk, Label
+
+CHUNK_SHIFT = 16
+CHUNK_MASK = (1 << CHUNK_SHIFT) - 1
+
+TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+OPERATORS = ("AND", "OR", "NOT")
+
+# chunk number -> bits of the chunk
+Bitmap = Dict[int, int]
+
+
+def label_key(label_id: int) -> str:
+    return "label:%d" % label_id
+
+
+def state_key(state: str) -> str:
+    return "state:%s" % state
+
+
+def popcount(bitmap: Bitmap) -> int:
+    return sum(bin(bits).count("1") for bits in bitmap.values())
+
+
+def to_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def update_bitmaps(delta: Dict[str, Dict[int, bool]]):
+    """Set (True) or clear (False) bits of issues in the bitmaps with the keys."""
+    with transaction.atomic():
+        # always locked in the same order
+        for key in sorted(key for key, bits in delta.items() if bits):
+            bitmap, _created = IssueBitmap.objects.select_for_update().get_or_create(key=key)
+            by_chunk = defaultdict(dict)
+            for pk, value in delta[key].items():
+                by_chunk[pk >> CHUNK_SHIFT][pk & CHUNK_MASK] = value
+            chunks = {chunk.chunk: chunk for chunk in IssueBitmapChunk.objects.filter(
+                bitmap=bitmap, chunk__in=list(by_chunk))}
+            new_chunks = []
+            for number, offsets in by_chunk.items():
+                chunk = chunks.get(number)
+                bits = int.from_bytes(bytes(chunk.bits), "little") if chunk is not None else 0
+                for offset, is_set in offsets.items():
+                    bits = bits | (1 << offset) if is_set else bits & ~(1 << offset)
+                if chunk is None:
+                    if bits:
+                        new_chunks.append(IssueBitmapChunk(bitmap=bitmap, chunk=number, bits=to_bytes(bits)))
+                elif bits:
+                    IssueBitmapChunk.objects.filter(pk=chunk.pk).update(bits=to_bytes(bits))
+                else:
+                    chunk.delete()
+            IssueBitmapChunk.objects.bulk_create(new_chunks)
+            IssueBitmap.objects.filter(pk=bitmap.pk).update(version=uuid.uuid4())
+
+
+def build_chunks() -> Dict[str, Dict[int, bytes]]:
+    """Return chunks of all label and state bitmaps read from the issues."""
+    chunks = defaultdict(dict)
+    rows = [(state_key(state), pk) for pk, state in Issue.objects.values_list("pk", "state").order_by().iterator()]
+    rows.extend((label_key(label_id), pk) for pk, label_id in Issue.labels.through.objects.filter(
+        issue__deleted_at__isnull=True).values_list("issue_id", "label_id").order_by().iterator())
+    for key, pk in rows:
+        bits = chunks[key].setdefault(pk >> CHUNK_SHIFT, bytearray((CHUNK_MASK + 1) // 8))
+        bits[(pk & CHUNK_MASK) >> 3] |= 1 << (pk & 7)
+    return {key: {number: bytes(bits).rstrip(b"\0") for number, bits in value.items()}
+            for key, value in chunks.items()}
+
+
+def reconcile_bitmaps() -> int:
+    """Fix the stored bitmaps by reading the issues, return number of the fixed bitmaps."""
+    fixed = 0
+    with transaction.atomic():
+        expected = build_chunks()
+        stored = {bitmap.key: bitmap for bitmap in IssueBitmap.objects.select_for_update()}
+        current = defaultdict(dict)
+        for key, number, bits in IssueBitmapChunk.objects.values_list("bitmap__key", "chunk", "bits"):
+            current[key][number] = bytes(bits).rstrip(b"\0")
+        for key in set(expected) | set(stored):
+            if current.get(key, {}) == expected.get(key, {}):
+                continue
+            fixed += 1
+            bitmap = stored.get(key) or IssueBitmap.objects.create(key=key)
+            bitmap.chunks.all().delete()
+            IssueBitmapChunk.objects.bulk_create([IssueBitmapChunk(bitmap=bitmap, chunk=number, bits=bits)
+                                                  for number, bits in expected.get(key, {}).items()])
+            IssueBitmap.objects.filter(pk=bitmap.pk).update(version=uuid.uuid4())
+    return fixed
+
+
+def load_bitmaps(keys: Iterable[str]) -> Dict[str, Bitmap]:
+    """Read the bitmaps with the keys from the database."""
+    bitmaps = {key: {} for key in keys}
+    if bitmaps:
+        for key, number, bits in IssueBitmapChunk.objects.filter(bitmap__key__in=list(bitmaps)).values_list(
+                "bitmap__key", "chunk", "bits"):
+            bitmaps[key][number] = int.from_bytes(bytes(bits), "little")
+    return bitmaps
+
+
+class BitmapCache(object):
+    """Bitmaps loaded by this process, the ones changed since they were loaded are reloaded."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bitmaps = {}  # type: Dict[str, Tuple[uuid.UUID, Bitmap]]
+
+    def get(self) -> Dict[str, Bitmap]:
+        """Return current bitmaps by their keys."""
+        versions = dict(IssueBitmap.objects.values_list("key", "version"))
+        with self.lock:
+            stale = [key for key, version in versions.items() if self.bitmaps.get(key, (None,))[0] != version]
+            # bits loaded after the versions can only be newer, so at worst they're loaded again
+            for key, bitmap in load_bitmaps(stale).items():
+                self.bitmaps[key] = (versions[key], bitmap)
+            self.bitmaps = {key: value for key, value in self.bitmaps.items() if key in versions}
+            return {key: bitmap for key, (_version, bitmap) in self.bitmaps.items()}
+
+
+bitmap_cache = BitmapCache()
+
+
+def clear_issues(instances: Iterable[Issue]):
+    """Clear bits of the deleted issues in bitmaps of their states and labels."""
+    delta = defaultdict(dict)
+    for instance in instances:
+        delta[state_key(instance.state)][instance.pk] = False
+    for issue_id, label_id in Issue.labels.through.objects.filter(issue_id__in=[
+            pk for bits in delta.values() for pk in bits]).values_list("issue_id", "label_id"):
+        delta[label_key(label_id)][issue_id] = False
+    update_bitmaps(delta)
+
+
+def tokenize(expression: str) -> List[Tuple[str, Optional[str]]]:
+    """Return (kind, label name) of the tokens of the label filter."""
+    tokens, position = [], 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_RE.match(expression, position)
+        if match is None:
+            raise ValueError("Unterminated quote.")
+        opening, closing, quoted, word = match.groups()
+        if quoted is not None:
+            tokens.append(("label", quoted))
+        elif word is not None and word.upper() in OPERATORS:
+            tokens.append((word.upper(), None))
+        elif word is not None:
+            tokens.append(("label", word))
+        else:
+            tokens.append((opening or closing, None))
+        position = match.end()
+    return tokens
+
+
+def parse(expression: str) -> tuple:
+    """Parse label filter to a tree of tuples ("or", a, b), ("and", a, b), ("not", a) and ("label", name).
+
+    NOT binds tighter than AND and AND tighter than OR, raise ValueError for invalid expressions.
+    """
+    tokens = tokenize(expression)
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take(kind):
+        nonlocal position
+        if peek() != kind:
+            raise ValueError("Expected %s at token %d." % (kind, position + 1))
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "OR":
+            take("OR")
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == "AND":
+            take("AND")
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == "NOT":
+            take("NOT")
+            return "not", parse_not()
+        if peek() == "(":
+            take("(")
+            node = parse_or()
+            take(")")
+            return node
+        return take("label")
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise ValueError("Unexpected %s at token %d." % (tokens[position][0], position + 1))
+    return tree
+
+
+def evaluate(tree: tuple, get_label: Callable[[str], int], universe: int) -> int:
+    """Return bits of issues of one chunk matching the parsed filter, NOT is relative to the universe."""
+    operation = tree[0]
+    if operation == "label":
+        return get_label(tree[1])
+    if operation == "not":
+        return universe & ~evaluate(tree[1], get_label, universe)
+    first, second = evaluate(tree[1], get_label, universe), evaluate(tree[2], get_label, universe)
+    return first & second if operation == "and" else first | second
+
+
+def filter_by_labels(expression: str) -> Dict[str, Bitmap]:
+    """Return bitmaps of the issues matching the label filter by their states.
+
+    Unknown labels match no issue, raise ValueError for invalid expressions.
+    """
+    tree = parse(expression)
+    bitmaps = bitmap_cache.get()
+    labels = {name: bitmaps.get(label_key(pk), {}) for name, pk in Label.objects.values_list("name", "pk")}
+    states = {state: bitmaps.get(state_key(state), {}) for state, _label in ISSUE_STATE_CHOICES}
+    matched = {}
+    for number in {number for bitmap in states.values() for number in bitmap}:
+        universe = 0
+        for bitmap in states.values():
+            universe |= bitmap.get(number, 0)
+        matched[number] = evaluate(tree, lambda name: labels.get(name, {}).get(number, 0), universe)
+    return {state: {number: bits & matched[number] for number, bits in bitmap.items() if bits & matched[number]}
+            for state, bitmap in states.items()}
+
+
+def union(bitmaps: Iterable[Bitmap]) -> Bitmap:
+    """Return bitmap of issues in any of the bitmaps."""
+    result = defaultdict(int)
+    for bitmap in bitmaps:
+        for number, bits in bitmap.items():
+            result[number] |= bits
+    return dict(result)
+
+
+def select(bitmap: Bitmap, offset: int, limit: int) -> List[int]:
+    """Return primary keys of up to limit issues of the bitmap after skipping offset of them, in ascending order."""
+    pks = []
+    for number in sorted(bitmap):
+        if len(pks) >= limit:
+            break
+        count = bin(bitmap[number]).count("1")
+        if offset >= count:
+            offset -= count
+            continue
+        positions = [match.start() for match in re.finditer("1", bin(bitmap[number])[:1:-1])]
+        pks.extend((number << CHUNK_SHIFT) + position for position in positions[offset:offset + limit - len(pks)])
+        offset = 0
+    return pks
+
+
+class BitmapIssueList(object):
+    """Issues of a bitmap in ascending order of primary keys loaded page by page, for `Paginator`."""
+
+    def __init__(self, bitmap: Bitmap, queryset):
+        self.bitmap = bitmap
+        self.queryset = queryset
+        self.model = queryset.model
+        self._count = None
+
+    def count(self) -> int:
+        if self._count is None:
+            self._count = popcount(self.bitmap)
+        return self._count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step is not None:
+            raise TypeError("Only slices without step are supported.")
+        start, stop = item.start or 0, self.count() if item.stop is None else item.stop
+        pks = select(self.bitmap, start, max(stop - start, 0))
+        issues = self.queryset.in_bulk(pks)
+        return [issues[pk] for pk in pks if pk in issues]
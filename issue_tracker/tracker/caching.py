@@ -0,0 +1,31 @@
+"""Helpers for the caches shared between requests and workers."""
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(name: str) -> str:
+    return "tracker:version:%s" % name
+
+
+def get_version(name: str) -> int:
+    """Return the current version of a cache namespace.
+
+    Versions start at the current timestamp so a version evicted from the cache
+    never repeats a value which may still be used by stale cache entries.
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time()), None)
+        version = cache.get(key, int(time.time()))
+    return version
+
+
+def bump_version(name: str):
+    """Invalidate all cache entries stored under the current version of a namespace."""
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time()), None)
@@ -0,0 +1,15 @@
+from django.core.checks import Error, register
+
+from .vendor import missing_vendor_assets, use_vendor_static
+
+
+@register()
+def check_vendor_static(app_configs, **kwargs):
+    """Check that vendored assets are downloaded when they are used."""
+    if not use_vendor_static():
+        return []
+    missing = missing_vendor_assets()
+    if not missing:
+        return []
+    return [Error("TRACKER_VENDOR_STATIC is enabled but %d vendored assets are missing, e.g. %s." % (
+        len(missing), missing[0]), hint="Run manage.py vendor_static.", id="tracker.E001")]
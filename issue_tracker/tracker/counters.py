@@ -0,0 +1,90 @@
+"""Materialized numbers of active issues by state, category and solver.
+
+`IssueCounter` rows are changed by the receivers of every issue change in the transaction of
+the change, so the list page reads the numbers with one small query instead of grouping the
+issues. Changes bypassing the signals (e.g. `QuerySet.update()` of tracked fields) are fixed
+by `manage.py reconcile_counters`.
+"""
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import ISSUE_ASSIGNED, Issue, IssueCounter
+
+Key = Tuple[str, int, int]
+
+
+def issue_key(state: str, category_id: Optional[int], solver_id: Optional[int]) -> Key:
+    return state, category_id or 0, solver_id or 0
+
+
+def change_delta(issue: Issue, changes: Dict[str, Tuple[Any, Any]], created: bool = False) -> Counter:
+    """Return changes of the counters caused by the change of the issue."""
+    delta = Counter()
+    if not created:
+        delta[issue_key(*(changes.get(field, (getattr(issue, field), None))[0]
+                          for field in ("state", "category_id", "solver_id")))] -= 1
+    delta[issue_key(issue.state, issue.category_id, issue.solver_id)] += 1
+    return delta
+
+
+def delete_delta(issues: Iterable[Issue]) -> Counter:
+    return Counter({key: -count for key, count in Counter(
+        issue_key(issue.state, issue.category_id, issue.solver_id) for issue in issues).items()})
+
+
+def update_counters(delta: Counter):
+    """Apply changes of the counters."""
+    for (state, category, solver), change in sorted(delta.items()):
+        if not change:
+            continue
+        counters = IssueCounter.objects.filter(state=state, category=category, solver=solver)
+        if counters.update(count=F("count") + change):
+            continue
+        try:
+            with transaction.atomic():
+                IssueCounter.objects.create(state=state, category=category, solver=solver, count=change)
+        except IntegrityError:
+            # created by a concurrent transaction in the meantime
+            counters.update(count=F("count") + change)
+
+
+def move_counters(field: str, old: int, new: int = 0):
+    """Add counters of a deleted category or solver to the counters without it."""
+    delta = Counter()
+    for counter in IssueCounter.objects.filter(**{field: old}).exclude(count=0):
+        delta[(counter.state, counter.category, counter.solver)] -= counter.count
+        values = {"state": counter.state, "category": counter.category, "solver": counter.solver, field: new}
+        delta[(values["state"], values["category"], values["solver"])] += counter.count
+    update_counters(delta)
+    IssueCounter.objects.filter(**{field: old}, count=0).delete()
+
+
+def get_counts() -> Tuple[Dict[str, int], Dict[int, int]]:
+    """Return numbers of issues by state and numbers of assigned issues by solver."""
+    states, solvers = defaultdict(int), {}
+    for state, solver, count in IssueCounter.objects.values_list("state", "solver").annotate(
+            Sum("count")).order_by():
+        states[state] += count
+        if state == ISSUE_ASSIGNED and solver:
+            solvers[solver] = count
+    return dict(states), solvers
+
+
+def reconcile_counters() -> int:
+    """Recount the issues and fix the counters, return number of the fixed counters."""
+    with transaction.atomic():
+        actual = Counter({issue_key(state, category, solver): count for state, category, solver, count in
+                          Issue.objects.values_list("state", "category_id", "solver_id").annotate(
+                              Count("pk")).order_by()})
+        stored = Counter()
+        for state, category, solver, count in IssueCounter.objects.select_for_update().values_list(
+                "state", "category", "solver", "count"):
+            stored[(state, category, solver)] = count
+        delta = Counter({key: actual[key] - stored[key] for key in set(actual) | set(stored)
+                         if actual[key] != stored[key]})
+        update_counters(delta)
+        IssueCounter.objects.filter(count=0).delete()
+    return len(delta)
@@ -0,0 +1,118 @@
+"""Dependencies between issues.
+
+An issue is blocked while any of its blockers is open. Blockers of blockers and so on are read
+with recursive common table expressions (PostgreSQL and SQLite 3.8.3+), so the whole upstream
+and downstream set of an issue is one query however deep the chains are.
+"""
+from typing import Dict, List
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext as _
+
+from .caching import bump_version
+from .models import (
+    DEPENDENCY_CACHE_NAMESPACE, ISSUE_ASSIGNED, ISSUE_CANCELED, ISSUE_CREATED, ISSUE_DONE,
+    ArchivedIssue, Issue, IssueDependency)
+
+OPEN_STATES = (ISSUE_CREATED, ISSUE_ASSIGNED)
+CLOSED_STATES = (ISSUE_DONE, ISSUE_CANCELED)
+
+# Key of the advisory lock serializing changes of the graph on PostgreSQL.
+GRAPH_LOCK = 4711
+
+DEPENDENCY_TABLE = IssueDependency._meta.db_table
+ISSUE_TABLE = Issue._meta.db_table
+
+# Issues reachable from %s following the edges from `source` to `target` column.
+REACHABLE_CTE = """{name}(id) AS (
+    SELECT {target} FROM {dependency} WHERE {source} = %s
+    UNION
+    SELECT dependency.{target} FROM {dependency} dependency JOIN {name} ON dependency.{source} = {name}.id
+)"""
+
+GRAPH_SQL = """WITH RECURSIVE {upstream}, {downstream}
+SELECT issue.id, issue.name, issue.state, direction, EXISTS (
+    SELECT 1 FROM {dependency} dependency JOIN {issue} blocker ON blocker.id = dependency.blocker_id
+    WHERE dependency.blocked_id = issue.id AND blocker.state IN (%s, %s) AND blocker.deleted_at IS NULL
+) AS blocked
+FROM (SELECT id, 'upstream' AS direction FROM upstream UNION ALL SELECT id, 'downstream' FROM downstream) graph
+JOIN {issue} issue ON issue.id = graph.id
+WHERE issue.deleted_at IS NULL
+ORDER BY issue.id""".format(
+    upstream=REACHABLE_CTE.format(name="upstream", source="blocked_id", target="blocker_id",
+                                  dependency=DEPENDENCY_TABLE),
+    downstream=REACHABLE_CTE.format(name="downstream", source="blocker_id", target="blocked_id",
+                                    dependency=DEPENDENCY_TABLE),
+    dependency=DEPENDENCY_TABLE, issue=ISSUE_TABLE)
+
+REACHABLE_SQL = "WITH RECURSIVE {} SELECT 1 FROM downstream WHERE id = %s LIMIT 1".format(
+    REACHABLE_CTE.format(name="downstream", source="blocker_id", target="blocked_id", dependency=DEPENDENCY_TABLE))
+
+
+def get_graph(issue: Issue) -> Dict[str, List[Issue]]:
+    """Return all issues the issue waits for (upstream) and all issues waiting for it (downstream).
+
+    The issues have only id, name and state loaded and attribute `blocked` telling whether
+    any of their own blockers is open.
+    """
+    graph = {"upstream": [], "downstream": []}
+    for related in Issue.objects.raw(GRAPH_SQL, [issue.pk, issue.pk] + list(OPEN_STATES)):
+        related.blocked = bool(related.blocked)
+        graph[related.direction].append(related)
+    return graph
+
+
+def get_archived_graph(issue: ArchivedIssue) -> Dict[str, List]:
+    """Return the issues the archived issue directly waited for and the issues which waited for it.
+
+    The other issues are active or archived, the ones deleted in the meantime are left out.
+    """
+    dependencies = list(issue.dependencies.all())
+    pks = {pk for dependency in dependencies for pk in (dependency.blocker_id, dependency.blocked_id)} - {issue.pk}
+    issues = Issue.objects.only("pk", "name", "state").in_bulk(pks)
+    issues.update(ArchivedIssue.objects.only("pk", "name", "state").in_bulk(pks - set(issues)))
+    return {"upstream": [issues[dependency.blocker_id] for dependency in dependencies
+                         if dependency.blocked_id == issue.pk and dependency.blocker_id in issues],
+            "downstream": [issues[dependency.blocked_id] for dependency in dependencies
+                           if dependency.blocker_id == issue.pk and dependency.blocked_id in issues]}
+
+
+def blocks(blocker_id: int, blocked_id: int) -> bool:
+    """Return whether the blocker blocks the other issue directly or transitively."""
+    with connection.cursor() as cursor:
+        cursor.execute(REACHABLE_SQL, [blocker_id, blocked_id])
+        return cursor.fetchone() is not None
+
+
+def add_dependency(blocker: Issue, blocked: Issue) -> IssueDependency:
+    """Make the issue wait for the blocker, raise ValidationError when it would create a cycle."""
+    if blocker.pk == blocked.pk:
+        raise ValidationError(_("Issue can't block itself."))
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # concurrent additions could close a cycle none of them sees
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [GRAPH_LOCK])
+        if blocks(blocked.pk, blocker.pk):
+            raise ValidationError(_("Issue %(blocked)s already blocks %(blocker)s.") % {
+                "blocked": blocked, "blocker": blocker})
+        dependency, _created = IssueDependency.objects.get_or_create(blocker=blocker, blocked=blocked)
+    bump_version(DEPENDENCY_CACHE_NAMESPACE)
+    return dependency
+
+
+def remove_dependency(blocker: Issue, blocked: Issue) -> bool:
+    """Remove the dependency, return whether it existed."""
+    deleted, _rows = IssueDependency.objects.filter(blocker=blocker, blocked=blocked).delete()
+    bump_version(DEPENDENCY_CACHE_NAMESPACE)
+    return bool(deleted)
+
+
+def unblocked_by(issue: Issue) -> List[Issue]:
+    """Return open issues directly blocked by the closed issue which have no other open blocker."""
+    open_blockers = IssueDependency.objects.filter(
+        blocked=OuterRef("pk"), blocker__state__in=OPEN_STATES, blocker__deleted_at__isnull=True)
+    return list(Issue.objects.filter(blocked_by__blocker=issue, state__in=OPEN_STATES).annotate(
+        blocked=Exists(open_blockers)).filter(blocked=False).order_by("pk"))
@@ -0,0 +1,195 @@
+"""Publish/subscribe of issue change events for the server-sent events stream.
+
+`LocalEventBus` fans the events out to the subscribers in the current process. It is enough
+for a single process deployment and it is the stand-in for the multi-process fan-out in
+development and tests. `PostgresEventBus` sends the events through Postgres NOTIFY, so every
+process listening on the channel publishes them to its local subscribers.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[int, Dict[str, Any]]
+
+# longer values are left out of the events, Postgres limits size of the notifications
+MAX_VALUE_LENGTH = 254
+
+
+class Subscription(object):
+    """Queue of events for one subscriber."""
+
+    def __init__(self, bus: "LocalEventBus", maxsize: int):
+        self.bus = bus
+        self.queue = queue.Queue(maxsize)
+
+    def put(self, event: Event):
+        """Add event to the queue, slow subscribers lose the oldest events."""
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> Optional[Event]:
+        """Return next event or None when nothing happened within timeout."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop receiving events."""
+        self.bus.unsubscribe(self)
+
+
+class LocalEventBus(object):
+    """Fan out events to subscribers in this process.
+
+    Recent events are kept in history, so reconnecting clients can get the events they missed.
+    """
+
+    def __init__(self, history: int = 1000, queue_size: int = 100):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.history = deque(maxlen=history)
+        self.queue_size = queue_size
+        self.last_id = 0
+
+    def next_id(self) -> int:
+        """Return event id, ids are timestamps in microseconds so they are comparable between processes."""
+        self.last_id = max(self.last_id + 1, int(time.time() * 1000000))
+        return self.last_id
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Return new subscription, events newer than last_event_id are queued right away."""
+        subscription = Subscription(self, self.queue_size)
+        with self.lock:
+            self.subscriptions.add(subscription)
+            if last_event_id is not None:
+                for event in self.history:
+                    if event[0] > last_event_id:
+                        subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def deliver(self, event: Event):
+        """Put the event into queues of all subscribers in this process."""
+        with self.lock:
+            self.history.append(event)
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def publish(self, data: Dict[str, Any]):
+        """Publish event with data once the current transaction is committed."""
+        transaction.on_commit(lambda: self.deliver((self.next_id(), data)))
+
+
+class PostgresEventBus(LocalEventBus):
+    """Fan out events to subscribers in all processes through Postgres LISTEN/NOTIFY.
+
+    The notifications are sent after the transaction commits, so saves don't wait for them.
+    Every process starts a thread listening on the channel on the first subscription.
+    """
+
+    channel = "tracker_issue_events"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.listener = None
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name="tracker-events", daemon=True)
+                self.listener.start()
+        return super().subscribe(last_event_id)
+
+    def publish(self, data: Dict[str, Any]):
+        """Send the notification once the current transaction is committed, saves don't wait for it."""
+        transaction.on_commit(lambda: self.notify(data))
+
+    def notify(self, data: Dict[str, Any]):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, json.dumps([self.next_id(), data])])
+
+    def listen(self):
+        """Deliver notifications to the local subscribers, reconnect on errors."""
+        while True:
+            try:
+                db = connection.get_new_connection(connection.get_connection_params())
+                db.autocommit = True
+                with db.cursor() as cursor:
+                    cursor.execute("LISTEN %s" % self.channel)
+                while True:
+                    if select.select([db], [], [], 60) != ([], [], []):
+                        db.poll()
+                        for notify in self.pop_notifies(db):
+                            event_id, data = json.loads(notify.payload)
+                            self.deliver((event_id, data))
+            except Exception:
+                logger.exception("Listening for issue events failed.")
+                time.sleep(1)
+
+    @staticmethod
+    def pop_notifies(db) -> List:
+        notifies = list(db.notifies)
+        del db.notifies[:]
+        return notifies
+
+
+def _create_event_bus() -> LocalEventBus:
+    return import_string(getattr(settings, "TRACKER_EVENT_BUS", "tracker.events.LocalEventBus"))()
+
+
+event_bus = SimpleLazyObject(_create_event_bus)
+
+
+def format_event(event: Event, event_type: str = "issue") -> str:
+    """Format event for text/event-stream."""
+    return "id: %d\nevent: %s\ndata: %s\n\n" % (event[0], event_type, json.dumps(event[1]))
+
+
+def issue_event_data(issue, fields: Iterable[str], deleted: bool = False) -> Dict[str, Any]:
+    """Return compact event describing changed fields of the issue with their display values.
+
+    Values longer than `MAX_VALUE_LENGTH` are None, the pages showing them reload the issue.
+    """
+    data = {"id": issue.pk, "state": issue.state}
+    if deleted:
+        data["deleted"] = True
+        return data
+    values = {}
+    for field in fields:
+        if field == "state":
+            values["state"] = str(issue.get_state_display())
+        elif field == "solver_id":
+            values["solver"] = str(issue.solver or "")
+        elif field == "category_id":
+            values["category"] = str(issue.category or "")
+        elif field == "created_by_id":
+            values["created_by"] = str(issue.created_by)
+        else:
+            value = str(getattr(issue, field))
+            values[field] = value if len(value) <= MAX_VALUE_LENGTH else None
+    data["fields"] = values
+    return data
@@ -1,9 +1,39 @@
+from django import forms
 from django.forms import ModelForm
+from django.utils.translation import gettext_lazy as _
 
-from .models import Issue
+from .models import ISSUE_STATE_CHOICES, Issue, IssueCategory
+from .savedfilters import canonical_query
 
 
 class IssueEditForm(ModelForm):
     class Meta:
         model = Issue
         fields = ("name", "category", "description", "solver")
+
+
+class SavedFilterForm(forms.Form):
+    """Conditions of a saved filter, the solver is the user, anybody or nobody."""
+    SOLVER_ME = "me"
+    SOLVER_NONE = "none"
+
+    name = forms.CharField(label=_("Name"), max_length=64)
+    state = forms.MultipleChoiceField(label=_("State"), choices=ISSUE_STATE_CHOICES, required=False)
+    solver = forms.ChoiceField(label=_("Solver"), required=False, choices=(
+        ("", _("Anybody")), (SOLVER_ME, _("Me")), (SOLVER_NONE, _("Nobody"))))
+    category = forms.ModelChoiceField(label=_("Category"), queryset=IssueCategory.objects.all(), required=False)
+    created_days = forms.IntegerField(
+        label=_("Created in the last days"), min_value=1, required=False)
+
+    def get_query(self, user) -> str:
+        """Return canonical query of the valid form."""
+        conditions = {}
+        if self.cleaned_data["state"]:
+            conditions["state"] = self.cleaned_data["state"]
+        if self.cleaned_data["solver"]:
+            conditions["solver"] = user.pk if self.cleaned_data["solver"] == self.SOLVER_ME else None
+        if self.cleaned_data["category"] is not None:
+            conditions["category"] = self.cleaned_data["category"].pk
+        if self.cleaned_data["created_days"] is not None:
+            conditions["created_days"] = self.cleaned_data["created_days"]
+        return canonical_query(conditions)
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ...archive import archive_issues, get_cutoff
+
+
+class Command(BaseCommand):
+    help = "Move done and canceled issues which were not modified for a while to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            help="Archive issues not modified for this many days, TRACKER_ARCHIVE_AFTER by default.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Number of issues moved in one transaction.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size has to be at least 1.")
+        cutoff = get_cutoff() if options["days"] is None else timezone.now() - timedelta(days=options["days"])
+        archived = archive_issues(cutoff, options["batch_size"])
+        self.stdout.write("Archived %d issues." % archived)
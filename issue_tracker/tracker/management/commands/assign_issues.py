@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...assignment import assign_backlog, recount_workloads
+
+
+class Command(BaseCommand):
+    help = "Assign new issues without solver to the least busy solvers of their categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of issues assigned in one transaction.")
+        parser.add_argument("--recount", action="store_true", help="Recount open issues of the solvers first.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size has to be at least 1.")
+        if options["recount"]:
+            self.stdout.write("Fixed %d workloads." % recount_workloads())
+        self.stdout.write("Assigned %d issues." % assign_backlog(options["batch_size"]))
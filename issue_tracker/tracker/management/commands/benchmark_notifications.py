@@ -0,0 +1,32 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import NOTIFICATION_STATE, Issue, Notification
+from ...notifications import record_notifications
+
+
+class Command(BaseCommand):
+    help = "Measure ingestion rate of notifications, nothing is stored."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=10000, help="Number of notifications to record.")
+
+    def handle(self, *args, **options):
+        issue = Issue.objects.select_related("created_by").first()
+        if issue is None:
+            raise CommandError("At least one issue is needed.")
+        users = list(User.objects.values_list("pk", flat=True)[:100])
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            record_notifications(
+                Notification(recipient_id=users[i % len(users)], issue=issue, kind=NOTIFICATION_STATE,
+                             state=issue.state) for i in range(options["events"]))
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        self.stdout.write("Recorded %d notifications in %.3f s, %.0f events/s." % (
+            options["events"], elapsed, options["events"] / elapsed))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ...models import ArchivedIssue
+from ...partitions import (
+    add_months, ensure_partitions, get_partitions, is_partitioned, month_start, scanned_partitions)
+
+
+class Command(BaseCommand):
+    help = "Create monthly partitions of the issue archive in advance, PostgreSQL 11+ only."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=3, help="Number of future months to create.")
+        parser.add_argument("--explain", action="store_true",
+                            help="Show which partitions the queries of the views read.")
+
+    def handle(self, *args, **options):
+        if options["months"] < 0:
+            raise CommandError("--months can't be negative.")
+        if not is_partitioned():
+            self.stdout.write("The archive isn't partitioned, partitioning needs PostgreSQL 11 or newer.")
+            return
+
+        for name in ensure_partitions(options["months"]):
+            self.stdout.write("Created %s." % name)
+        if not options["explain"]:
+            return
+
+        total = len(get_partitions())
+        month = add_months(month_start(timezone.now()), -1)
+        queries = (
+            # DetailIssueView looks archived issues up by primary key only
+            ("Detail of an archived issue", ArchivedIssue.objects.filter(pk=0)),
+            ("Archived issues created last month", ArchivedIssue.objects.filter(
+                created_at__gte=month, created_at__lt=add_months(month, 1))),
+        )
+        for label, queryset in queries:
+            self.stdout.write("%s reads %d of %d partitions." % (label, len(scanned_partitions(queryset)), total))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...similarity import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Build the near-duplicate index of open issues from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of issues indexed with one bulk insert.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size has to be at least 1.")
+        self.stdout.write("Indexed %d issues." % rebuild_index(options["batch_size"]))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ...assignment import recount_workloads
+from ...attachments import recount_usage
+from ...bitmaps import reconcile_bitmaps
+from ...counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = ("Recount the issues and fix the issue counters, the workloads of the solvers, the attachment usage "
+            "and the label bitmaps.")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Fixed %d issue counters." % reconcile_counters())
+        self.stdout.write("Fixed %d workloads." % recount_workloads())
+        self.stdout.write("Fixed %d attachment usages." % recount_usage())
+        self.stdout.write("Fixed %d label bitmaps." % reconcile_bitmaps())
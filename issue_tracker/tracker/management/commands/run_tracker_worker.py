@@ -0,0 +1,38 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...taskqueue import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background tasks of the tracker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10, help="Number of tasks claimed at once.")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to wait when there are no tasks.")
+        parser.add_argument("--lock-timeout", type=int, default=300,
+                            help="Seconds after which tasks of a dead worker are run again, "
+                                 "unless the task has its own timeout.")
+        parser.add_argument("--once", action="store_true", help="Exit when there are no tasks to run.")
+
+    def handle(self, *args, **options):
+        worker = Worker(batch_size=options["batch_size"], lock_timeout=options["lock_timeout"])
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while self.running:
+            close_old_connections()
+            worker.schedule_periodic()
+            if worker.run_once() == 0:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+
+    def stop(self, signum, frame):
+        """Finish the current batch and exit."""
+        self.running = False
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...sla import scan_sla
+
+
+class Command(BaseCommand):
+    help = "Escalate issues which missed their SLA deadline, run it e.g. every minute."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Number of issues escalated in one transaction.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size has to be at least 1.")
+        self.stdout.write("Escalated %d issues." % scan_sla(batch_size=options["batch_size"]))
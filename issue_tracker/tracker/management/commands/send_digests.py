@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = "Send notification digests to users whose notification window elapsed, run it e.g. every minute."
+
+    def handle(self, *args, **options):
+        users = 0
+        while True:
+            batch = send_digests()
+            if not batch:
+                break
+            users += batch
+        self.stdout.write("Sent digests to %d users." % users)
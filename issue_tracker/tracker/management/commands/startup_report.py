@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROBE = "from tracker.startup import main; main()"
+
+
+class Command(BaseCommand):
+    help = "Report how long settings, each installed app, the WSGI handler and URLconf take to load."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3,
+                            help="Number of cold starts to measure, the best time of each step is reported.")
+        parser.add_argument("--json", action="store_true", help="Output the report as JSON.")
+
+    def run_probe(self) -> Dict:
+        """Boot the project in a fresh interpreter and return its timings."""
+        result = subprocess.run([sys.executable, "-c", PROBE], cwd=settings.BASE_DIR,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if result.returncode != 0:
+            raise CommandError("Startup probe failed:\n%s" % result.stderr)
+        return json.loads(result.stdout)
+
+    @staticmethod
+    def merge(reports: List[Dict]) -> Dict:
+        """Keep the best time of every step over all runs."""
+        best = reports[0]
+        for report in reports[1:]:
+            for key in ("settings", "setup", "wsgi", "urls", "total"):
+                best[key] = min(best[key], report[key])
+            apps = {app["app"]: app for app in report["apps"]}
+            for app in best["apps"]:
+                for key in ("import", "models", "ready", "total"):
+                    app[key] = min(app[key], apps[app["app"]][key])
+        return best
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat has to be at least 1.")
+        report = self.merge([self.run_probe() for _ in range(options["repeat"])])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+
+        row = "{:<20} {:>10} {:>10} {:>10} {:>10}"
+        self.stdout.write(row.format("App", "Import", "Models", "Ready", "Total"))
+        for app in sorted(report["apps"], key=lambda a: a["total"], reverse=True):
+            self.stdout.write(row.format(app["app"], *("%.1f ms" % app[key]
+                                                      for key in ("import", "models", "ready", "total"))))
+        self.stdout.write("")
+        for key, label in (("settings", "Settings"), ("setup", "django.setup()"), ("wsgi", "WSGI handler"),
+                           ("urls", "URLconf"), ("total", "Total")):
+            self.stdout.write("{:<20} {:>10}".format(label, "%.1f ms" % report[key]))
@@ -0,0 +1,29 @@
+import os
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...vendor import VENDOR_ASSETS, VENDOR_STATIC_DIR
+
+
+class Command(BaseCommand):
+    help = "Download third party assets used by the templates so the UI works without CDNs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Download also assets which already exist.")
+
+    def handle(self, *args, **options):
+        for name, url in VENDOR_ASSETS.items():
+            path = os.path.join(VENDOR_STATIC_DIR, name)
+            if os.path.exists(path) and not options["force"]:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                with urlopen(url, timeout=30) as response:
+                    content = response.read()
+            except OSError as e:
+                raise CommandError("Couldn't download %s: %s" % (url, e))
+            with open(path, "wb") as f:
+                f.write(content)
+            self.stdout.write("Downloaded %s" % name)
+        self.stdout.write("Set TRACKER_VENDOR_STATIC = True to use the vendored assets.")
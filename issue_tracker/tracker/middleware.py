@@ -0,0 +1,111 @@
+import json
+import mimetypes
+import os
+from typing import Dict, NamedTuple, Set, Tuple
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=60"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class StaticFile(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+    content_type: str
+    variants: Dict[str, Tuple[str, int]]
+    immutable: bool
+
+
+class StaticFilesMiddleware:
+    """Serve files collected into STATIC_ROOT from the application process.
+
+    Files are indexed once on startup. Fingerprinted files from the staticfiles manifest are
+    served with far future immutable caching, precompressed copies stored by
+    `tracker.storage.CompressedManifestStaticFilesStorage` are served to clients accepting them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.files = {}  # type: Dict[str, StaticFile]
+        if settings.STATIC_ROOT and os.path.isdir(settings.STATIC_ROOT):
+            self.scan(settings.STATIC_ROOT)
+
+    @staticmethod
+    def load_hashed_names(root: str) -> Set[str]:
+        """Return names of fingerprinted files from the staticfiles manifest."""
+        try:
+            with open(os.path.join(root, "staticfiles.json")) as f:
+                return set(json.load(f)["paths"].values())
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def scan(self, root: str):
+        """Index all files in root."""
+        hashed_names = self.load_hashed_names(root)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(tuple(ext for _, ext in ENCODINGS)):
+                    continue
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, root).replace(os.sep, "/")
+                stat = os.stat(path)
+                variants = {}
+                for encoding, ext in ENCODINGS:
+                    if os.path.exists(path + ext):
+                        variants[encoding] = (path + ext, os.stat(path + ext).st_size)
+                content_type, _ = mimetypes.guess_type(name)
+                self.files[settings.STATIC_URL + name] = StaticFile(
+                    path, stat.st_size, stat.st_mtime, content_type or "application/octet-stream", variants,
+                    name in hashed_names)
+
+    @staticmethod
+    def accepted_encodings(request) -> Set[str]:
+        """Return encodings accepted by the client."""
+        accepted = set()
+        for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+            encoding, _, params = part.partition(";")
+            params = params.replace(" ", "")
+            if params.startswith("q="):
+                try:
+                    if float(params[2:]) == 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(encoding.strip().lower())
+        return accepted
+
+    def serve(self, request, static_file: StaticFile) -> HttpResponse:
+        """Return response with the file or its compressed copy."""
+        if not static_file.immutable and not was_modified_since(
+                request.META.get("HTTP_IF_MODIFIED_SINCE"), static_file.mtime, static_file.size):
+            return HttpResponseNotModified()
+
+        path, size, content_encoding = static_file.path, static_file.size, None
+        accepted = self.accepted_encodings(request)
+        for encoding, _ in ENCODINGS:
+            if encoding in static_file.variants and encoding in accepted:
+                (path, size), content_encoding = static_file.variants[encoding], encoding
+                break
+
+        response = FileResponse(open(path, "rb"), content_type=static_file.content_type)
+        response["Content-Length"] = size
+        response["Last-Modified"] = http_date(static_file.mtime)
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if static_file.immutable else DEFAULT_CACHE_CONTROL
+        if content_encoding is not None:
+            response["Content-Encoding"] = content_encoding
+        if static_file.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    def __call__(self, request) -> HttpResponse:
+        static_file = self.files.get(request.path_info)
+        if static_file is None or request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+        return self.serve(request, static_file)
@@ -0,0 +1,26 @@
+# Generated by Django 2.0.6 on 2026-10-19 09:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    Issue = apps.get_model('tracker', 'Issue')
+    Issue.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_issue_assigned_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Updated'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
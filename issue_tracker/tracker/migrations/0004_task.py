@@ -0,0 +1,37 @@
+# Generated by Django 2.0.6 on 2026-10-19 14:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_issue_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The name of the registered task.', max_length=254, verbose_name='Name')),
+                ('arguments', models.TextField(default='{}', help_text='JSON encoded arguments of the task.', verbose_name='Arguments')),
+                ('state', models.CharField(choices=[('pen', 'Pending'), ('run', 'Running'), ('fai', 'Failed')], default='pen', max_length=4, verbose_name='State')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text="The task won't run before this time.", verbose_name='Run at')),
+                ('locked_by', models.CharField(blank=True, max_length=64, verbose_name='Locked by')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Locked until')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name': 'Task',
+                'verbose_name_plural': 'Tasks',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['state', 'run_at'], name='tracker_tas_state_290342_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.0.6 on 2026-10-19 14:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0004_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ass', 'Assigned'), ('sta', 'State changed')], max_length=4, verbose_name='Kind')),
+                ('state', models.CharField(blank=True, choices=[('ass', 'Assigned'), ('don', 'Done'), ('can', 'Canceled'), ('cre', 'Created')], help_text='The new state of the issue.', max_length=4, verbose_name='State')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent')),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='tracker.Issue', verbose_name='Issue')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Recipient')),
+            ],
+            options={
+                'verbose_name': 'Notification',
+                'verbose_name_plural': 'Notifications',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['sent_at', 'recipient', 'created_at'], name='tracker_not_sent_at_95589b_idx'),
+        ),
+    ]
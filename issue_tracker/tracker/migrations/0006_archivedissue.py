@@ -0,0 +1,54 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:10
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0005_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedIssue',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=254, verbose_name='Name')),
+                ('state', models.CharField(choices=[('ass', 'Assigned'), ('don', 'Done'), ('can', 'Canceled'), ('cre', 'Created')], max_length=4, verbose_name='State')),
+                ('description', models.TextField(verbose_name='Description')),
+                ('completed_in', models.DurationField(blank=True, null=True, verbose_name='Completed in')),
+                ('assigned_at', models.DateTimeField(blank=True, null=True, verbose_name='Assiged at')),
+                ('created_at', models.DateTimeField(verbose_name='Created')),
+                ('updated_at', models.DateTimeField(verbose_name='Updated')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tracker.IssueCategory', verbose_name='Category')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_issues', to=settings.AUTH_USER_MODEL, verbose_name='Created by')),
+                ('solver', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='solved_archived_issues', to=settings.AUTH_USER_MODEL, verbose_name='Solver')),
+            ],
+            options={
+                'verbose_name': 'Archived issue',
+                'verbose_name_plural': 'Archived issues',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchiveTotals',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('ass', 'Assigned'), ('don', 'Done'), ('can', 'Canceled'), ('cre', 'Created')], max_length=4, unique=True, verbose_name='State')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('completed_count', models.PositiveIntegerField(default=0, help_text='The number of issues with known completion time.', verbose_name='Completed count')),
+                ('completed_total', models.DurationField(default=datetime.timedelta(0), verbose_name='Completed in total')),
+                ('completed_min', models.DurationField(blank=True, null=True, verbose_name='Completed in at least')),
+                ('completed_max', models.DurationField(blank=True, null=True, verbose_name='Completed in at most')),
+            ],
+            options={
+                'verbose_name': 'Archive totals',
+                'verbose_name_plural': 'Archive totals',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+TABLE = "tracker_archivedissue"
+
+PARTITION_SQL = [
+    "ALTER TABLE {table} RENAME TO {table}_unpartitioned",
+    "CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)",
+    "CREATE TABLE {table}_default PARTITION OF {table} DEFAULT",
+    "INSERT INTO {table} SELECT * FROM {table}_unpartitioned",
+    # dropped before the new constraints and indexes are created, they would clash with its names
+    "DROP TABLE {table}_unpartitioned",
+    "ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)",
+    "CREATE INDEX {table}_created_by_id ON {table} (created_by_id)",
+    "CREATE INDEX {table}_solver_id ON {table} (solver_id)",
+    "CREATE INDEX {table}_category_id ON {table} (category_id)",
+    "ALTER TABLE {table} ADD CONSTRAINT {table}_created_by_id_fk FOREIGN KEY (created_by_id) "
+    "REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED",
+    "ALTER TABLE {table} ADD CONSTRAINT {table}_solver_id_fk FOREIGN KEY (solver_id) "
+    "REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED",
+    "ALTER TABLE {table} ADD CONSTRAINT {table}_category_id_fk FOREIGN KEY (category_id) "
+    "REFERENCES tracker_issuecategory (id) DEFERRABLE INITIALLY DEFERRED",
+]
+
+
+def partition_archive(apps, schema_editor):
+    """Partition the archive by created_at on PostgreSQL 11+, monthly partitions are created after migrate."""
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or connection.pg_version < 110000:
+        return
+    for sql in PARTITION_SQL:
+        schema_editor.execute(sql.format(table=TABLE))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_archivedissue'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
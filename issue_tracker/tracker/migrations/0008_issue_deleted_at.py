@@ -0,0 +1,18 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_partition_archivedissue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='The issue is hidden and waits for the purge.', null=True, verbose_name='Deleted'),
+        ),
+    ]
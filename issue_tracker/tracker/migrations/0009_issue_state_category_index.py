@@ -0,0 +1,17 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_issue_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['state', 'category'], name='tracker_iss_state_304293_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0009_alter_user_last_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0009_issue_state_category_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolverWorkload',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='workload', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('open_issues', models.IntegerField(default=0, verbose_name='Open issues')),
+            ],
+            options={
+                'verbose_name': 'Solver workload',
+                'verbose_name_plural': 'Solver workloads',
+            },
+        ),
+        migrations.AddField(
+            model_name='issuecategory',
+            name='solvers',
+            field=models.ManyToManyField(blank=True, help_text='New issues are assigned to the least busy of these users.', related_name='solver_categories', to=settings.AUTH_USER_MODEL, verbose_name='Solvers'),
+        ),
+    ]
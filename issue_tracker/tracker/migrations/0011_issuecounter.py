@@ -0,0 +1,42 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+
+def count_issues(apps, schema_editor):
+    Issue = apps.get_model('tracker', 'Issue')
+    IssueCounter = apps.get_model('tracker', 'IssueCounter')
+    rows = Issue.objects.filter(deleted_at__isnull=True).values_list('state', 'category_id', 'solver_id').annotate(
+        models.Count('pk')).order_by()
+    IssueCounter.objects.bulk_create([
+        IssueCounter(state=state, category=category or 0, solver=solver or 0, count=count)
+        for state, category, solver, count in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_solverworkload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('ass', 'Assigned'), ('don', 'Done'), ('can', 'Canceled'), ('cre', 'Created')], max_length=4, verbose_name='State')),
+                ('category', models.IntegerField(default=0, help_text='The primary key of the category, 0 for none.', verbose_name='Category')),
+                ('solver', models.IntegerField(default=0, help_text='The primary key of the solver, 0 for none.', verbose_name='Solver')),
+                ('count', models.IntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Issue counter',
+                'verbose_name_plural': 'Issue counters',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='issuecounter',
+            unique_together={('state', 'category', 'solver')},
+        ),
+        migrations.RunPython(count_issues, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_issuecounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueDependency',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('blocked', models.ForeignKey(help_text='The issue waiting for the blocker.', on_delete=django.db.models.deletion.CASCADE, related_name='blocked_by', to='tracker.Issue', verbose_name='Blocked')),
+                ('blocker', models.ForeignKey(help_text='The issue which has to be closed first.', on_delete=django.db.models.deletion.CASCADE, related_name='blocking', to='tracker.Issue', verbose_name='Blocker')),
+            ],
+            options={
+                'verbose_name': 'Issue dependency',
+                'verbose_name_plural': 'Issue dependencies',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='issuedependency',
+            unique_together={('blocker', 'blocked')},
+        ),
+    ]
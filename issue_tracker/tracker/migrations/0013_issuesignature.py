@@ -0,0 +1,41 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_issuedependency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueBand',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True, verbose_name='Bucket')),
+            ],
+            options={
+                'verbose_name': 'Issue band',
+                'verbose_name_plural': 'Issue bands',
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueSignature',
+            fields=[
+                ('issue', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='tracker.Issue', verbose_name='Issue')),
+                ('minhash', models.BinaryField(verbose_name='MinHash')),
+            ],
+            options={
+                'verbose_name': 'Issue signature',
+                'verbose_name_plural': 'Issue signatures',
+            },
+        ),
+        migrations.AddField(
+            model_name='issueband',
+            name='issue',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='tracker.Issue', verbose_name='Issue'),
+        ),
+    ]
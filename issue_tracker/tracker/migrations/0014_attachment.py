@@ -0,0 +1,80 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0013_issuesignature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Attachment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=254, verbose_name='Name')),
+                ('content_type', models.CharField(max_length=254, verbose_name='Content type')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True, verbose_name='Uploaded')),
+            ],
+            options={
+                'verbose_name': 'Attachment',
+                'verbose_name_plural': 'Attachments',
+                'ordering': ('uploaded_at', 'pk'),
+            },
+        ),
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='Size')),
+                ('file_name', models.CharField(help_text='The name of the file in the attachment storage.', max_length=254, verbose_name='File name')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name': 'Attachment blob',
+                'verbose_name_plural': 'Attachment blobs',
+            },
+        ),
+        migrations.AddField(
+            model_name='issuecategory',
+            name='attachment_max_size',
+            field=models.BigIntegerField(blank=True, help_text='The maximum size of one attachment in bytes, empty for TRACKER_ATTACHMENT_MAX_SIZE.', null=True, verbose_name='Maximum attachment size'),
+        ),
+        migrations.AddField(
+            model_name='issuecategory',
+            name='attachment_quota',
+            field=models.BigIntegerField(blank=True, help_text='The maximum total size of attachments of the issues in bytes, empty for unlimited.', null=True, verbose_name='Attachment quota'),
+        ),
+        migrations.AddField(
+            model_name='issuecategory',
+            name='attachment_usage',
+            field=models.BigIntegerField(default=0, help_text='The total size of attachments of the issues in bytes.', verbose_name='Attachment usage'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='tracker.AttachmentBlob', verbose_name='Blob'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='category',
+            field=models.ForeignKey(blank=True, help_text='The category the size is charged to.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tracker.IssueCategory', verbose_name='Category'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='issue',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='tracker.Issue', verbose_name='Issue'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='uploaded_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Uploaded by'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:31
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def build_state_bitmaps(apps, schema_editor):
+    Issue = apps.get_model('tracker', 'Issue')
+    IssueBitmap = apps.get_model('tracker', 'IssueBitmap')
+    IssueBitmapChunk = apps.get_model('tracker', 'IssueBitmapChunk')
+    chunks = {}
+    for pk, state in Issue.objects.filter(deleted_at__isnull=True).values_list('pk', 'state').iterator():
+        bits = chunks.setdefault((state, pk >> 16), bytearray(8192))
+        bits[(pk & 0xffff) >> 3] |= 1 << (pk & 7)
+    bitmaps = {}
+    for state, _ in sorted(chunks):
+        if state not in bitmaps:
+            bitmaps[state] = IssueBitmap.objects.create(key='state:%s' % state)
+    IssueBitmapChunk.objects.bulk_create([
+        IssueBitmapChunk(bitmap=bitmaps[state], chunk=chunk, bits=bytes(bits).rstrip(b'\0'))
+        for (state, chunk), bits in chunks.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_attachment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueBitmap',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Key')),
+                ('version', models.UUIDField(default=uuid.uuid4, help_text='Changed with every change of the bitmap.', verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Issue bitmap',
+                'verbose_name_plural': 'Issue bitmaps',
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueBitmapChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk', models.IntegerField(verbose_name='Chunk')),
+                ('bits', models.BinaryField(verbose_name='Bits')),
+                ('bitmap', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='tracker.IssueBitmap', verbose_name='Bitmap')),
+            ],
+            options={
+                'verbose_name': 'Issue bitmap chunk',
+                'verbose_name_plural': 'Issue bitmap chunks',
+            },
+        ),
+        migrations.CreateModel(
+            name='Label',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The name of the label, unique.', max_length=64, unique=True, validators=[django.core.validators.RegexValidator('^[^\\s()"]+$', "The name can't contain spaces, parentheses and quotes.")], verbose_name='Name')),
+            ],
+            options={
+                'verbose_name': 'Label',
+                'verbose_name_plural': 'Labels',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='labels',
+            field=models.ManyToManyField(blank=True, help_text='The labels of the issue.', related_name='issues', to='tracker.Label', verbose_name='Labels'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='issuebitmapchunk',
+            unique_together={('bitmap', 'chunk')},
+        ),
+        migrations.RunPython(build_state_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_label'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SLAPolicy',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('response_time', models.DurationField(blank=True, help_text='The time in which new issues have to be assigned, empty for no target.', null=True, verbose_name='Response time')),
+                ('resolution_time', models.DurationField(blank=True, help_text='The time in which issues have to be closed, empty for no target.', null=True, verbose_name='Resolution time')),
+            ],
+            options={
+                'verbose_name': 'SLA policy',
+                'verbose_name_plural': 'SLA policies',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivetotals',
+            name='breached_count',
+            field=models.PositiveIntegerField(default=0, help_text='The number of issues which missed an SLA deadline.', verbose_name='Breached count'),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='due_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='The next SLA deadline of the open issue.', null=True, verbose_name='Due'),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='sla_breached',
+            field=models.BooleanField(default=False, editable=False, help_text='The issue missed an SLA deadline.', verbose_name='SLA breached'),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='sla_escalated_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='The time the missed deadline was escalated.', null=True, verbose_name='SLA escalated'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('ass', 'Assigned'), ('sta', 'State changed'), ('sla', 'SLA deadline missed')], max_length=4, verbose_name='Kind'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['sla_escalated_at', 'due_at'], name='tracker_iss_sla_esc_a443d1_idx'),
+        ),
+        migrations.AddField(
+            model_name='slapolicy',
+            name='category',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sla_policy', to='tracker.IssueCategory', verbose_name='Category'),
+        ),
+    ]
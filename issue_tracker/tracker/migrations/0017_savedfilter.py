@@ -0,0 +1,35 @@
+# Generated by Django 2.0.13 on 2026-10-19 14:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0016_slapolicy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedFilter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Name')),
+                ('query', models.TextField(help_text='The conditions of the filter as canonical JSON.', verbose_name='Query')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_filters', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Saved filter',
+                'verbose_name_plural': 'Saved filters',
+                'ordering': ('name', 'pk'),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='savedfilter',
+            unique_together={('user', 'name')},
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.0.13 on 2026-10-19 15:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0017_savedfilter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedIssueDependency',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blocker_id', models.IntegerField(verbose_name='Blocker')),
+                ('blocked_id', models.IntegerField(verbose_name='Blocked')),
+                ('created_at', models.DateTimeField(verbose_name='Created')),
+                ('issue', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='dependencies', to='tracker.ArchivedIssue', verbose_name='Issue')),
+            ],
+            options={
+                'verbose_name': 'Archived issue dependency',
+                'verbose_name_plural': 'Archived issue dependencies',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedIssueLabel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.ArchivedIssue', verbose_name='Issue')),
+                ('label', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.Label', verbose_name='Label')),
+            ],
+            options={
+                'verbose_name': 'Archived issue label',
+                'verbose_name_plural': 'Archived issue labels',
+            },
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='archived_issue',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='tracker.ArchivedIssue', verbose_name='Archived issue'),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='issue',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='tracker.Issue', verbose_name='Issue'),
+        ),
+        migrations.AddField(
+            model_name='archivedissue',
+            name='labels',
+            field=models.ManyToManyField(blank=True, related_name='archived_issues', through='tracker.ArchivedIssueLabel', to='tracker.Label', verbose_name='Labels'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedissuelabel',
+            unique_together={('issue', 'label')},
+        ),
+    ]
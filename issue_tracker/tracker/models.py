@@ -1,11 +1,19 @@
+import uuid
 from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.validators import RegexValidator
+from django.db import models, transaction
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .caching import bump_version
+from .signals import issue_changed, issues_deleted, issues_updated
+
 ISSUE_ASSIGNED = "ass"
 ISSUE_DONE = "don"
 ISSUE_CANCELED = "can"
@@ -18,8 +26,23 @@ ISSUE_STATE_CHOICES = (
 )
 
 
+CATEGORY_CACHE_NAMESPACE = "categories"
+
+
 class IssueCategory(models.Model):
     name = models.CharField(verbose_name=_("Name"), help_text=_("The name of the issue category."), max_length=254)
+    solvers = models.ManyToManyField(
+        User, verbose_name=_("Solvers"), help_text=_("New issues are assigned to the least busy of these users."),
+        blank=True, related_name="solver_categories")
+    attachment_max_size = models.BigIntegerField(
+        verbose_name=_("Maximum attachment size"), null=True, blank=True,
+        help_text=_("The maximum size of one attachment in bytes, empty for TRACKER_ATTACHMENT_MAX_SIZE."))
+    attachment_quota = models.BigIntegerField(
+        verbose_name=_("Attachment quota"), null=True, blank=True,
+        help_text=_("The maximum total size of attachments of the issues in bytes, empty for unlimited."))
+    attachment_usage = models.BigIntegerField(
+        verbose_name=_("Attachment usage"), default=0,
+        help_text=_("The total size of attachments of the issues in bytes."))
 
     class Meta:
         verbose_name = _("Issue category")
@@ -29,7 +52,136 @@ class IssueCategory(models.Model):
         return self.name
 
 
+class SLAPolicy(models.Model):
+    """Service level targets of issues in a category measured from their creation, see `tracker.sla`."""
+    category = models.OneToOneField(
+        IssueCategory, verbose_name=_("Category"), on_delete=models.CASCADE, related_name="sla_policy")
+    response_time = models.DurationField(
+        verbose_name=_("Response time"), null=True, blank=True,
+        help_text=_("The time in which new issues have to be assigned, empty for no target."))
+    resolution_time = models.DurationField(
+        verbose_name=_("Resolution time"), null=True, blank=True,
+        help_text=_("The time in which issues have to be closed, empty for no target."))
+
+    def get_target(self, state: str) -> Optional[timedelta]:
+        """Return time from the creation of an open issue in the state to its next deadline."""
+        targets = [self.resolution_time] + ([self.response_time] if state == ISSUE_CREATED else [])
+        targets = [target for target in targets if target is not None]
+        return min(targets) if targets else None
+
+    def __str__(self):
+        return str(self.category)
+
+    class Meta:
+        verbose_name = _("SLA policy")
+        verbose_name_plural = _("SLA policies")
+
+
+class Label(models.Model):
+    name = models.CharField(
+        verbose_name=_("Name"), help_text=_("The name of the label, unique."), max_length=64, unique=True,
+        validators=[RegexValidator(r'^[^\s()"]+$', _("The name can't contain spaces, parentheses and quotes."))])
+
+    class Meta:
+        verbose_name = _("Label")
+        verbose_name_plural = _("Labels")
+        ordering = ("name",)
+
+    def __str__(self):
+        return self.name
+
+
+# version of all the issues, changed by every change of any issue
+ISSUE_CACHE_NAMESPACE = "issues"
+
+
+def bump_issues_version():
+    """Change the version of the issues once the current transaction is committed."""
+    transaction.on_commit(lambda: bump_version(ISSUE_CACHE_NAMESPACE))
+
+
+class IssueQuerySet(models.QuerySet):
+    def update(self, **kwargs) -> int:
+        """Update all issues in the queryset and mark them as modified."""
+        kwargs.setdefault("updated_at", timezone.now())
+        bump_issues_version()
+        return super().update(**kwargs)
+
+    def update_tracked(self, values: Dict[str, Any], **kwargs) -> int:
+        """Set-based update of tracked fields, the changes are sent by the issues_updated signal.
+
+        :param values: new values of tracked fields
+        :param kwargs: other fields to update
+        """
+        with transaction.atomic():
+            return self._update_tracked(values, **kwargs)
+
+    def _update_tracked(self, values: Dict[str, Any], **kwargs) -> int:
+        # the rows are locked, so concurrent updates of the same issues don't send the changes twice
+        issues = list(self.select_for_update().select_related(None).only(
+            "pk", "state", "created_by_id", "solver_id", "category_id"))
+        if not issues:
+            return 0
+        updated = self.filter(pk__in=[issue.pk for issue in issues]).update(**values, **kwargs)
+        # objects of changed foreign keys are loaded once for all the issues
+        related = {}
+        for field in self.model._meta.concrete_fields:
+            if field.is_relation and field.attname in values:
+                related[field.name] = field.related_model._base_manager.filter(pk=values[field.attname]).first()
+        changes = {}
+        for issue in issues:
+            changes[issue.pk] = {field: (getattr(issue, field), value) for field, value in values.items()
+                                 if getattr(issue, field) != value}
+            for field, value in values.items():
+                setattr(issue, field, value)
+            for field, value in related.items():
+                setattr(issue, field, value)
+        issues_updated.send(sender=self.model, instances=issues, changes=changes)
+        return updated
+
+    def mark_done(self) -> int:
+        """Mark open issues as done, return number of the issues."""
+        now = timezone.now()
+        completed_in = ExpressionWrapper(Value(now, output_field=DateTimeField()) - Coalesce(
+            "assigned_at", "created_at"), output_field=DurationField())
+        return self.filter(state__in=(ISSUE_CREATED, ISSUE_ASSIGNED)).update_tracked(
+            {"state": ISSUE_DONE}, completed_in=Coalesce("completed_in", completed_in), updated_at=now)
+
+    def mark_canceled(self) -> int:
+        """Mark open issues as canceled, return number of the issues."""
+        return self.filter(state__in=(ISSUE_CREATED, ISSUE_ASSIGNED)).update_tracked({"state": ISSUE_CANCELED})
+
+    def assign(self, solver: User) -> int:
+        """Assign open issues to the solver, return number of the issues."""
+        return self.filter(state__in=(ISSUE_CREATED, ISSUE_ASSIGNED)).exclude(solver=solver).update_tracked(
+            {"state": ISSUE_ASSIGNED, "solver_id": solver.pk}, assigned_at=timezone.now())
+
+    def soft_delete(self) -> int:
+        """Hide the issues right away, their rows are purged in the background, see `tracker.purge`."""
+        with transaction.atomic():
+            issues = list(self.filter(deleted_at__isnull=True).select_for_update().only(
+                "pk", "state", "solver_id", "category_id"))
+            if not issues:
+                return 0
+            self.model.all_objects.filter(pk__in=[issue.pk for issue in issues], deleted_at__isnull=True).update(
+                deleted_at=timezone.now())
+            issues_deleted.send(sender=self.model, instances=issues)
+        return len(issues)
+
+
+class IssueManager(models.Manager.from_queryset(IssueQuerySet)):
+    """Manager of the issues which weren't deleted."""
+
+    def get_queryset(self) -> IssueQuerySet:
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Issue(models.Model):
+    # Fields whose changes are reported by the issue_changed signal.
+    TRACKED_FIELDS = ("name", "created_by_id", "solver_id", "category_id", "state", "description")
+    # Set by `tracker.archive` on the issues deleted after they were copied to the archive.
+    archived = False
+
     name = models.CharField(
         verbose_name=_("Name"), help_text=_("The name of the issue."), max_length=254)
     created_by = models.ForeignKey(
@@ -41,6 +193,8 @@ class Issue(models.Model):
     category = models.ForeignKey(
         IssueCategory, verbose_name=_("Category"), help_text=_("The category of the issue."),
         blank=True, null=True, on_delete=models.SET_NULL)
+    labels = models.ManyToManyField(
+        Label, verbose_name=_("Labels"), help_text=_("The labels of the issue."), blank=True, related_name="issues")
     state = models.CharField(
         choices=ISSUE_STATE_CHOICES, verbose_name=_("State"), help_text=_("The state of the issue."), null=False,
         blank=False, default=ISSUE_CREATED, max_length=4)
@@ -53,6 +207,39 @@ class Issue(models.Model):
         verbose_name=_("Assiged at"), blank=True, null=True)
     created_at = models.DateTimeField(
         verbose_name=_("Created"), auto_now_add=True)
+    updated_at = models.DateTimeField(
+        verbose_name=_("Updated"), auto_now=True, db_index=True)
+    deleted_at = models.DateTimeField(
+        verbose_name=_("Deleted"), help_text=_("The issue is hidden and waits for the purge."), blank=True,
+        null=True, db_index=True)
+    due_at = models.DateTimeField(
+        verbose_name=_("Due"), help_text=_("The next SLA deadline of the open issue."), blank=True, null=True,
+        editable=False)
+    sla_escalated_at = models.DateTimeField(
+        verbose_name=_("SLA escalated"), help_text=_("The time the missed deadline was escalated."), blank=True,
+        null=True, editable=False)
+    sla_breached = models.BooleanField(
+        verbose_name=_("SLA breached"), help_text=_("The issue missed an SLA deadline."), default=False,
+        editable=False)
+
+    objects = IssueManager()
+    all_objects = IssueQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.get_tracked_values()
+        return instance
+
+    def get_tracked_values(self) -> Dict[str, Any]:
+        """Return current values of the tracked fields."""
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS if field in self.__dict__}
+
+    def get_changes(self) -> Dict[str, Tuple[Any, Any]]:
+        """Return tracked fields changed since the issue was loaded or saved."""
+        loaded = getattr(self, "_loaded_values", {})
+        return {field: (loaded.get(field), value) for field, value in self.get_tracked_values().items()
+                if field not in loaded or loaded[field] != value}
 
     def clean(self):
         """Validate state with other fields."""
@@ -61,13 +248,22 @@ class Issue(models.Model):
         super().clean()
 
     def save(self, *args, **kwargs):
+        created = self._state.adding
         if self.state == ISSUE_CREATED and self.solver is not None:
             self.state = ISSUE_ASSIGNED
             self.assigned_at = timezone.now()
         elif self.state == ISSUE_DONE and self.completed_in is None and (
                 self.assigned_at is not None or self.created_at is not None):
             self.completed_in = timedelta(seconds=int((timezone.now() - (self.assigned_at or self.created_at)).seconds))
-        super().save(*args, **kwargs)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | {"updated_at"}
+        # receivers update counters in the transaction of the change
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            changes = self.get_changes()
+            self._loaded_values = self.get_tracked_values()
+            if created or changes:
+                issue_changed.send(sender=Issue, instance=self, changes=changes, created=created)
 
     def __str__(self):
         return self.name
@@ -79,3 +275,365 @@ class Issue(models.Model):
     class Meta:
         verbose_name = _("Issue")
         verbose_name_plural = _("Issues")
+        indexes = [
+            models.Index(fields=["state", "category"]),
+            # unescalated issues ordered by deadline, read by the SLA scanner
+            models.Index(fields=["sla_escalated_at", "due_at"]),
+        ]
+
+
+TASK_PENDING = "pen"
+TASK_RUNNING = "run"
+TASK_FAILED = "fai"
+TASK_STATE_CHOICES = (
+    (TASK_PENDING, _("Pending")),
+    (TASK_RUNNING, _("Running")),
+    (TASK_FAILED, _("Failed")),
+)
+
+
+class Task(models.Model):
+    """Background task run by `manage.py run_tracker_worker`, see `tracker.taskqueue`.
+
+    Finished tasks are deleted, failed ones are kept for inspection.
+    """
+    name = models.CharField(verbose_name=_("Name"), help_text=_("The name of the registered task."), max_length=254)
+    arguments = models.TextField(
+        verbose_name=_("Arguments"), help_text=_("JSON encoded arguments of the task."), default="{}")
+    state = models.CharField(
+        choices=TASK_STATE_CHOICES, verbose_name=_("State"), default=TASK_PENDING, max_length=4)
+    attempts = models.PositiveIntegerField(verbose_name=_("Attempts"), default=0)
+    run_at = models.DateTimeField(
+        verbose_name=_("Run at"), help_text=_("The task won't run before this time."), default=timezone.now)
+    locked_by = models.CharField(verbose_name=_("Locked by"), max_length=64, blank=True)
+    locked_until = models.DateTimeField(verbose_name=_("Locked until"), blank=True, null=True)
+    last_error = models.TextField(verbose_name=_("Last error"), blank=True)
+    created_at = models.DateTimeField(verbose_name=_("Created"), auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("Task")
+        verbose_name_plural = _("Tasks")
+        indexes = [models.Index(fields=["state", "run_at"])]
+
+
+NOTIFICATION_ASSIGNED = "ass"
+NOTIFICATION_STATE = "sta"
+NOTIFICATION_SLA = "sla"
+NOTIFICATION_KIND_CHOICES = (
+    (NOTIFICATION_ASSIGNED, _("Assigned")),
+    (NOTIFICATION_STATE, _("State changed")),
+    (NOTIFICATION_SLA, _("SLA deadline missed")),
+)
+
+
+class Notification(models.Model):
+    """Event waiting for the next digest of its recipient, see `tracker.notifications`."""
+    recipient = models.ForeignKey(
+        User, verbose_name=_("Recipient"), on_delete=models.CASCADE, related_name="notifications")
+    issue = models.ForeignKey(
+        Issue, verbose_name=_("Issue"), on_delete=models.CASCADE, related_name="notifications")
+    kind = models.CharField(choices=NOTIFICATION_KIND_CHOICES, verbose_name=_("Kind"), max_length=4)
+    state = models.CharField(
+        choices=ISSUE_STATE_CHOICES, verbose_name=_("State"), help_text=_("The new state of the issue."),
+        max_length=4, blank=True)
+    created_at = models.DateTimeField(verbose_name=_("Created"), default=timezone.now)
+    sent_at = models.DateTimeField(verbose_name=_("Sent"), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("Notification")
+        verbose_name_plural = _("Notifications")
+        indexes = [models.Index(fields=["sent_at", "recipient", "created_at"])]
+
+
+class ArchivedIssue(models.Model):
+    """Done or canceled issue moved out of the active table, see `tracker.archive`.
+
+    The issue keeps its primary key, so its detail URL stays the same.
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(verbose_name=_("Name"), max_length=254)
+    created_by = models.ForeignKey(
+        User, verbose_name=_("Created by"), on_delete=models.CASCADE, related_name="archived_issues")
+    solver = models.ForeignKey(
+        User, verbose_name=_("Solver"), blank=True, null=True, on_delete=models.SET_NULL,
+        related_name="solved_archived_issues")
+    category = models.ForeignKey(
+        IssueCategory, verbose_name=_("Category"), blank=True, null=True, on_delete=models.SET_NULL)
+    state = models.CharField(choices=ISSUE_STATE_CHOICES, verbose_name=_("State"), max_length=4)
+    description = models.TextField(verbose_name=_("Description"))
+    completed_in = models.DurationField(verbose_name=_("Completed in"), blank=True, null=True)
+    assigned_at = models.DateTimeField(verbose_name=_("Assiged at"), blank=True, null=True)
+    created_at = models.DateTimeField(verbose_name=_("Created"))
+    updated_at = models.DateTimeField(verbose_name=_("Updated"))
+    archived_at = models.DateTimeField(verbose_name=_("Archived"), auto_now_add=True)
+    labels = models.ManyToManyField(
+        Label, verbose_name=_("Labels"), blank=True, through="ArchivedIssueLabel", related_name="archived_issues")
+
+    # Fields copied from the active issue.
+    COPIED_FIELDS = ("id", "name", "created_by_id", "solver_id", "category_id", "state", "description",
+                     "completed_in", "assigned_at", "created_at", "updated_at")
+
+    @classmethod
+    def from_issue(cls, issue: Issue) -> "ArchivedIssue":
+        return cls(**{field: getattr(issue, field) for field in cls.COPIED_FIELDS})
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        from django.urls import reverse
+        return reverse('issue-detail', args=[str(self.id)])
+
+    class Meta:
+        verbose_name = _("Archived issue")
+        verbose_name_plural = _("Archived issues")
+
+
+class ArchivedIssueLabel(models.Model):
+    """Label of an archived issue.
+
+    The archive is partitioned on PostgreSQL, so there is no foreign key constraint to it.
+    """
+    issue = models.ForeignKey(
+        ArchivedIssue, verbose_name=_("Issue"), on_delete=models.CASCADE, db_constraint=False, related_name="+")
+    label = models.ForeignKey(Label, verbose_name=_("Label"), on_delete=models.CASCADE, related_name="+")
+
+    def __str__(self):
+        return "%s: %s" % (self.issue_id, self.label_id)
+
+    class Meta:
+        verbose_name = _("Archived issue label")
+        verbose_name_plural = _("Archived issue labels")
+        unique_together = ("issue", "label")
+
+
+class ArchiveTotals(models.Model):
+    """Precomputed statistics of the archived issues in one state, kept up to date by the archiving."""
+    state = models.CharField(choices=ISSUE_STATE_CHOICES, verbose_name=_("State"), max_length=4, unique=True)
+    count = models.PositiveIntegerField(verbose_name=_("Count"), default=0)
+    completed_count = models.PositiveIntegerField(
+        verbose_name=_("Completed count"), help_text=_("The number of issues with known completion time."),
+        default=0)
+    completed_total = models.DurationField(verbose_name=_("Completed in total"), default=timedelta())
+    completed_min = models.DurationField(verbose_name=_("Completed in at least"), blank=True, null=True)
+    completed_max = models.DurationField(verbose_name=_("Completed in at most"), blank=True, null=True)
+    breached_count = models.PositiveIntegerField(
+        verbose_name=_("Breached count"), help_text=_("The number of issues which missed an SLA deadline."),
+        default=0)
+
+    def add(self, issues: List[Issue]):
+        """Count the issues into the totals."""
+        self.count += len(issues)
+        self.breached_count += sum(1 for issue in issues if issue.sla_breached)
+        durations = [issue.completed_in for issue in issues if issue.completed_in is not None]
+        if durations:
+            self.completed_count += len(durations)
+            self.completed_total += sum(durations, timedelta())
+            self.completed_min = min(durations + [self.completed_min or durations[0]])
+            self.completed_max = max(durations + [self.completed_max or durations[0]])
+
+    def __str__(self):
+        return str(self.get_state_display())
+
+    class Meta:
+        verbose_name = _("Archive totals")
+        verbose_name_plural = _("Archive totals")
+
+
+class SolverWorkload(models.Model):
+    """Number of open issues of a solver, kept up to date by `tracker.assignment`."""
+    user = models.OneToOneField(
+        User, verbose_name=_("User"), on_delete=models.CASCADE, primary_key=True, related_name="workload")
+    open_issues = models.IntegerField(verbose_name=_("Open issues"), default=0)
+
+    def __str__(self):
+        return str(self.user)
+
+    class Meta:
+        verbose_name = _("Solver workload")
+        verbose_name_plural = _("Solver workloads")
+
+
+class IssueCounter(models.Model):
+    """Number of active issues with the state, category and solver, see `tracker.counters`.
+
+    Category and solver are stored as plain primary keys with 0 for none, so the combination is unique.
+    """
+    state = models.CharField(choices=ISSUE_STATE_CHOICES, verbose_name=_("State"), max_length=4)
+    category = models.IntegerField(
+        verbose_name=_("Category"), help_text=_("The primary key of the category, 0 for none."), default=0)
+    solver = models.IntegerField(
+        verbose_name=_("Solver"), help_text=_("The primary key of the solver, 0 for none."), default=0)
+    count = models.IntegerField(verbose_name=_("Count"), default=0)
+
+    def __str__(self):
+        return "%s %d %d: %d" % (self.state, self.category, self.solver, self.count)
+
+    class Meta:
+        verbose_name = _("Issue counter")
+        verbose_name_plural = _("Issue counters")
+        unique_together = ("state", "category", "solver")
+
+
+DEPENDENCY_CACHE_NAMESPACE = "dependencies"
+
+
+class IssueDependency(models.Model):
+    """Issue `blocked` waits for issue `blocker`, see `tracker.dependencies`."""
+    blocker = models.ForeignKey(
+        Issue, verbose_name=_("Blocker"), help_text=_("The issue which has to be closed first."),
+        on_delete=models.CASCADE, related_name="blocking")
+    blocked = models.ForeignKey(
+        Issue, verbose_name=_("Blocked"), help_text=_("The issue waiting for the blocker."),
+        on_delete=models.CASCADE, related_name="blocked_by")
+    created_at = models.DateTimeField(verbose_name=_("Created"), auto_now_add=True)
+
+    def __str__(self):
+        return "%s -> %s" % (self.blocker_id, self.blocked_id)
+
+    class Meta:
+        verbose_name = _("Issue dependency")
+        verbose_name_plural = _("Issue dependencies")
+        unique_together = ("blocker", "blocked")
+
+
+class ArchivedIssueDependency(models.Model):
+    """Dependency the archived issue had, the other issue may be active or archived."""
+    issue = models.ForeignKey(
+        ArchivedIssue, verbose_name=_("Issue"), on_delete=models.CASCADE, db_constraint=False,
+        related_name="dependencies")
+    blocker_id = models.IntegerField(verbose_name=_("Blocker"))
+    blocked_id = models.IntegerField(verbose_name=_("Blocked"))
+    created_at = models.DateTimeField(verbose_name=_("Created"))
+
+    def __str__(self):
+        return "%s -> %s" % (self.blocker_id, self.blocked_id)
+
+    class Meta:
+        verbose_name = _("Archived issue dependency")
+        verbose_name_plural = _("Archived issue dependencies")
+
+
+class IssueSignature(models.Model):
+    """MinHash signature of the name and description of an open issue, see `tracker.similarity`."""
+    issue = models.OneToOneField(
+        Issue, verbose_name=_("Issue"), on_delete=models.CASCADE, primary_key=True, related_name="signature")
+    minhash = models.BinaryField(verbose_name=_("MinHash"))
+
+    def __str__(self):
+        return str(self.issue_id)
+
+    class Meta:
+        verbose_name = _("Issue signature")
+        verbose_name_plural = _("Issue signatures")
+
+
+class IssueBand(models.Model):
+    """Locality sensitive hash of one band of the signature, similar issues share some buckets."""
+    issue = models.ForeignKey(Issue, verbose_name=_("Issue"), on_delete=models.CASCADE, related_name="bands")
+    bucket = models.BigIntegerField(verbose_name=_("Bucket"), db_index=True)
+
+    def __str__(self):
+        return "%s: %d" % (self.issue_id, self.bucket)
+
+    class Meta:
+        verbose_name = _("Issue band")
+        verbose_name_plural = _("Issue bands")
+
+
+class AttachmentBlob(models.Model):
+    """Content of attachments stored once however many attachments have it, see `tracker.attachments`."""
+    sha256 = models.CharField(verbose_name=_("SHA-256"), max_length=64, unique=True)
+    size = models.BigIntegerField(verbose_name=_("Size"))
+    file_name = models.CharField(
+        verbose_name=_("File name"), help_text=_("The name of the file in the attachment storage."), max_length=254)
+    created_at = models.DateTimeField(verbose_name=_("Created"), auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+    class Meta:
+        verbose_name = _("Attachment blob")
+        verbose_name_plural = _("Attachment blobs")
+
+
+class Attachment(models.Model):
+    """File attached to an active issue, or to an archived one when `issue` is None."""
+    issue = models.ForeignKey(
+        Issue, verbose_name=_("Issue"), null=True, blank=True, on_delete=models.CASCADE, related_name="attachments")
+    archived_issue = models.ForeignKey(
+        ArchivedIssue, verbose_name=_("Archived issue"), null=True, blank=True, on_delete=models.CASCADE,
+        db_constraint=False, related_name="attachments")
+    blob = models.ForeignKey(
+        AttachmentBlob, verbose_name=_("Blob"), on_delete=models.PROTECT, related_name="attachments")
+    category = models.ForeignKey(
+        IssueCategory, verbose_name=_("Category"), help_text=_("The category the size is charged to."),
+        null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    name = models.CharField(verbose_name=_("Name"), max_length=254)
+    content_type = models.CharField(verbose_name=_("Content type"), max_length=254)
+    size = models.BigIntegerField(verbose_name=_("Size"))
+    uploaded_by = models.ForeignKey(
+        User, verbose_name=_("Uploaded by"), null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    uploaded_at = models.DateTimeField(verbose_name=_("Uploaded"), auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("Attachment")
+        verbose_name_plural = _("Attachments")
+        ordering = ("uploaded_at", "pk")
+
+
+class IssueBitmap(models.Model):
+    """Set of issues with a label or a state, see `tracker.bitmaps`."""
+    key = models.CharField(verbose_name=_("Key"), max_length=64, unique=True)
+    version = models.UUIDField(
+        verbose_name=_("Version"), help_text=_("Changed with every change of the bitmap."), default=uuid.uuid4)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        verbose_name = _("Issue bitmap")
+        verbose_name_plural = _("Issue bitmaps")
+
+
+class IssueBitmapChunk(models.Model):
+    """Bits of issues with primary keys from `chunk` * 65536 of the bitmap."""
+    bitmap = models.ForeignKey(
+        IssueBitmap, verbose_name=_("Bitmap"), on_delete=models.CASCADE, related_name="chunks")
+    chunk = models.IntegerField(verbose_name=_("Chunk"))
+    bits = models.BinaryField(verbose_name=_("Bits"))
+
+    def __str__(self):
+        return "%s %d" % (self.bitmap_id, self.chunk)
+
+    class Meta:
+        verbose_name = _("Issue bitmap chunk")
+        verbose_name_plural = _("Issue bitmap chunks")
+        unique_together = ("bitmap", "chunk")
+
+
+SAVED_FILTER_CACHE_NAMESPACE = "saved-filters"
+
+
+class SavedFilter(models.Model):
+    """Named filter of the issue list of a user, see `tracker.savedfilters`."""
+    user = models.ForeignKey(User, verbose_name=_("User"), on_delete=models.CASCADE, related_name="saved_filters")
+    name = models.CharField(verbose_name=_("Name"), max_length=64)
+    query = models.TextField(
+        verbose_name=_("Query"), help_text=_("The conditions of the filter as canonical JSON."))
+    created_at = models.DateTimeField(verbose_name=_("Created"), auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("Saved filter")
+        verbose_name_plural = _("Saved filters")
+        unique_together = ("user", "name")
+        ordering = ("name", "pk")
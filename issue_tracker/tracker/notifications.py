@@ -0,0 +1,94 @@
+"""Notifications about issue changes delivered as digests.
+
+Changes are recorded as `Notification` rows per recipient. Once the oldest pending notification
+of a user is older than `TRACKER_NOTIFICATION_WINDOW` seconds, all their pending notifications
+are coalesced into one digest e-mail, so every user gets at most one e-mail per window.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Min
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .models import (
+    ISSUE_ASSIGNED, ISSUE_CREATED, NOTIFICATION_ASSIGNED, NOTIFICATION_SLA, NOTIFICATION_STATE,
+    Issue, Notification)
+
+
+def get_window() -> timedelta:
+    return timedelta(seconds=getattr(settings, "TRACKER_NOTIFICATION_WINDOW", 900))
+
+
+def record_notifications(notifications: Iterable[Notification], batch_size: int = None) -> int:
+    """Store notifications with bulk inserts, return their number."""
+    notifications = list(notifications)
+    Notification.objects.bulk_create(notifications, batch_size=batch_size)
+    return len(notifications)
+
+
+def issue_notifications(issue: Issue, changes: Dict[str, Tuple[Any, Any]], created: bool) -> List[Notification]:
+    """Return notifications for a change of the issue.
+
+    The new solver is notified about the assignment, the author and the solver about changes of state.
+    """
+    now = timezone.now()
+    notifications = []
+    recipients = {issue.created_by_id, issue.solver_id} - {None}
+    if issue.solver_id is not None and "solver_id" in changes:
+        notifications.append(Notification(
+            recipient_id=issue.solver_id, issue=issue, kind=NOTIFICATION_ASSIGNED, created_at=now))
+        if issue.state == ISSUE_ASSIGNED:
+            # the assignment already tells the new solver about the state
+            recipients.discard(issue.solver_id)
+    if "state" in changes and not created and issue.state != ISSUE_CREATED:
+        for recipient_id in recipients:
+            notifications.append(Notification(
+                recipient_id=recipient_id, issue=issue, kind=NOTIFICATION_STATE, state=issue.state, created_at=now))
+    return notifications
+
+
+def render_digest(user, notifications: List[Notification]) -> EmailMessage:
+    """Coalesce notifications of one user into one e-mail, only the last state of every issue is shown."""
+    issues = OrderedDict()
+    for notification in notifications:
+        entry = issues.setdefault(notification.issue_id, {"issue": notification.issue, "assigned": False,
+                                                          "state": None, "overdue": False})
+        if notification.kind == NOTIFICATION_ASSIGNED:
+            entry["assigned"] = True
+        elif notification.kind == NOTIFICATION_SLA:
+            entry["overdue"] = True
+        elif notification.kind == NOTIFICATION_STATE:
+            entry["state"] = notification.get_state_display()
+    context = {"user": user, "issues": list(issues.values()),
+               "base_url": getattr(settings, "TRACKER_BASE_URL", "")}
+    return EmailMessage(_("Issue tracker: changes in %d issues") % len(issues),
+                        render_to_string("tracker/email/digest.txt", context), to=[user.email])
+
+
+def send_digests(now=None, batch_size: int = 500) -> int:
+    """Send digests to users whose window elapsed, return number of the users.
+
+    Users without e-mail address are skipped, their notifications are marked as sent too.
+    """
+    now = now or timezone.now()
+    pending = Notification.objects.filter(sent_at__isnull=True)
+    recipients = list(pending.values("recipient_id").annotate(first=Min("created_at")).filter(
+        first__lte=now - get_window()).order_by().values_list("recipient_id", flat=True)[:batch_size])
+    if not recipients:
+        return 0
+
+    notifications = pending.filter(recipient_id__in=recipients, created_at__lte=now).select_related(
+        "recipient", "issue").order_by("recipient_id", "created_at", "pk")
+    grouped = OrderedDict()
+    for notification in notifications:
+        grouped.setdefault(notification.recipient_id, []).append(notification)
+
+    messages = [render_digest(items[0].recipient, items) for items in grouped.values() if items[0].recipient.email]
+    get_connection().send_messages(messages)
+    pending.filter(recipient_id__in=recipients, created_at__lte=now).update(sent_at=now)
+    return len(grouped)
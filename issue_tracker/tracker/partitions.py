@@ -0,0 +1,113 @@
+"""Monthly range partitions of the issue archive on PostgreSQL.
+
+Migration 0007 turns `tracker_archivedissue` into a table partitioned by `created_at` with
+a default partition catching rows of months without their own partition. Partitions are
+created after every migrate, before every archiving and by `manage.py partition_archive`.
+A new partition takes over the rows of its month from the default partition.
+
+`tracker_issue` itself isn't partitioned, the primary key of a partitioned table has to contain
+the partition key, so foreign keys to issues couldn't reference it. Closed issues, which are
+most of the rows, end up in the archive instead. Other databases keep a plain table.
+"""
+import re
+from datetime import datetime
+from typing import List, Optional
+
+from django.db import connections, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import ArchivedIssue, Issue
+
+TABLE = ArchivedIssue._meta.db_table
+DEFAULT_PARTITION = TABLE + "_default"
+
+
+def is_supported(using: str = "default") -> bool:
+    """Return whether the database supports default partitions and primary keys on partitioned tables."""
+    connection = connections[using]
+    return connection.vendor == "postgresql" and connection.pg_version >= 110000
+
+
+def is_partitioned(using: str = "default") -> bool:
+    if not is_supported(using):
+        return False
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return "%s_p%04d_%02d" % (TABLE, month.year, month.month)
+
+
+def get_partitions(using: str = "default") -> List[str]:
+    """Return names of all partitions including the default one."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid WHERE parent.relname = %s "
+            "ORDER BY child.relname", [TABLE])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(month: datetime, using: str = "default"):
+    """Create partition of the month and move its rows out of the default partition.
+
+    The default partition can't contain rows of a partition being created, so the table is
+    filled first and attached afterwards.
+    """
+    name, end = partition_name(month), add_months(month, 1)
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        cursor.execute("CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS)" % (name, TABLE))
+        cursor.execute(
+            "WITH moved AS (DELETE FROM %s WHERE created_at >= %%s AND created_at < %%s RETURNING *) "
+            "INSERT INTO %s SELECT * FROM moved" % (DEFAULT_PARTITION, name), [month, end])
+        # bounds have to be plain literals
+        cursor.execute("ALTER TABLE %s ATTACH PARTITION %s FOR VALUES FROM (%%s) TO (%%s)" % (TABLE, name),
+                       [month.isoformat(), end.isoformat()])
+
+
+def ensure_partitions(months_ahead: int = 3, now: Optional[datetime] = None, using: str = "default") -> List[str]:
+    """Create missing partitions from the oldest issue up to months_ahead, return names of the new ones.
+
+    Only active issues and the default partition are looked at, rows of other partitions already
+    have their partitions.
+    """
+    if not is_partitioned(using):
+        return []
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT MIN(created_at) FROM %s" % DEFAULT_PARTITION)
+        oldest_unpartitioned = cursor.fetchone()[0]
+    oldest = [value for value in (Issue.objects.using(using).aggregate(oldest=Min("created_at"))["oldest"],
+                                  oldest_unpartitioned) if value is not None]
+    now = now or timezone.now()
+    month = month_start(min(oldest + [now]))
+    last = add_months(month_start(now), months_ahead)
+
+    existing = set(get_partitions(using))
+    created = []
+    while month <= last:
+        if partition_name(month) not in existing:
+            create_partition(month, using)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def scanned_partitions(queryset) -> List[str]:
+    """Return partitions the query plan of the queryset reads, the ones pruned by the planner are missing."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    return sorted(set(re.findall(r"\b(%s_(?:p\d{4}_\d{2}|default))\b" % TABLE, plan)))
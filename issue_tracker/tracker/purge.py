@@ -0,0 +1,89 @@
+"""Purge of soft deleted issues and deactivated users in the background.
+
+Django's delete collector loads every related object into memory and deletes them one by one.
+Here the rows depending on the purged ones are deleted with plain set based DELETE statements
+in chunks, each chunk in its own transaction, following CASCADE and SET_NULL of the foreign
+keys. No signals are sent for the purged rows, active issues detached from purged rows are
+updated with `IssueQuerySet.update_tracked()`.
+"""
+from typing import List, Type
+
+from django.contrib.auth.models import User
+from django.db import connections, models, transaction
+from django.db.models.deletion import (
+    CASCADE, DO_NOTHING, SET_NULL, get_candidate_relations_to_delete)
+
+from .models import ISSUE_ASSIGNED, ISSUE_CREATED, Issue
+
+
+def delete_related(model: Type[models.Model], pks: List, chunk_size: int = 1000, using: str = "default"):
+    """Delete or detach rows referencing the rows of the model with given primary keys."""
+    for relation in get_candidate_relations_to_delete(model._meta):
+        field, related_model = relation.field, relation.related_model
+        related = related_model._base_manager.using(using).filter(**{"%s__in" % field.name: pks})
+        on_delete = field.remote_field.on_delete
+        if on_delete is CASCADE:
+            while True:
+                with transaction.atomic(using):
+                    related_pks = list(related.values_list("pk", flat=True)[:chunk_size])
+                    if not related_pks:
+                        break
+                    delete_rows(related_model, related_pks, chunk_size, using)
+        elif on_delete is SET_NULL:
+            if issubclass(related_model, Issue):
+                detach_issues(field, pks)
+            related.update(**{field.name: None})
+        elif on_delete is not DO_NOTHING:
+            raise ValueError("Purge of %s isn't supported." % field)
+
+
+def detach_issues(field: models.ForeignKey, pks: List):
+    """Clear the foreign key of active issues with the tracked updates, so their counters and pages follow.
+
+    Assigned issues losing their solver are new again, they are assigned by the next `assign_issues` task.
+    """
+    issues = Issue.objects.filter(**{"%s__in" % field.name: pks})
+    if field.name == "solver":
+        issues.filter(state=ISSUE_ASSIGNED).update_tracked({"solver_id": None, "state": ISSUE_CREATED})
+    issues.update_tracked({field.attname: None})
+
+
+def delete_rows(model: Type[models.Model], pks: List, chunk_size: int = 1000, using: str = "default") -> int:
+    """Delete rows of the model with given primary keys and the rows depending on them."""
+    delete_related(model, pks, chunk_size, using)
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM %s WHERE %s IN (%s)" % (
+            connection.ops.quote_name(model._meta.db_table), connection.ops.quote_name(model._meta.pk.column),
+            ", ".join(["%s"] * len(pks))), pks)
+        return cursor.rowcount
+
+
+def purge_issues(chunk_size: int = 1000) -> int:
+    """Delete soft deleted issues, return number of the issues."""
+    purged = 0
+    deleted = Issue.all_objects.filter(deleted_at__isnull=False).order_by("pk")
+    while True:
+        with transaction.atomic():
+            pks = list(deleted.values_list("pk", flat=True)[:chunk_size])
+            if not pks:
+                return purged
+            purged += delete_rows(Issue, pks, chunk_size)
+
+
+def purge_user(user_id: int, chunk_size: int = 1000) -> bool:
+    """Delete deactivated user, return whether the user was deleted.
+
+    Related rows are purged in chunks, so only the user itself is deleted by the collector.
+    Users activated again in the meantime are kept.
+    """
+    if not User.objects.filter(pk=user_id, is_active=False).exists():
+        return False
+    # issues of the user are hidden first, so they are published and uncounted as other deletes
+    issues = Issue.objects.filter(created_by_id=user_id).order_by("pk")
+    while Issue.objects.filter(pk__in=list(issues.values_list("pk", flat=True)[:chunk_size])).soft_delete():
+        pass
+    purge_issues(chunk_size)
+    delete_related(User, [user_id], chunk_size)
+    User.objects.filter(pk=user_id, is_active=False).delete()
+    return True
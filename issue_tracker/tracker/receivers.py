@@ -0,0 +1,357 @@
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .assignment import auto_assign, ensure_workloads, update_workloads, workload_delta
+from .attachments import release_usage
+from .backends import (
+    PERMISSION_CACHE_NAMESPACE, USER_CACHE_NAMESPACE, get_permission_cache_key, get_user_cache_key)
+from .bitmaps import clear_issues, label_key, state_key, update_bitmaps
+from .caching import bump_version
+from .counters import change_delta, delete_delta, move_counters, update_counters
+from .events import event_bus, issue_event_data
+from .models import (
+    CATEGORY_CACHE_NAMESPACE, DEPENDENCY_CACHE_NAMESPACE, ISSUE_ASSIGNED,
+    SAVED_FILTER_CACHE_NAMESPACE, Attachment, Issue, IssueBitmap, IssueCategory, IssueDependency,
+    Label, SavedFilter, SLAPolicy, bump_issues_version)
+from .notifications import issue_notifications, record_notifications
+from .partitions import ensure_partitions
+from .savedfilters import invalidate
+from .signals import issue_changed, issues_deleted, issues_updated
+from .similarity import OPEN_STATES, index_issues, unindex_issues
+from .sla import reschedule, schedule_issue
+from .tasks import purge_deleted_issues
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_permissions(sender, **kwargs):
+    """Invalidate cached permissions of all users."""
+    if kwargs.get("action", "post_").startswith("post_"):
+        bump_version(PERMISSION_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    """Drop the cached copy of the user and their permissions, which depend on the superuser flag.
+
+    Issue pages show the user names, so they are invalidated too unless only the last login changed.
+    """
+    cache.delete_many([get_user_cache_key(instance.pk), get_permission_cache_key(instance.pk)])
+    if update_fields is None or set(update_fields) != {"last_login"}:
+        bump_version(USER_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=IssueCategory)
+@receiver(post_delete, sender=IssueCategory)
+def invalidate_categories(sender, **kwargs):
+    """Invalidate pages showing categories."""
+    bump_version(CATEGORY_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+def invalidate_issues(sender, **kwargs):
+    """Invalidate the list of issues, set-based updates change the version by themselves."""
+    bump_issues_version()
+
+
+@receiver(issue_changed, sender=Issue)
+def count_issue_changed(sender, instance, changes, created, **kwargs):
+    """Move the issue between the counters of its old and new state, category and solver."""
+    update_counters(change_delta(instance, changes, created))
+
+
+@receiver(issues_updated, sender=Issue)
+def count_issues_updated(sender, instances, changes, **kwargs):
+    delta = Counter()
+    for instance in instances:
+        delta.update(change_delta(instance, changes[instance.pk]))
+    update_counters(delta)
+
+
+@receiver(post_delete, sender=Issue)
+@receiver(issues_deleted, sender=Issue)
+def count_issues_deleted(sender, instance=None, instances=(), **kwargs):
+    """Don't count deleted issues, soft deleted issues are counted once when they are hidden."""
+    if instance is not None:
+        instances = [instance] if instance.deleted_at is None else []
+    update_counters(delete_delta(instances))
+
+
+@receiver(post_delete, sender=IssueCategory)
+def count_category_deleted(sender, instance, **kwargs):
+    """Count issues of the deleted category as issues without category."""
+    move_counters("category", instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def count_solver_deleted(sender, instance, **kwargs):
+    """Count issues of the deleted solver as issues without solver."""
+    move_counters("solver", instance.pk)
+
+
+@receiver(issue_changed, sender=Issue)
+def count_workload_changed(sender, instance, changes, created, **kwargs):
+    """Update open issues counters of the old and the new solver."""
+    update_workloads(workload_delta(instance, changes))
+
+
+@receiver(issues_updated, sender=Issue)
+def count_workloads_updated(sender, instances, changes, **kwargs):
+    delta = Counter()
+    for instance in instances:
+        delta.update(workload_delta(instance, changes[instance.pk]))
+    update_workloads(delta)
+
+
+@receiver(post_delete, sender=Issue)
+@receiver(issues_deleted, sender=Issue)
+def count_workloads_deleted(sender, instance=None, instances=(), **kwargs):
+    """Don't count deleted open issues, soft deleted issues are counted once when they are hidden."""
+    if instance is not None:
+        instances = [instance] if instance.deleted_at is None else []
+    delta = Counter()
+    for issue in instances:
+        if issue.solver_id is not None and issue.state == ISSUE_ASSIGNED:
+            delta[issue.solver_id] -= 1
+    update_workloads(delta)
+
+
+@receiver(m2m_changed, sender=IssueCategory.solvers.through)
+def create_workloads(sender, instance, action, reverse, pk_set, **kwargs):
+    """Start counting open issues of new solvers."""
+    if action == "post_add":
+        ensure_workloads([instance.pk] if reverse else pk_set)
+
+
+def invalidate_dependencies(issue_ids):
+    """Invalidate pages showing dependencies of the issues."""
+    if IssueDependency.objects.filter(Q(blocker_id__in=issue_ids) | Q(blocked_id__in=issue_ids)).exists():
+        bump_version(DEPENDENCY_CACHE_NAMESPACE)
+
+
+@receiver(issue_changed, sender=Issue)
+def issue_changed_dependencies(sender, instance, changes, created, **kwargs):
+    if not created and ("state" in changes or "name" in changes):
+        invalidate_dependencies([instance.pk])
+
+
+@receiver(issues_updated, sender=Issue)
+@receiver(issues_deleted, sender=Issue)
+def issues_changed_dependencies(sender, instances, **kwargs):
+    invalidate_dependencies([instance.pk for instance in instances])
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted_dependencies(sender, instance, **kwargs):
+    """The dependencies were deleted together with the issue, so they can't be checked."""
+    bump_version(DEPENDENCY_CACHE_NAMESPACE)
+
+
+@receiver(issue_changed, sender=Issue)
+def index_issue_changed(sender, instance, changes, created, **kwargs):
+    """Keep open issues in the near-duplicate index, reopened issues are indexed again."""
+    if instance.state not in OPEN_STATES:
+        if "state" in changes:
+            unindex_issues([instance.pk])
+    elif created or "name" in changes or "description" in changes or (
+            "state" in changes and changes["state"][0] not in OPEN_STATES):
+        index_issues([instance])
+
+
+@receiver(issues_updated, sender=Issue)
+def unindex_issues_updated(sender, instances, changes, **kwargs):
+    closed = [instance.pk for instance in instances if instance.state not in OPEN_STATES]
+    if closed:
+        unindex_issues(closed)
+
+
+@receiver(issues_deleted, sender=Issue)
+def unindex_issues_deleted(sender, instances, **kwargs):
+    unindex_issues([instance.pk for instance in instances])
+
+
+@receiver(issue_changed, sender=Issue)
+def index_issue_state(sender, instance, changes, created, **kwargs):
+    """Move the issue to the bitmap of its new state."""
+    if created or "state" in changes:
+        delta = {state_key(instance.state): {instance.pk: True}}
+        if not created:
+            delta[state_key(changes["state"][0])] = {instance.pk: False}
+        update_bitmaps(delta)
+
+
+@receiver(issues_updated, sender=Issue)
+def index_issues_states(sender, instances, changes, **kwargs):
+    delta = defaultdict(dict)
+    for instance in instances:
+        if "state" in changes[instance.pk]:
+            old, new = changes[instance.pk]["state"]
+            delta[state_key(old)][instance.pk] = False
+            delta[state_key(new)][instance.pk] = True
+    update_bitmaps(delta)
+
+
+@receiver(issues_deleted, sender=Issue)
+def clear_issues_deleted(sender, instances, **kwargs):
+    clear_issues(instances)
+
+
+@receiver(pre_delete, sender=Issue)
+def clear_issue_deleted(sender, instance, **kwargs):
+    """The labels of the issue are deleted before post_delete, soft deleted issues were cleared already."""
+    if instance.deleted_at is None:
+        clear_issues([instance])
+
+
+@receiver(m2m_changed, sender=Issue.labels.through)
+def index_labels_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Set or clear bits of the issues in bitmaps of the added or removed labels."""
+    if action == "pre_clear":
+        pairs = list(sender.objects.filter(**{"label" if reverse else "issue": instance}).values_list(
+            "issue_id", "label_id"))
+    elif action in ("post_add", "post_remove"):
+        pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    else:
+        return
+    delta = defaultdict(dict)
+    for issue_id, label_id in pairs:
+        delta[label_key(label_id)][issue_id] = action == "post_add"
+    update_bitmaps(delta)
+    # the labels are shown on the list and detail pages
+    Issue.objects.filter(pk__in={issue_id for issue_id, _label_id in pairs}).update()
+
+
+@receiver(pre_delete, sender=Label)
+def unindex_label(sender, instance, **kwargs):
+    Issue.objects.filter(labels=instance).update()
+    IssueBitmap.objects.filter(key=label_key(instance.pk)).delete()
+
+
+@receiver(issue_changed, sender=Issue)
+def schedule_issue_changed(sender, instance, changes, created, **kwargs):
+    """Move the SLA deadline of the issue to the target of its new state or category."""
+    if created or "state" in changes or "category_id" in changes:
+        schedule_issue(instance)
+
+
+@receiver(issues_updated, sender=Issue)
+def schedule_issues_updated(sender, instances, changes, **kwargs):
+    pks = [instance.pk for instance in instances if "state" in changes[instance.pk]]
+    if pks:
+        reschedule(Issue.objects.filter(pk__in=pks))
+
+
+@receiver(post_save, sender=SLAPolicy)
+@receiver(post_delete, sender=SLAPolicy)
+def reschedule_policy_changed(sender, instance, **kwargs):
+    """Recompute deadlines of the issues of the category, issues of a deleted category have none now."""
+    reschedule(Issue.objects.filter(
+        Q(category_id=instance.category_id) | Q(category__isnull=True, due_at__isnull=False)))
+
+
+@receiver(issue_changed, sender=Issue)
+def invalidate_filters_changed(sender, instance, changes, created, **kwargs):
+    """Drop cached results of the saved filters the issue matched before or matches after the change."""
+    fields = ("state", "solver_id", "category_id")
+    if created or any(field in changes for field in fields):
+        rows = [tuple(getattr(instance, field) for field in fields)]
+        if not created:
+            rows.append(tuple(changes.get(field, (getattr(instance, field), None))[0] for field in fields))
+        invalidate(rows)
+
+
+@receiver(issues_updated, sender=Issue)
+def invalidate_filters_updated(sender, instances, changes, **kwargs):
+    rows = []
+    for instance in instances:
+        if changes[instance.pk]:
+            rows.append((instance.state, instance.solver_id, instance.category_id))
+            rows.append(tuple(changes[instance.pk].get(field, (getattr(instance, field), None))[0]
+                              for field in ("state", "solver_id", "category_id")))
+    invalidate(rows)
+
+
+@receiver(issues_deleted, sender=Issue)
+def invalidate_filters_deleted(sender, instances, **kwargs):
+    invalidate((instance.state, instance.solver_id, instance.category_id) for instance in instances)
+
+
+@receiver(post_delete, sender=Issue)
+def invalidate_filters_removed(sender, instance, **kwargs):
+    """Archived issues leave the filters, soft deleted ones left them already."""
+    if instance.deleted_at is None:
+        invalidate([(instance.state, instance.solver_id, instance.category_id)])
+
+
+@receiver(post_save, sender=SavedFilter)
+@receiver(post_delete, sender=SavedFilter)
+def invalidate_saved_filters(sender, **kwargs):
+    bump_version(SAVED_FILTER_CACHE_NAMESPACE)
+
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_usage(sender, instance, **kwargs):
+    release_usage(instance)
+
+
+@receiver(issue_changed, sender=Issue)
+def publish_issue_changed(sender, instance, changes, created, **kwargs):
+    """Publish the change to the live list and detail pages."""
+    event_bus.publish(issue_event_data(instance, changes))
+
+
+@receiver(issue_changed, sender=Issue)
+def notify_issue_changed(sender, instance, changes, created, **kwargs):
+    """Record notifications for the next digests of the involved users."""
+    record_notifications(issue_notifications(instance, changes, created))
+
+
+@receiver(issues_updated, sender=Issue)
+def issues_updated_changed(sender, instances, changes, **kwargs):
+    """Publish the changes and record notifications for all the issues at once."""
+    notifications = []
+    for instance in instances:
+        if changes[instance.pk]:
+            event_bus.publish(issue_event_data(instance, changes[instance.pk]))
+            notifications.extend(issue_notifications(instance, changes[instance.pk], False))
+    record_notifications(notifications)
+
+
+@receiver(post_delete, sender=Issue)
+def publish_issue_deleted(sender, instance, **kwargs):
+    """Publish the delete to the live list and detail pages, archived issues are still shown."""
+    if not instance.archived:
+        event_bus.publish(issue_event_data(instance, (), deleted=True))
+
+
+@receiver(issues_deleted, sender=Issue)
+def purge_issues_deleted(sender, instances, **kwargs):
+    """Publish the deletes to the live pages and purge the rows in the background."""
+    for instance in instances:
+        event_bus.publish(issue_event_data(instance, (), deleted=True))
+    purge_deleted_issues.enqueue()
+
+
+@receiver(post_migrate)
+def create_partitions(sender, using, **kwargs):
+    """Create partitions of the archive for the upcoming months."""
+    if sender.name == "tracker":
+        ensure_partitions(using=using)
+
+
+# Connected last, so the creation is published and recorded before the assignment.
+@receiver(issue_changed, sender=Issue)
+def assign_created(sender, instance, changes, created, **kwargs):
+    """Assign new issue to the least busy solver of its category."""
+    if created:
+        auto_assign(instance)
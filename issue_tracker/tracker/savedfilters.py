@@ -0,0 +1,155 @@
+"""Saved filters of the issue list.
+
+The conditions of a filter are stored as canonical JSON, so equal filters of different users have
+the same text and share one cache entry with the number of matching issues and the primary keys
+of the first page. A committed issue change drops only the entries of filters whose state, solver
+and category conditions match the issue before or after the change, the others stay valid. Filters
+of issues created in the last days are cached per day. Changes bypassing the signals are picked up
+after `TRACKER_SAVED_FILTER_TIMEOUT` seconds.
+"""
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import get_version
+from .models import ISSUE_STATE_CHOICES, SAVED_FILTER_CACHE_NAMESPACE, IssueQuerySet, SavedFilter
+
+# state, solver and category of an issue
+IssueRow = Tuple[str, Optional[int], Optional[int]]
+
+
+def get_timeout() -> int:
+    return getattr(settings, "TRACKER_SAVED_FILTER_TIMEOUT", 3600)
+
+
+def canonical_query(conditions: Dict[str, Any]) -> str:
+    """Return canonical JSON of the filter conditions, raise ValueError for invalid conditions.
+
+    Known conditions are `state` (list of states), `solver` and `category` (primary key, None for
+    none) and `created_days` (issues created today and the days before).
+    """
+    canonical = {}
+    for name, value in conditions.items():
+        if name == "state":
+            states = sorted(set(value))
+            if not states or any(state not in dict(ISSUE_STATE_CHOICES) for state in states):
+                raise ValueError("Invalid states %s." % value)
+            canonical[name] = states
+        elif name in ("solver", "category"):
+            canonical[name] = None if value is None else int(value)
+        elif name == "created_days":
+            if int(value) < 1:
+                raise ValueError("Invalid number of days %s." % value)
+            canonical[name] = int(value)
+        else:
+            raise ValueError("Unknown condition %s." % name)
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+
+
+def created_after(days: int, today: date) -> datetime:
+    """Return start of the first of the days ending today in the current time zone."""
+    return timezone.make_aware(datetime.combine(today - timedelta(days=days - 1), time()))
+
+
+def get_condition(query: str, today: date) -> Q:
+    """Return condition of the issues matching the canonical query."""
+    conditions = json.loads(query)
+    condition = Q()
+    if "state" in conditions:
+        condition &= Q(state__in=conditions["state"])
+    for name in ("solver", "category"):
+        if name in conditions:
+            condition &= Q(**{"%s_id" % name: conditions[name]}) if conditions[name] is not None else \
+                Q(**{"%s__isnull" % name: True})
+    if "created_days" in conditions:
+        condition &= Q(created_at__gte=created_after(conditions["created_days"], today))
+    return condition
+
+
+def matches(conditions: Dict[str, Any], row: IssueRow) -> bool:
+    """Return whether an issue with the state, solver and category can match the conditions."""
+    state, solver_id, category_id = row
+    return (state in conditions.get("state", [state]) and conditions.get("solver", solver_id) == solver_id and
+            conditions.get("category", category_id) == category_id)
+
+
+def cache_key(query: str, today: date) -> str:
+    key = "tracker:saved-filter:%s" % hashlib.sha1(query.encode()).hexdigest()
+    return "%s:%s" % (key, today.isoformat()) if "created_days" in json.loads(query) else key
+
+
+def get_results(queryset: IssueQuerySet, queries: Iterable[str], page_size: int) -> Dict[str, Dict[str, Any]]:
+    """Return number of the matching issues and primary keys of their first page by the queries.
+
+    Only results missing in the cache are read from the queryset.
+    """
+    today = timezone.localdate()
+    keys = {cache_key(query, today): query for query in set(queries)}
+    cached = cache.get_many(list(keys))
+    results = {keys[key]: value for key, value in cached.items()}
+    for key, query in keys.items():
+        if key not in cached:
+            matching = queryset.filter(get_condition(query, today)).order_by("pk")
+            results[query] = {"count": matching.count(),
+                              "ids": list(matching.values_list("pk", flat=True)[:page_size])}
+            cache.set(key, results[query], get_timeout())
+    return results
+
+
+def get_queries() -> List[str]:
+    """Return distinct queries of all saved filters, cached until any filter changes."""
+    key = "tracker:saved-filter-queries:%d" % get_version(SAVED_FILTER_CACHE_NAMESPACE)
+    queries = cache.get(key)
+    if queries is None:
+        queries = list(SavedFilter.objects.values_list("query", flat=True).distinct().order_by())
+        cache.set(key, queries, get_timeout())
+    return queries
+
+
+def invalidate(rows: Iterable[IssueRow]):
+    """Drop cached results of the saved filters which issues with any of the rows can match.
+
+    The results are dropped once the current transaction is committed, so a concurrent request
+    can't cache them again from the data before the change.
+    """
+    rows = set(rows)
+    if rows:
+        transaction.on_commit(lambda: delete_results(rows))
+
+
+def delete_results(rows: Iterable[IssueRow]):
+    today = timezone.localdate()
+    cache.delete_many([cache_key(query, today) for query in get_queries()
+                       if any(matches(json.loads(query), row) for row in rows)])
+
+
+class SavedFilterIssueList(object):
+    """Issues of a saved filter for `Paginator`, the first page and the count are read from the cache."""
+
+    def __init__(self, queryset: IssueQuerySet, query: str, page_size: int):
+        self.result = get_results(queryset, [query], page_size)[query]
+        self.queryset = queryset.filter(get_condition(query, timezone.localdate()))
+        self.model = queryset.model
+        self.page_size = page_size
+
+    def count(self) -> int:
+        return self.result["count"]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step is not None:
+            raise TypeError("Only slices without step are supported.")
+        if (item.start or 0) == 0 and item.stop is not None and item.stop <= self.page_size:
+            pks = self.result["ids"][:item.stop]
+            issues = self.queryset.in_bulk(pks)
+            return [issues[pk] for pk in pks if pk in issues]
+        return list(self.queryset[item])
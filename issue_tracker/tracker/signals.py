@@ -0,0 +1,14 @@
+from django.dispatch import Signal
+
+# Sent after an issue is created or any of Issue.TRACKED_FIELDS is changed by Issue.save().
+# `changes` maps the changed fields to (old value, new value) tuples.
+issue_changed = Signal(providing_args=["instance", "changes", "created"])
+
+# Sent after IssueQuerySet.soft_delete() hid the issues, `instances` have only
+# pk, state, solver_id and category_id loaded.
+issues_deleted = Signal(providing_args=["instances"])
+
+# Sent after a set based update of tracked fields by IssueQuerySet, `instances` have the new values
+# of pk, state, created_by_id, solver_id and category_id, `changes` maps their primary keys to
+# changes as in issue_changed.
+issues_updated = Signal(providing_args=["instances", "changes"])
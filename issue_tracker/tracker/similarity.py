@@ -0,0 +1,139 @@
+"""Near-duplicate detection of open issues.
+
+Name and description of every open issue are split into character shingles and summarized by
+a MinHash signature, the share of equal positions of two signatures estimates the Jaccard
+similarity of their shingles. Signatures are split into bands and every band is hashed into
+an `IssueBand` bucket (locality sensitive hashing), so only issues sharing a bucket are
+compared and a lookup reads a few index entries however many issues there are.
+
+The index is updated on every save changing the text, closed and deleted issues are removed.
+`manage.py rebuild_similarity` builds it from scratch in bulk.
+"""
+import random
+import re
+import struct
+import zlib
+from hashlib import blake2b
+from typing import Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import ISSUE_ASSIGNED, ISSUE_CREATED, Issue, IssueBand, IssueSignature
+
+OPEN_STATES = (ISSUE_CREATED, ISSUE_ASSIGNED)
+
+SHINGLE_SIZE = 5
+# Longer texts are cut, the beginning tells duplicates apart well enough.
+MAX_TEXT_LENGTH = 1000
+
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+SIGNATURE_FORMAT = "<%dI" % NUM_PERM
+
+# Candidates sharing most buckets with the text which are compared by their signatures.
+MAX_CANDIDATES = 100
+
+_PRIME = (1 << 61) - 1
+_random = random.Random(4711)
+PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def get_threshold() -> float:
+    return getattr(settings, "TRACKER_SIMILARITY_THRESHOLD", 0.5)
+
+
+def shingles(name: str, description: str = "") -> set:
+    """Return hashes of character shingles of the normalized text."""
+    text = " ".join(re.findall(r"\w+", ("%s %s" % (name, description or "")).lower()))[:MAX_TEXT_LENGTH]
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode())}
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(name: str, description: str = "") -> List[int]:
+    """Return MinHash signature of the text."""
+    hashes = shingles(name, description)
+    return [min([(a * value + b) % _PRIME for value in hashes]) & 0xffffffff for a, b in PERMUTATIONS]
+
+
+def buckets(minhash: Sequence[int]) -> List[int]:
+    """Return buckets of all bands of the signature as signed 64 bit integers."""
+    return [int.from_bytes(blake2b(struct.pack("<H%dI" % ROWS, band, *minhash[band * ROWS:(band + 1) * ROWS]),
+                                   digest_size=8).digest(), "little", signed=True) for band in range(BANDS)]
+
+
+def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Return estimated Jaccard similarity of texts with the signatures."""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def index_issues(issues: Iterable[Issue]) -> int:
+    """Replace signatures and buckets of the issues, return number of the issues."""
+    signatures, bands = [], []
+    for issue in issues:
+        minhash = signature(issue.name, issue.description)
+        signatures.append(IssueSignature(issue_id=issue.pk, minhash=struct.pack(SIGNATURE_FORMAT, *minhash)))
+        bands.extend(IssueBand(issue_id=issue.pk, bucket=bucket) for bucket in buckets(minhash))
+    with transaction.atomic():
+        unindex_issues([item.issue_id for item in signatures])
+        IssueSignature.objects.bulk_create(signatures)
+        IssueBand.objects.bulk_create(bands)
+    return len(signatures)
+
+
+def unindex_issues(pks: List[int]):
+    """Remove the issues from the index."""
+    IssueBand.objects.filter(issue_id__in=pks).delete()
+    IssueSignature.objects.filter(issue_id__in=pks).delete()
+
+
+def rebuild_index(batch_size: int = 1000) -> int:
+    """Index all open issues from scratch in batches, return number of the issues."""
+    IssueBand.objects.all().delete()
+    IssueSignature.objects.all().delete()
+    indexed, last_pk = 0, 0
+    while True:
+        issues = list(Issue.objects.filter(pk__gt=last_pk, state__in=OPEN_STATES).order_by("pk").only(
+            "pk", "name", "description")[:batch_size])
+        if not issues:
+            return indexed
+        last_pk = issues[-1].pk
+        indexed += index_issues(issues)
+
+
+def find_similar(name: str, description: str = "", limit: int = 5, exclude: Optional[int] = None,
+                 threshold: Optional[float] = None) -> List[Issue]:
+    """Return up to limit open issues most similar to the text.
+
+    The issues have only id, name and state loaded and attribute `similarity` with the estimated
+    Jaccard similarity, at least threshold.
+    """
+    threshold = get_threshold() if threshold is None else threshold
+    minhash = signature(name, description)
+    candidates = IssueBand.objects.filter(bucket__in=buckets(minhash))
+    if exclude is not None:
+        candidates = candidates.exclude(issue_id=exclude)
+    candidates = candidates.values("issue_id").annotate(matches=Count("pk")).order_by("-matches", "issue_id")
+    candidate_pks = [row["issue_id"] for row in candidates[:MAX_CANDIDATES]]
+    if not candidate_pks:
+        return []
+
+    scores = {}
+    for issue_id, stored in IssueSignature.objects.filter(issue_id__in=candidate_pks).values_list(
+            "issue_id", "minhash"):
+        score = similarity(minhash, struct.unpack(SIGNATURE_FORMAT, bytes(stored)))
+        if score >= threshold:
+            scores[issue_id] = score
+    best = sorted(scores, key=lambda issue_id: (-scores[issue_id], issue_id))[:limit]
+    if not best:
+        return []
+    issues = Issue.objects.filter(pk__in=best, state__in=OPEN_STATES).only("pk", "name", "state").in_bulk()
+    similar = []
+    for issue_id in best:
+        if issue_id in issues:
+            issues[issue_id].similarity = scores[issue_id]
+            similar.append(issues[issue_id])
+    return similar
@@ -0,0 +1,98 @@
+"""Service level deadlines of issues.
+
+`SLAPolicy` of a category sets the time in which its new issues have to be assigned (response)
+and closed (resolution). Every open issue of such category gets the next deadline it has to meet
+in `due_at`, which is recomputed whenever its state or category or the policy changes.
+
+The `tracker.scan_sla` task, enqueued by the workers every minute, and `manage.py scan_sla`
+escalate the missed deadlines: the solver of the issue, or the solvers of its category when it's
+unassigned, are notified with the next digest. Issues waiting for the escalation are read from
+the index on (`sla_escalated_at`, `due_at`) as one range ordered by the deadline, so a scan never
+reads issues which are on time or escalated already. An issue missing its response deadline is
+escalated once, its resolution deadline is checked after the assignment.
+"""
+from datetime import datetime
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (
+    ISSUE_ASSIGNED, ISSUE_CREATED, NOTIFICATION_SLA, Issue, IssueCategory, IssueQuerySet,
+    Notification, SLAPolicy)
+from .notifications import record_notifications
+
+OPEN_STATES = (ISSUE_CREATED, ISSUE_ASSIGNED)
+
+
+def get_due_at(issue: Issue, policy: Optional[SLAPolicy]) -> Optional[datetime]:
+    """Return the next deadline of the issue under the policy of its category."""
+    if policy is None or issue.state not in OPEN_STATES:
+        return None
+    target = policy.get_target(issue.state)
+    return None if target is None else issue.created_at + target
+
+
+def schedule_issue(issue: Issue):
+    """Set the next deadline of the saved issue and reset its escalation."""
+    policy = SLAPolicy.objects.filter(category_id=issue.category_id).first() if issue.category_id else None
+    due_at = get_due_at(issue, policy)
+    if due_at != issue.due_at or issue.sla_escalated_at is not None:
+        # the modification time was just set by the save
+        Issue.all_objects.filter(pk=issue.pk).update(
+            due_at=due_at, sla_escalated_at=None, updated_at=issue.updated_at)
+        issue.due_at, issue.sla_escalated_at = due_at, None
+
+
+def reschedule(issues: IssueQuerySet) -> int:
+    """Recompute deadlines of the issues with set based updates and reset their escalations.
+
+    Return number of the updated issues.
+    """
+    categories = set(issues.filter(state__in=OPEN_STATES).values_list("category_id", flat=True).distinct())
+    policies = list(SLAPolicy.objects.filter(category_id__in=categories - {None}))
+    updated = issues.exclude(state__in=OPEN_STATES, category_id__in=[policy.category_id for policy in policies]) \
+        .filter(due_at__isnull=False).update(due_at=None, sla_escalated_at=None)
+    for policy in policies:
+        for state in OPEN_STATES:
+            target = policy.get_target(state)
+            updated += issues.filter(category_id=policy.category_id, state=state).update(
+                due_at=None if target is None else F("created_at") + target, sla_escalated_at=None)
+    return updated
+
+
+def escalation_notifications(issues: list, now: datetime) -> list:
+    """Return notifications about the missed deadlines for solvers of the issues or their categories."""
+    category_solvers = {}
+    for category_id, user_id in IssueCategory.solvers.through.objects.filter(issuecategory_id__in={
+            issue.category_id for issue in issues if issue.solver_id is None}).values_list(
+            "issuecategory_id", "user_id"):
+        category_solvers.setdefault(category_id, []).append(user_id)
+    return [Notification(recipient_id=recipient_id, issue=issue, kind=NOTIFICATION_SLA, created_at=now)
+            for issue in issues
+            for recipient_id in ([issue.solver_id] if issue.solver_id else category_solvers.get(issue.category_id, []))]
+
+
+def escalate_batch(now: datetime, batch_size: int = 500) -> int:
+    """Escalate one batch of issues which missed their deadline before now, return number of the issues."""
+    with transaction.atomic():
+        issues = list(Issue.objects.select_for_update().filter(
+            sla_escalated_at__isnull=True, due_at__lte=now).order_by("due_at").only(
+            "pk", "solver_id", "category_id")[:batch_size])
+        if not issues:
+            return 0
+        Issue.objects.filter(pk__in=[issue.pk for issue in issues]).update(sla_escalated_at=now, sla_breached=True)
+        record_notifications(escalation_notifications(issues, now))
+    return len(issues)
+
+
+def scan_sla(now: Optional[datetime] = None, batch_size: int = 500) -> int:
+    """Escalate all issues which missed their deadline, return number of the issues."""
+    now = now or timezone.now()
+    escalated = 0
+    while True:
+        batch = escalate_batch(now, batch_size)
+        if not batch:
+            return escalated
+        escalated += batch
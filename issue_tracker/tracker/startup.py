@@ -0,0 +1,83 @@
+"""Measure how long the project takes to boot.
+
+This module must not import Django at module level, the probe is executed in
+a fresh interpreter so that the imports are measured cold.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Dict
+
+
+def _ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 3)
+
+
+def probe() -> Dict:
+    """Boot Django and return timings in milliseconds."""
+    started = time.perf_counter()
+    import django
+    from django.apps.config import AppConfig
+    from django.conf import settings
+
+    settings.INSTALLED_APPS  # force loading of the settings module
+    settings_loaded = time.perf_counter()
+
+    apps = OrderedDict()
+    original_create = AppConfig.create.__func__
+    original_import_models = AppConfig.import_models
+
+    def timed_create(cls, entry):
+        start = time.perf_counter()
+        app_config = original_create(cls, entry)
+        apps[app_config.label] = OrderedDict(
+            [("app", app_config.label), ("entry", entry), ("import", _ms(start, time.perf_counter())),
+             ("models", 0.0), ("ready", 0.0)])
+        original_ready = app_config.ready
+
+        def timed_ready():
+            ready_start = time.perf_counter()
+            original_ready()
+            apps[app_config.label]["ready"] = _ms(ready_start, time.perf_counter())
+
+        app_config.ready = timed_ready
+        return app_config
+
+    def timed_import_models(self, *args, **kwargs):
+        start = time.perf_counter()
+        original_import_models(self, *args, **kwargs)
+        apps[self.label]["models"] = _ms(start, time.perf_counter())
+
+    AppConfig.create = classmethod(timed_create)
+    AppConfig.import_models = timed_import_models
+    try:
+        django.setup()
+    finally:
+        AppConfig.create = classmethod(original_create)
+        AppConfig.import_models = original_import_models
+    setup_done = time.perf_counter()
+
+    from django.core.handlers.wsgi import WSGIHandler
+    WSGIHandler()
+    wsgi_done = time.perf_counter()
+
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    urls_done = time.perf_counter()
+
+    for app in apps.values():
+        app["total"] = round(app["import"] + app["models"] + app["ready"], 3)
+
+    return OrderedDict([
+        ("settings", _ms(started, settings_loaded)),
+        ("apps", list(apps.values())),
+        ("setup", _ms(settings_loaded, setup_done)),
+        ("wsgi", _ms(setup_done, wsgi_done)),
+        ("urls", _ms(wsgi_done, urls_done)),
+        ("total", _ms(started, urls_done)),
+    ])
+
+
+def main():
+    """Entry point of the probe process, prints timings as JSON."""
+    print(json.dumps(probe()))
@@ -0,0 +1,50 @@
+import gzip
+import os
+from typing import Iterable
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage which also stores gzip and brotli compressed copies of the files.
+
+    The copies are written next to the files as `<name>.gz` and `<name>.br` by `collectstatic`
+    and served by `tracker.middleware.StaticFilesMiddleware`. Brotli is used only when the
+    `brotli` package is installed.
+    """
+
+    compress_extensions = (".css", ".js", ".map", ".json", ".svg", ".txt", ".html", ".xml", ".eot", ".ttf", ".otf")
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.compress_files(set(paths) | set(self.hashed_files.values()))
+
+    def compress_files(self, names: Iterable[str]):
+        """Store compressed copies of the files which are worth it."""
+        for name in names:
+            if not name.endswith(self.compress_extensions):
+                continue
+            path = self.path(name)
+            with open(path, "rb") as f:
+                content = f.read()
+            if len(content) < self.compress_min_size:
+                continue
+            self.write_compressed(path + ".gz", content, gzip.compress(content, compresslevel=9))
+            if brotli is not None:
+                self.write_compressed(path + ".br", content, brotli.compress(content))
+
+    @staticmethod
+    def write_compressed(path: str, content: bytes, compressed: bytes):
+        """Write compressed copy only if it is smaller than the original."""
+        if len(compressed) < len(content):
+            with open(path, "wb") as f:
+                f.write(compressed)
+        elif os.path.exists(path):
+            os.remove(path)
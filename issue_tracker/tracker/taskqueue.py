@@ -0,0 +1,212 @@
+"""Durable background tasks stored in the database.
+
+Register a task with the `task` decorator and enqueue it from anywhere::
+
+    @task(max_attempts=3)
+    def reindex_issue(issue_id):
+        ...
+
+    reindex_issue.enqueue(issue.pk)
+
+The task row is inserted in the current transaction, so workers (`manage.py run_tracker_worker`)
+see it only after the transaction commits and never if it is rolled back. Workers claim tasks
+in batches with SELECT ... FOR UPDATE SKIP LOCKED, databases without it (SQLite) fall back to
+a conditional UPDATE. On Postgres the claims of tasks with a concurrency limit are serialized
+by advisory locks of their names, so two workers never count the same free slot. Failing tasks
+are retried with exponential backoff, tasks of workers which died are run again until they run
+out of attempts. A worker is considered dead once the lock of its task expires, the lock is
+renewed for the `timeout` of the task when it starts. Tasks registered with an `interval` are
+enqueued by the workers periodically.
+"""
+import json
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, QuerySet
+from django.utils import timezone
+
+from .models import TASK_FAILED, TASK_PENDING, TASK_RUNNING, Task
+
+logger = logging.getLogger(__name__)
+
+
+class TaskDefinition(NamedTuple):
+    name: str
+    func: Callable
+    max_attempts: int
+    retry_delay: int
+    concurrency: Optional[int]
+    interval: Optional[int]
+    timeout: Optional[int]
+
+
+registry = {}  # type: Dict[str, TaskDefinition]
+
+
+def enqueue(name: str, *args, run_at=None, **kwargs) -> Task:
+    """Store task to be run by a worker once the current transaction commits."""
+    if name not in registry:
+        raise KeyError("Task %r is not registered." % name)
+    return Task.objects.create(name=name, arguments=json.dumps({"args": args, "kwargs": kwargs}),
+                               run_at=run_at or timezone.now())
+
+
+def task(name: str = None, max_attempts: int = 5, retry_delay: int = 10, concurrency: int = None,
+         interval: int = None, timeout: int = None) -> Callable:
+    """Register function as a background task.
+
+    :param name: name of the task, defaults to the module and name of the function
+    :param max_attempts: number of runs before the task is marked as failed
+    :param retry_delay: seconds before the first retry, the delay doubles with every attempt
+    :param concurrency: maximal number of the tasks running at the same time in all workers,
+                        checked when the workers claim tasks
+    :param interval: seconds between runs of a task without arguments enqueued by the workers,
+                     see `Worker.schedule_periodic`
+    :param timeout: seconds the task may run before other workers consider its worker dead,
+                    defaults to `Worker.lock_timeout`
+    """
+    def decorator(func: Callable) -> Callable:
+        task_name = name or "%s.%s" % (func.__module__, func.__name__)
+        registry[task_name] = TaskDefinition(
+            task_name, func, max_attempts, retry_delay, concurrency, interval, timeout)
+        func.enqueue = lambda *args, **kwargs: enqueue(task_name, *args, **kwargs)
+        return func
+    return decorator
+
+
+def lock_names(names: Iterable[str]):
+    """Take Postgres advisory locks of the names, held until the current transaction ends.
+
+    The locks are taken in sorted order, so workers locking several names don't deadlock.
+    Other databases don't support the locks, there it does nothing.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for name in sorted(set(names)):
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [name])
+
+
+class Worker(object):
+    """Claim and run tasks in batches."""
+
+    def __init__(self, batch_size: int = 10, lock_timeout: int = 300, schedule_interval: int = 10):
+        self.batch_size = batch_size
+        self.lock_timeout = lock_timeout
+        self.schedule_interval = schedule_interval
+        self.scheduled_at = None
+
+    @staticmethod
+    def get_runnable(now) -> QuerySet:
+        """Return pending tasks which should run and tasks of workers which died."""
+        return Task.objects.filter(
+            Q(state=TASK_PENDING, run_at__lte=now) | Q(state=TASK_RUNNING, locked_until__lte=now)
+        ).order_by("run_at")
+
+    def get_free_slots(self, now) -> Dict[str, int]:
+        """Return how many more tasks with concurrency limit can be started."""
+        limited = {name: d.concurrency for name, d in registry.items() if d.concurrency is not None}
+        if not limited:
+            return {}
+        running = dict(Task.objects.filter(state=TASK_RUNNING, locked_until__gt=now, name__in=limited).values_list(
+            "name").annotate(Count("pk")).order_by())
+        return {name: limit - running.get(name, 0) for name, limit in limited.items()}
+
+    def select(self, candidates: List[tuple], now) -> List[int]:
+        """Pick ids of tasks to claim from (id, name) candidates respecting concurrency limits."""
+        slots = self.get_free_slots(now)
+        selected = []
+        for pk, name in candidates:
+            if name in slots:
+                if slots[name] <= 0:
+                    continue
+                slots[name] -= 1
+            selected.append(pk)
+            if len(selected) == self.batch_size:
+                break
+        return selected
+
+    def claim(self) -> List[Task]:
+        """Lock a batch of tasks for this worker."""
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        runnable = self.get_runnable(now)
+        # Look further than one batch, so tasks over their concurrency limit don't block others.
+        limit = self.batch_size * 4
+        with transaction.atomic():
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = list(runnable.select_for_update(skip_locked=True).values_list("pk", "name")[:limit])
+                claimable = Task.objects.all()
+            else:
+                candidates = list(runnable.values_list("pk", "name")[:limit])
+                claimable = runnable
+            # running tasks are counted under the locks, so no other worker takes the same slots meanwhile
+            lock_names(name for _, name in candidates if name in registry and registry[name].concurrency is not None)
+            claimed = claimable.filter(pk__in=self.select(candidates, now))
+            # the attempt is counted right away, so tasks killing their workers fail eventually too
+            claimed.update(state=TASK_RUNNING, locked_by=token, attempts=F("attempts") + 1,
+                           locked_until=now + timedelta(seconds=self.lock_timeout))
+        return list(Task.objects.filter(locked_by=token, state=TASK_RUNNING).order_by("run_at"))
+
+    def run_task(self, task: Task):
+        """Run the task, delete it when it succeeds or schedule a retry.
+
+        Tasks run in autocommit mode, long tasks commit their work in batches by themselves.
+        The lock is renewed first, the task may have waited for the others of the batch. Tasks
+        whose lock expired and was claimed by another worker meanwhile are left to that worker.
+        """
+        definition = registry.get(task.name)
+        timeout = getattr(definition, "timeout", None) or self.lock_timeout
+        if not Task.objects.filter(pk=task.pk, locked_by=task.locked_by, state=TASK_RUNNING).update(
+                locked_until=timezone.now() + timedelta(seconds=timeout)):
+            return
+        try:
+            if definition is None:
+                raise KeyError("Task %r is not registered." % task.name)
+            if task.attempts > definition.max_attempts:
+                raise RuntimeError("Task %r was interrupted after %d attempts." % (task.name, task.attempts - 1))
+            arguments = json.loads(task.arguments)
+            definition.func(*arguments["args"], **arguments["kwargs"])
+        except Exception:
+            logger.exception("Task %s (%d) failed.", task.name, task.pk)
+            update = {"last_error": traceback.format_exc(), "locked_until": None}
+            if definition is None or task.attempts >= definition.max_attempts:
+                update["state"] = TASK_FAILED
+            else:
+                update["state"] = TASK_PENDING
+                update["run_at"] = timezone.now() + timedelta(
+                    seconds=definition.retry_delay * 2 ** (task.attempts - 1))
+            Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(**update)
+        else:
+            Task.objects.filter(pk=task.pk, locked_by=task.locked_by).delete()
+
+    def schedule_periodic(self) -> int:
+        """Enqueue the periodic tasks which are neither pending nor running, return number of the tasks.
+
+        The next run is enqueued `interval` seconds after the previous one finished. The queue is
+        checked at most once per `schedule_interval` seconds. The check and the insert hold the locks
+        of the names, so workers scheduling at the same time don't enqueue the tasks twice.
+        """
+        now = timezone.now()
+        if self.scheduled_at is not None and now < self.scheduled_at + timedelta(seconds=self.schedule_interval):
+            return 0
+        self.scheduled_at = now
+        periodic = {name: d.interval for name, d in registry.items() if d.interval is not None}
+        with transaction.atomic():
+            lock_names(periodic)
+            queued = set(Task.objects.filter(name__in=periodic, state__in=(TASK_PENDING, TASK_RUNNING)).values_list(
+                "name", flat=True))
+            for name in sorted(set(periodic) - queued):
+                enqueue(name, run_at=now + timedelta(seconds=periodic[name]))
+        return len(set(periodic) - queued)
+
+    def run_once(self) -> int:
+        """Claim and run one batch, return the number of tasks run."""
+        tasks = self.claim()
+        for task in tasks:
+            self.run_task(task)
+        return len(tasks)
@@ -0,0 +1,50 @@
+"""Background tasks of the tracker, run by `manage.py run_tracker_worker`."""
+from .archive import archive_issues
+from .assignment import assign_backlog
+from .attachments import delete_unused_blobs, recount_usage
+from .notifications import send_digests
+from .purge import purge_issues, purge_user
+from .sla import scan_sla
+from .taskqueue import task
+
+
+@task(name="tracker.send_digests", concurrency=1, interval=60)
+def send_notification_digests():
+    """Send all notification digests which are due."""
+    while send_digests():
+        pass
+
+
+@task(name="tracker.archive_issues", concurrency=1, interval=24 * 3600, timeout=3600)
+def archive_closed_issues():
+    """Move closed issues older than TRACKER_ARCHIVE_AFTER days to the archive."""
+    archive_issues()
+
+
+@task(name="tracker.purge_issues", concurrency=1, timeout=3600)
+def purge_deleted_issues():
+    """Delete rows of the soft deleted issues."""
+    if purge_issues():
+        recount_usage()
+        delete_unused_blobs()
+
+
+@task(name="tracker.purge_user", timeout=3600)
+def purge_deactivated_user(user_id):
+    """Delete the deactivated user with all their issues, issues they solved are assigned again."""
+    if purge_user(user_id):
+        recount_usage()
+        delete_unused_blobs()
+        assign_issues.enqueue()
+
+
+@task(name="tracker.assign_issues", concurrency=1, interval=3600)
+def assign_issues():
+    """Assign new issues without solver to the least busy solvers."""
+    assign_backlog()
+
+
+@task(name="tracker.scan_sla", concurrency=1, interval=60)
+def escalate_sla_breaches():
+    """Escalate issues which missed their SLA deadline."""
+    scan_sla()
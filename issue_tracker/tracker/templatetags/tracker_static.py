@@ -0,0 +1,14 @@
+from django import template
+from django.templatetags.static import static
+
+from ..vendor import VENDOR_ASSETS, VENDOR_STATIC_PREFIX, use_vendor_static
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_static(name: str) -> str:
+    """Return URL of third party asset, either the vendored copy or the CDN one."""
+    if use_vendor_static():
+        return static(VENDOR_STATIC_PREFIX + name)
+    return VENDOR_ASSETS[name]
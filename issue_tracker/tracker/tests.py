@@ -1,8 +1,48 @@
-from django.contrib.auth.models import User
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.core import mail
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.test import Client, TestCase
-
-from tracker.models import ISSUE_ASSIGNED, ISSUE_CANCELED, ISSUE_CREATED, ISSUE_DONE, Issue, IssueCategory
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tracker.archive import archive_issues, completion_stats, get_cutoff
+from tracker.assignment import assign_backlog, recount_workloads
+from tracker.attachments import delete_unused_blobs, parse_range, recount_usage
+from tracker.bitmaps import (
+    filter_by_labels, label_key, load_bitmaps, parse, popcount, reconcile_bitmaps, state_key)
+from tracker.counters import get_counts, reconcile_counters
+from tracker.dependencies import add_dependency, get_graph, remove_dependency
+from tracker.events import MAX_VALUE_LENGTH, LocalEventBus, PostgresEventBus, event_bus
+from tracker.models import (
+    ISSUE_ASSIGNED, ISSUE_CANCELED, ISSUE_CREATED, ISSUE_DONE, NOTIFICATION_ASSIGNED,
+    NOTIFICATION_SLA, NOTIFICATION_STATE, TASK_FAILED, TASK_PENDING, TASK_RUNNING, ArchivedIssue,
+    ArchiveTotals, Attachment, AttachmentBlob, Issue, IssueBand, IssueBitmap, IssueBitmapChunk,
+    IssueCategory, IssueDependency, IssueQuerySet, IssueSignature, Label, Notification, SavedFilter,
+    SLAPolicy, SolverWorkload, Task)
+from tracker.notifications import record_notifications, send_digests
+from tracker.partitions import (
+    add_months, ensure_partitions, is_partitioned, month_start, partition_name)
+from tracker.purge import purge_issues, purge_user
+from tracker.savedfilters import cache_key, canonical_query, get_results
+from tracker.similarity import BANDS, find_similar, rebuild_index
+from tracker.sla import scan_sla
+from tracker.taskqueue import Worker, enqueue, lock_names, registry, task
+from tracker.tasks import purge_deleted_issues
+from tracker.views import UserSelectView
 
 
 class ModelTestCase(TestCase):
@@ -154,6 +194,36 @@ class UserSelectViewTestCase(TestCase):
         self.assertEqual('[{"ID": %d, "Name": "%s", "Username": "%s"}]' % (u.pk, u.get_full_name(), u.username),
                          response.content.decode('ascii'))
 
+    def test_name_only_first(self):
+        """Test that the name is computed the same way as User.get_full_name()."""
+        u = User.objects.create(username="user_g", first_name="John")
+        response = self.client.post("/users/", {"q": u.username})
+        self.assertEqual(json.loads(response.content.decode()), [{"ID": u.pk, "Name": "John", "Username": "user_g"}])
+
+    def test_projection(self):
+        """Test that only the shown columns are fetched from database."""
+        with CaptureQueriesContext(connection) as context:
+            self.client.post("/users/", {"q": "user"})
+        search = context.captured_queries[-1]["sql"]
+        self.assertNotIn("password", search)
+        self.assertNotIn("last_login", search)
+
+    def test_stream(self):
+        """Test that long results are streamed."""
+        for i in range(5):
+            User.objects.create(username="stream_%d" % i)
+        with mock.patch.object(UserSelectView, "stream_threshold", 2), \
+                mock.patch.object(UserSelectView, "stream_chunk_size", 2):
+            response = self.client.post("/users/", {"q": "stream"})
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content).decode())
+        self.assertEqual([d["Username"] for d in data], ["stream_%d" % i for i in range(5)])
+
+    def test_empty_query(self):
+        """Test that empty query returns empty list."""
+        response = self.client.post("/users/", {"q": " "})
+        self.assertEqual(response.content, b"[]")
+
     def test_permission_denied(self):
         """Test that users without permission can't search anyone."""
         c = Client()
@@ -366,3 +436,1642 @@ class UnassignedTestCase(TestCase):
         self.assertEqual(new_issue.state, ISSUE_ASSIGNED)
         self.assertIsNotNone(new_issue.solver)
         self.assertIsNotNone(new_issue.assigned_at)
+
+
+class StartupReportTestCase(SimpleTestCase):
+    def test_no_debug_toolbar(self):
+        """Test that the debug tooling is not loaded outside of the dev profile."""
+        self.assertNotIn("debug_toolbar", settings.INSTALLED_APPS)
+        self.assertNotIn("debug_toolbar.middleware.DebugToolbarMiddleware", settings.MIDDLEWARE)
+
+    def test_report(self):
+        """Test that the report contains timings for every installed app."""
+        out = StringIO()
+        call_command("startup_report", "--repeat", "1", "--json", stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual([app["entry"] for app in report["apps"]], settings.INSTALLED_APPS)
+        self.assertGreater(report["total"], 0)
+
+
+class PermissionCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Solvers")
+        self.group.permissions.add(Permission.objects.get(codename="change_issue"))
+        self.test_user_1 = User.objects.create(username="user_a")
+        self.test_user_1.groups.add(self.group)
+        self.issue = Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def permission_queries(self, url: str) -> int:
+        """Request url and return number of queries loading permissions."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len([q for q in context.captured_queries if "auth_permission" in q["sql"]])
+
+    def test_detail_budget(self):
+        """Test that permissions are loaded once per request and then shared between requests."""
+        url = "/issue/%d/" % self.issue.pk
+        self.assertEqual(self.permission_queries(url), 2)
+        self.assertEqual(self.permission_queries(url), 0)
+
+    def test_list_budget(self):
+        """Test that the list view loads no permissions when they are cached."""
+        self.assertEqual(self.permission_queries("/"), 2)
+        self.assertEqual(self.permission_queries("/"), 0)
+
+    def test_edit_budget(self):
+        """Test that the edit API uses cached permissions."""
+        self.permission_queries("/")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "name", "value": "XX"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in context.captured_queries if "auth_permission" in q["sql"]])
+
+    def test_invalidate_group_permissions(self):
+        """Test that removing permission from group invalidates the cache."""
+        self.permission_queries("/")
+        self.group.permissions.clear()
+
+        response = self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "name", "value": "XX"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_invalidate_user_groups(self):
+        """Test that removing user from group invalidates the cache."""
+        self.permission_queries("/")
+        self.test_user_1.groups.remove(self.group)
+
+        response = self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "name", "value": "XX"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_invalidate_superuser(self):
+        """Test that demoting a superuser drops their cached permissions."""
+        self.test_user_1.groups.clear()
+        self.test_user_1.is_superuser = True
+        self.test_user_1.save()
+        # superusers get all permissions of the backend cached
+        self.assertIn("tracker.delete_issue", User.objects.get(pk=self.test_user_1.pk).get_all_permissions())
+
+        self.test_user_1.is_superuser = False
+        self.test_user_1.save()
+        self.assertFalse(User.objects.get(pk=self.test_user_1.pk).has_perm("tracker.delete_issue"))
+        response = self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "name", "value": "XX"})
+        self.assertEqual(response.status_code, 403)
+
+
+class RequestQueriesTestCase(TestCase):
+    """Compare the queries of authenticated ajax requests with and without the cached session and user."""
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Solvers")
+        self.group.permissions.add(Permission.objects.get(codename="change_issue"))
+        self.test_user_1 = User.objects.create(username="user_a")
+        self.test_user_1.groups.add(self.group)
+        self.test_user_2 = User.objects.create(username="user_b")
+
+    def select_queries(self) -> int:
+        """Return the number of queries of a warm user-select request."""
+        client = Client()
+        client.force_login(self.test_user_1)
+        client.post("/users/", {"q": "user_b"})
+        with CaptureQueriesContext(connection) as context:
+            response = client.post("/users/", {"q": "user_b"})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db",
+                       AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"])
+    def test_uncached(self):
+        """Test that without caches there is a session, user and two permission queries before the search."""
+        self.assertEqual(self.select_queries(), 5)
+
+    def test_cached(self):
+        """Test that the search is the only query of the request."""
+        self.assertEqual(self.select_queries(), 1)
+
+    def test_invalidate_user(self):
+        """Test that the cached user is dropped when the user changes."""
+        client = Client()
+        client.force_login(self.test_user_1)
+        client.get("/")
+        self.test_user_1.first_name = "John"
+        self.test_user_1.save()
+
+        response = client.get("/")
+        self.assertEqual(response.wsgi_request.user.first_name, "John")
+
+
+class ConditionalGetTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+        self.issue = Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def test_updated_at(self):
+        """Test that save and bulk update both mark the issue as modified."""
+        updated_at = self.issue.updated_at
+        self.issue.name = "Test change"
+        self.issue.save(update_fields=["name"])
+        self.assertGreater(Issue.objects.get(pk=self.issue.pk).updated_at, updated_at)
+
+        updated_at = Issue.objects.get(pk=self.issue.pk).updated_at
+        Issue.objects.filter(pk=self.issue.pk).update(state=ISSUE_DONE)
+        self.assertGreater(Issue.objects.get(pk=self.issue.pk).updated_at, updated_at)
+
+    def test_detail_not_modified(self):
+        """Test that unchanged issue is not rendered again."""
+        url = "/issue/%d/" % self.issue.pk
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_modified(self):
+        """Test that changed issue is rendered again."""
+        url = "/issue/%d/" % self.issue.pk
+        etag = self.client.get(url)["ETag"]
+        self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "name", "value": "Test change"})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Test change")
+
+    def test_detail_missing(self):
+        """Test that missing issue is still 404."""
+        self.assertEqual(self.client.get("/issue/%d/" % (self.issue.pk + 1)).status_code, 404)
+
+    def test_list_not_modified(self):
+        """Test that unchanged list is not rendered again."""
+        etag = self.client.get("/")["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in context if "tracker_issue" in query["sql"]])
+
+    def test_list_update(self):
+        """Test that set-based update changes ETag of the list."""
+        etag = self.client.get("/")["ETag"]
+        Issue.objects.filter(pk=self.issue.pk).mark_canceled()
+
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_delete(self):
+        """Test that deleted issue changes ETag of the list."""
+        Issue.objects.create(name="Test 2", created_by=self.test_user_1, description="Test description.")
+        etag = self.client.get("/")["ETag"]
+        self.issue.delete()
+
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_renamed(self):
+        """Test that renamed user changes ETag of the list and the detail but login does not."""
+        Issue.objects.filter(pk=self.issue.pk).update(solver=self.test_user_2)
+        etags = [self.client.get(url)["ETag"] for url in ("/", "/issue/%d/" % self.issue.pk)]
+        self.client.force_login(self.test_user_1)
+        for url, etag in zip(("/", "/issue/%d/" % self.issue.pk), etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.test_user_2.username = "user_c"
+        self.test_user_2.save()
+        for url, etag in zip(("/", "/issue/%d/" % self.issue.pk), etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "user_c")
+
+    def test_user_etag(self):
+        """Test that each user gets own ETag because the page depends on their permissions."""
+        etag = self.client.get("/")["ETag"]
+        c = Client()
+        c.force_login(self.test_user_2)
+
+        response = c.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        self.settings = override_settings(
+            STATIC_ROOT=self.static_root, STATICFILES_STORAGE="tracker.storage.CompressedManifestStaticFilesStorage",
+            MIDDLEWARE=["tracker.middleware.StaticFilesMiddleware"] + settings.MIDDLEWARE)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        with open(os.path.join(self.static_root, "staticfiles.json")) as f:
+            self.hashed_name = json.load(f)["paths"]["tracker/ajax-bootstrap-select.min.js"]
+
+    def test_compressed(self):
+        """Test that collectstatic stores compressed copies of hashed files."""
+        path = os.path.join(self.static_root, self.hashed_name)
+        with open(path, "rb") as original, gzip.open(path + ".gz") as compressed:
+            self.assertEqual(original.read(), compressed.read())
+
+    def test_serve_gzip(self):
+        """Test that fingerprinted file is served compressed with immutable caching."""
+        response = Client().get("/static/" + self.hashed_name, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(int(response["Content-Length"]),
+                         os.path.getsize(os.path.join(self.static_root, self.hashed_name + ".gz")))
+
+    def test_serve_identity(self):
+        """Test that clients not accepting gzip get the original file."""
+        response = Client().get("/static/" + self.hashed_name, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        with open(os.path.join(self.static_root, self.hashed_name), "rb") as f:
+            self.assertEqual(b"".join(response.streaming_content), f.read())
+
+    def test_serve_unhashed(self):
+        """Test that file without fingerprint isn't cached forever."""
+        response = Client().get("/static/tracker/ajax-bootstrap-select.min.js")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+    def test_deploy(self):
+        """Test that pages link the hashed files of the current deploy, not ones of cached fragments."""
+        cache.clear()
+        with override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"):
+            self.assertNotContains(Client().get("/accounts/login/"), self.hashed_name)
+        self.assertContains(Client().get("/accounts/login/"), self.hashed_name)
+
+
+class EventBusTestCase(SimpleTestCase):
+    def test_fan_out(self):
+        """Test that every subscriber gets the event."""
+        bus = LocalEventBus()
+        subscriptions = [bus.subscribe() for _ in range(3)]
+        bus.publish({"id": 1})
+
+        for subscription in subscriptions:
+            self.assertEqual(subscription.get(timeout=0)[1], {"id": 1})
+            self.assertIsNone(subscription.get(timeout=0))
+
+    def test_history(self):
+        """Test that reconnecting subscriber gets the events it missed."""
+        bus = LocalEventBus()
+        bus.publish({"id": 1})
+        bus.publish({"id": 2})
+        first_id = bus.history[0][0]
+
+        subscription = bus.subscribe(first_id)
+        self.assertEqual(subscription.get(timeout=0)[1], {"id": 2})
+        self.assertIsNone(subscription.get(timeout=0))
+
+    def test_slow_subscriber(self):
+        """Test that slow subscriber loses the oldest events instead of blocking the publisher."""
+        bus = LocalEventBus(queue_size=2)
+        subscription = bus.subscribe()
+        for i in range(3):
+            bus.publish({"id": i})
+
+        self.assertEqual([subscription.get(timeout=0)[1]["id"] for _ in range(2)], [1, 2])
+
+    def test_close(self):
+        """Test that closed subscription is removed from the bus."""
+        bus = LocalEventBus()
+        bus.subscribe().close()
+        self.assertFalse(bus.subscriptions)
+
+
+class IssueEventsTestCase(TransactionTestCase):
+    def setUp(self):
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+        self.issue = Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+        self.subscription = event_bus.subscribe()
+        self.addCleanup(self.subscription.close)
+
+    def test_done(self):
+        """Test that marking issue as done publishes the new state."""
+        self.client.get("/issue/done/%d/" % self.issue.pk)
+
+        event = self.subscription.get(timeout=0)[1]
+        self.assertEqual(event["id"], self.issue.pk)
+        self.assertEqual(event["state"], ISSUE_DONE)
+        self.assertEqual(event["fields"], {"state": "Done"})
+
+    def test_assign(self):
+        """Test that assigning solver publishes the solver and the state."""
+        self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "solver", "value": self.test_user_2.pk})
+
+        event = self.subscription.get(timeout=0)[1]
+        self.assertEqual(event["fields"], {"state": "Assigned", "solver": "user_b"})
+
+    def test_long_value(self):
+        """Test that long values are left out of the events."""
+        self.issue.name = "Renamed"
+        self.issue.description = "x" * (MAX_VALUE_LENGTH + 1)
+        self.issue.save()
+
+        event = self.subscription.get(timeout=0)[1]
+        self.assertEqual(event["fields"], {"name": "Renamed", "description": None})
+
+    def test_archive(self):
+        """Test that archived issue isn't published as deleted."""
+        Issue.objects.filter(pk=self.issue.pk).mark_done()
+        Issue.objects.filter(pk=self.issue.pk).update(updated_at=get_cutoff() - timedelta(days=1))
+        Notification.objects.update(sent_at=timezone.now())
+        self.subscription.close()
+        self.subscription = event_bus.subscribe()
+
+        self.assertEqual(archive_issues(), 1)
+        self.assertIsNone(self.subscription.get(timeout=0))
+
+    def test_postgres_publish(self):
+        """Test that Postgres notifications are sent after the commit."""
+        bus = PostgresEventBus()
+        with mock.patch.object(bus, "notify") as notify:
+            with transaction.atomic():
+                bus.publish({"id": 1})
+                notify.assert_not_called()
+            notify.assert_called_once_with({"id": 1})
+
+    def test_no_change(self):
+        """Test that saving unchanged issue publishes nothing."""
+        Issue.objects.get(pk=self.issue.pk).save()
+        self.assertIsNone(self.subscription.get(timeout=0))
+
+    def test_stream(self):
+        """Test that the stream sends only events of the requested issue."""
+        other = Issue.objects.create(name="Other", created_by=self.test_user_1, description="Test description.")
+        response = self.client.get("/issue/events/", {"issue": self.issue.pk})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = iter(response.streaming_content)
+        self.assertTrue(next(stream).startswith(b"retry:"))
+
+        pk = self.issue.pk
+        other.delete()
+        self.issue.delete()
+        chunk = next(stream).decode()
+        self.assertIn("event: issue\n", chunk)
+        self.assertEqual(json.loads(chunk.split("data: ")[1]), {"id": pk, "state": ISSUE_CREATED, "deleted": True})
+        response.close()
+
+    def test_stream_not_sent(self):
+        """Test that the stream subscribes only when it is sent and unsubscribes when it is closed."""
+        subscriptions = len(event_bus.subscriptions)
+        self.client.get("/issue/events/").close()
+        self.assertEqual(len(event_bus.subscriptions), subscriptions)
+
+        response = self.client.get("/issue/events/")
+        next(iter(response.streaming_content))
+        self.assertEqual(len(event_bus.subscriptions), subscriptions + 1)
+        response.close()
+        self.assertEqual(len(event_bus.subscriptions), subscriptions)
+
+
+calls = []
+
+
+@task(name="tests.record", max_attempts=2, retry_delay=60)
+def record_task(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise ValueError(value)
+
+
+@task(name="tests.limited", concurrency=1)
+def limited_task():
+    pass
+
+
+@task(name="tests.periodic", interval=60)
+def periodic_task():
+    calls.append("periodic")
+
+
+@task(name="tests.slow", timeout=3600)
+def slow_task():
+    calls.append(Task.objects.get(name="tests.slow").locked_until)
+
+
+class TaskQueueTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_run(self):
+        """Test that enqueued task runs once and is deleted."""
+        record_task.enqueue("a")
+        enqueue("tests.record", value="b")
+
+        self.assertEqual(Worker().run_once(), 2)
+        self.assertEqual(calls, ["a", "b"])
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(Worker().run_once(), 0)
+
+    def test_rollback(self):
+        """Test that task enqueued in rolled back transaction never runs."""
+        try:
+            with transaction.atomic():
+                record_task.enqueue("a")
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual(Worker().run_once(), 0)
+
+    def test_retry(self):
+        """Test that failed task is retried later and marked as failed after max attempts."""
+        record_task.enqueue("a", fail=True)
+        with self.assertLogs("tracker.taskqueue", "ERROR"):
+            Worker().run_once()
+        task = Task.objects.get()
+        self.assertEqual(task.state, TASK_PENDING)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn("ValueError", task.last_error)
+        self.assertEqual(Worker().run_once(), 0)
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs("tracker.taskqueue", "ERROR"):
+            Worker().run_once()
+        task = Task.objects.get()
+        self.assertEqual(task.state, TASK_FAILED)
+        self.assertEqual(calls, ["a", "a"])
+
+    def test_batch(self):
+        """Test that worker claims at most batch size tasks."""
+        for i in range(5):
+            record_task.enqueue(i)
+        self.assertEqual(Worker(batch_size=2).run_once(), 2)
+        self.assertEqual(calls, [0, 1])
+
+    def test_claimed_by_other(self):
+        """Test that task claimed by another worker isn't run twice."""
+        record_task.enqueue("a")
+        Worker().claim()
+        self.assertEqual(Worker().run_once(), 0)
+
+    def test_dead_worker(self):
+        """Test that task of worker which died is run again after its lock expires."""
+        record_task.enqueue("a")
+        Worker().claim()
+        self.assertEqual(Task.objects.get().attempts, 1)
+        Task.objects.update(locked_until=timezone.now())
+        self.assertEqual(Worker().run_once(), 1)
+
+    def test_dead_worker_attempts(self):
+        """Test that task killing its workers is marked as failed after max attempts without running."""
+        record_task.enqueue("a")
+        for _ in range(2):
+            Worker().claim()
+            Task.objects.update(locked_until=timezone.now())
+        with self.assertLogs("tracker.taskqueue", "ERROR"):
+            Worker().run_once()
+        task = Task.objects.get()
+        self.assertEqual(task.state, TASK_FAILED)
+        self.assertIn("interrupted", task.last_error)
+        self.assertEqual(calls, [])
+
+    def test_timeout(self):
+        """Test that the lock is renewed for the timeout of the task when it starts."""
+        slow_task.enqueue()
+        self.assertEqual(Worker(lock_timeout=60).run_once(), 1)
+        self.assertGreater(calls[0], timezone.now() + timedelta(seconds=3000))
+
+    def test_lock_lost(self):
+        """Test that task whose expired lock was claimed by another worker isn't run by both."""
+        record_task.enqueue("a")
+        task = Worker().claim()[0]
+        Task.objects.update(locked_until=timezone.now())
+        other_task = Worker().claim()[0]
+        Worker().run_task(task)
+        self.assertEqual(calls, [])
+        Worker().run_task(other_task)
+        self.assertEqual(calls, ["a"])
+
+    def test_concurrency(self):
+        """Test that no more tasks than the concurrency limit are claimed."""
+        limited_task.enqueue()
+        limited_task.enqueue()
+        record_task.enqueue("a")
+
+        self.assertEqual(len(Worker().claim()), 2)
+        self.assertEqual(Task.objects.filter(state=TASK_RUNNING, name="tests.limited").count(), 1)
+
+    def test_concurrency_lock(self):
+        """Test that claims of tasks with concurrency limit are serialized by their names."""
+        limited_task.enqueue()
+        limited_task.enqueue()
+        record_task.enqueue("a")
+        with mock.patch("tracker.taskqueue.lock_names") as lock:
+            Worker().claim()
+        self.assertEqual(list(lock.call_args[0][0]), ["tests.limited", "tests.limited"])
+
+    def test_lock_names(self):
+        """Test that Postgres advisory locks are taken once per name in sorted order."""
+        with mock.patch.object(connection, "vendor", "postgresql"), mock.patch.object(connection, "cursor") as cursor:
+            lock_names(["b", "a", "b"])
+        execute = cursor.return_value.__enter__.return_value.execute
+        self.assertEqual([call[0][1] for call in execute.call_args_list], [["a"], ["b"]])
+
+    def test_periodic(self):
+        """Test that periodic task is enqueued once and again after it ran."""
+        worker = Worker(schedule_interval=0)
+        self.assertGreater(worker.schedule_periodic(), 0)
+        self.assertEqual(worker.schedule_periodic(), 0)
+        task = Task.objects.get(name="tests.periodic")
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertEqual(set(Task.objects.values_list("name", flat=True)), {
+            "tests.periodic", "tracker.send_digests", "tracker.archive_issues", "tracker.assign_issues",
+            "tracker.scan_sla"})
+
+        Task.objects.filter(name="tests.periodic").update(run_at=timezone.now())
+        worker.run_once()
+        self.assertEqual(calls, ["periodic"])
+        self.assertEqual(worker.schedule_periodic(), 1)
+
+        worker = Worker(schedule_interval=60)
+        Task.objects.filter(name="tests.periodic").delete()
+        self.assertEqual(worker.schedule_periodic(), 1)
+        Task.objects.filter(name="tests.periodic").delete()
+        self.assertEqual(worker.schedule_periodic(), 0)
+
+    def test_periodic_lock(self):
+        """Test that periodic tasks are checked and enqueued under the locks of their names."""
+        with mock.patch("tracker.taskqueue.lock_names") as lock:
+            Worker().schedule_periodic()
+        self.assertIn("tests.periodic", lock.call_args[0][0])
+
+    def test_unknown(self):
+        """Test that unregistered tasks can't be enqueued."""
+        self.assertRaises(KeyError, enqueue, "tests.unknown")
+        self.assertIn("tests.record", registry)
+
+    def test_command(self):
+        """Test that the worker command drains the queue."""
+        record_task.enqueue("a")
+        call_command("run_tracker_worker", "--once")
+        self.assertEqual(calls, ["a"])
+
+
+class NotificationTestCase(TestCase):
+    def setUp(self):
+        self.test_user_1 = User.objects.create(username="user_a", email="a@example.com", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b", email="b@example.com")
+        self.issue = Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def later(self):
+        return timezone.now() + timedelta(seconds=settings.TRACKER_NOTIFICATION_WINDOW + 1)
+
+    def test_record(self):
+        """Test that the solver is notified about assignment and both users about the new state."""
+        self.assertFalse(Notification.objects.exists())
+        self.client.post("/issue/edit/%d/" % self.issue.pk, {"name": "solver", "value": self.test_user_2.pk})
+        self.client.get("/issue/done/%d/" % self.issue.pk)
+
+        self.assertEqual(sorted(Notification.objects.values_list("recipient__username", "kind", "state")), [
+            ("user_a", NOTIFICATION_STATE, ISSUE_ASSIGNED),
+            ("user_a", NOTIFICATION_STATE, ISSUE_DONE),
+            ("user_b", NOTIFICATION_ASSIGNED, ""),
+            ("user_b", NOTIFICATION_STATE, ISSUE_DONE),
+        ])
+
+    def test_window(self):
+        """Test that no digest is sent before the window of the user elapses."""
+        self.issue.solver = self.test_user_2
+        self.issue.save()
+
+        self.assertEqual(send_digests(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_digest(self):
+        """Test that all changes are coalesced into one e-mail per user."""
+        self.issue.solver = self.test_user_2
+        self.issue.save()
+        other = Issue.objects.create(name="Other", created_by=self.test_user_1, description="Test description.")
+        other.state = ISSUE_CANCELED
+        other.save()
+        self.issue.state = ISSUE_DONE
+        self.issue.save()
+
+        with self.assertNumQueries(3):
+            self.assertEqual(send_digests(self.later()), 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["a@example.com", "b@example.com"])
+        body = [m for m in mail.outbox if m.to == ["b@example.com"]][0].body
+        self.assertIn("You were assigned as the solver.", body)
+        self.assertIn("The state was changed to Done.", body)
+        self.assertNotIn("Assigned.", body)
+        self.assertNotIn("Other", body)
+
+        self.assertEqual(send_digests(self.later()), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_bulk_record(self):
+        """Test that many notifications are stored with few queries."""
+        with CaptureQueriesContext(connection) as context:
+            record_notifications(
+                Notification(recipient=self.test_user_2, issue=self.issue, kind=NOTIFICATION_STATE,
+                             state=ISSUE_DONE) for _ in range(2000))
+        self.assertLess(len(context), 20)
+        self.assertEqual(Notification.objects.count(), 2000)
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.old = timezone.now() - timedelta(days=settings.TRACKER_ARCHIVE_AFTER + 1)
+        self.issues = []
+        for i, (state, completed_in) in enumerate(((ISSUE_DONE, 10), (ISSUE_DONE, 30), (ISSUE_CANCELED, None),
+                                                   (ISSUE_CREATED, None))):
+            issue = Issue.objects.create(name="Test %d" % i, created_by=self.test_user_1, description="Test.",
+                                         state=state)
+            Issue.objects.filter(pk=issue.pk).update(
+                updated_at=self.old, completed_in=None if completed_in is None else timedelta(seconds=completed_in))
+            self.issues.append(issue)
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def test_archive(self):
+        """Test that only old closed issues are moved and the totals count them."""
+        recent = Issue.objects.create(name="Recent", created_by=self.test_user_1, description="Test.",
+                                      state=ISSUE_DONE)
+
+        self.assertEqual(archive_issues(batch_size=2), 3)
+        self.assertEqual(sorted(Issue.objects.values_list("pk", flat=True)), sorted([self.issues[3].pk, recent.pk]))
+        self.assertEqual(sorted(ArchivedIssue.objects.values_list("pk", flat=True)),
+                         [issue.pk for issue in self.issues[:3]])
+        done = ArchiveTotals.objects.get(state=ISSUE_DONE)
+        self.assertEqual((done.count, done.completed_count, done.completed_total, done.completed_min,
+                          done.completed_max), (2, 2, timedelta(seconds=40), timedelta(seconds=10),
+                                                timedelta(seconds=30)))
+        self.assertEqual(ArchiveTotals.objects.get(state=ISSUE_CANCELED).count, 1)
+
+        self.assertEqual(archive_issues(), 0)
+
+    def test_pending_notifications(self):
+        """Test that issues are archived only after their pending notifications are sent."""
+        Notification.objects.create(recipient=self.test_user_1, issue=self.issues[0], kind=NOTIFICATION_STATE,
+                                    state=ISSUE_DONE, created_at=self.old)
+        self.assertEqual(archive_issues(), 2)
+        self.assertTrue(Issue.objects.filter(pk=self.issues[0].pk).exists())
+
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(archive_issues(), 1)
+        self.assertFalse(Issue.objects.filter(pk=self.issues[0].pk).exists())
+
+    def test_stats(self):
+        """Test that the statistics merge active issues with the archive totals."""
+        expected = {"avg": timedelta(seconds=20), "min": timedelta(seconds=10), "max": timedelta(seconds=30),
+                    "breached": 0, "overdue": 0}
+        self.assertEqual(completion_stats(), expected)
+        archive_issues(get_cutoff())
+        Issue.objects.filter(pk=self.issues[3].pk).update(completed_in=timedelta(seconds=50))
+        self.assertEqual(completion_stats(), {"avg": timedelta(seconds=30), "min": timedelta(seconds=10),
+                                              "max": timedelta(seconds=50), "breached": 0, "overdue": 0})
+
+        response = self.client.get("/")
+        self.assertEqual(response.context["max"], timedelta(seconds=50))
+
+    def test_detail(self):
+        """Test that the detail URL of an archived issue keeps working."""
+        archive_issues()
+        issue = self.issues[0]
+        response = self.client.get(issue.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["archived"])
+        self.assertContains(response, "Test 0")
+        self.assertNotContains(response, "/issue/delete/%d/" % issue.pk)
+        self.assertEqual(self.client.get("/issue/done/%d/" % issue.pk).status_code, 404)
+        self.assertEqual(self.client.get("/issue/0/").status_code, 404)
+
+    def test_command(self):
+        """Test that the command archives issues older than given days."""
+        out = StringIO()
+        call_command("archive_issues", "--days", str(settings.TRACKER_ARCHIVE_AFTER + 2), stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Archived 0 issues.")
+        call_command("archive_issues", stdout=out)
+        self.assertIn("Archived 3 issues.", out.getvalue())
+
+
+class PartitionTestCase(TestCase):
+    def test_months(self):
+        """Test the month arithmetic of the partition bounds."""
+        month = month_start(timezone.now().replace(year=2018, month=11, day=17))
+        self.assertEqual((month.day, month.hour, month.minute), (1, 0, 0))
+        self.assertEqual(add_months(month, 2).strftime("%Y-%m"), "2019-01")
+        self.assertEqual(add_months(month, -11).strftime("%Y-%m"), "2017-12")
+        self.assertEqual(partition_name(month), "tracker_archivedissue_p2018_11")
+
+    def test_unsupported(self):
+        """Test that databases without partitioning keep the plain table."""
+        if connection.vendor == "postgresql":
+            self.skipTest("Partitioning is supported.")
+        self.assertFalse(is_partitioned())
+        self.assertEqual(ensure_partitions(), [])
+        out = StringIO()
+        call_command("partition_archive", stdout=out)
+        self.assertIn("isn't partitioned", out.getvalue())
+
+
+class SoftDeleteTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True, is_staff=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+        self.issues = [Issue.objects.create(name="Test %d" % i, created_by=self.test_user_2, solver=self.test_user_1,
+                                            description="Test description.") for i in range(3)]
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def test_delete(self):
+        """Test that deleted issue is hidden and its purge is enqueued."""
+        issue = self.issues[0]
+        self.client.get("/issue/delete/%d/" % issue.pk)
+
+        self.assertIsNotNone(Issue.all_objects.get(pk=issue.pk).deleted_at)
+        self.assertEqual(Issue.objects.count(), 2)
+        self.assertEqual(self.client.get("/issue/%d/" % issue.pk).status_code, 404)
+        self.assertTrue(Task.objects.filter(name="tracker.purge_issues").exists())
+
+    def test_bulk_delete(self):
+        """Test that many issues are deleted with one request."""
+        response = self.client.post("/issue/delete/", {"pk": [self.issues[0].pk, self.issues[1].pk, 0]})
+        self.assertEqual(json.loads(response.content.decode()), {"deleted": 2})
+        self.assertEqual(list(Issue.objects.all()), [self.issues[2]])
+
+        self.assertEqual(self.client.post("/issue/delete/", {"pk": "x"}).status_code, 400)
+        client = Client()
+        client.force_login(self.test_user_2)
+        client.post("/issue/delete/", {"pk": self.issues[2].pk})
+        self.assertEqual(Issue.objects.count(), 1)
+
+    def test_purge(self):
+        """Test that only the deleted issues are purged together with their notifications."""
+        Issue.objects.filter(pk__in=[self.issues[0].pk, self.issues[1].pk]).soft_delete()
+        self.assertTrue(Notification.objects.filter(issue=self.issues[0]).exists())
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(purge_issues(chunk_size=1), 2)
+        self.assertEqual(len([query for query in context if query["sql"].startswith("DELETE")]), 4)
+        self.assertEqual(list(Issue.all_objects.all()), [self.issues[2]])
+        self.assertEqual(set(Notification.objects.values_list("issue_id", flat=True)), {self.issues[2].pk})
+
+    def test_purge_user(self):
+        """Test that deactivated user is deleted with their issues and the solved issues are kept."""
+        other = Issue.objects.create(name="Other", created_by=self.test_user_1, solver=self.test_user_2,
+                                     description="Test description.")
+        self.assertFalse(purge_user(self.test_user_2.pk))
+
+        response = self.client.post("/admin/auth/user/", {
+            "action": "purge_users", "_selected_action": [self.test_user_1.pk, self.test_user_2.pk]})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(User.objects.get(pk=self.test_user_1.pk).is_active)
+        self.assertEqual(Task.objects.filter(name="tracker.purge_user").count(), 1)
+
+        self.assertTrue(purge_user(self.test_user_2.pk))
+        self.assertFalse(User.objects.filter(pk=self.test_user_2.pk).exists())
+        self.assertEqual(list(Issue.all_objects.all()), [other])
+        self.assertIsNone(Issue.objects.get(pk=other.pk).solver)
+        self.assertEqual(Issue.objects.get(pk=other.pk).state, ISSUE_CREATED)
+        self.assertEqual(get_counts()[0][ISSUE_CREATED], 1)
+        self.assertEqual(reconcile_counters(), 0)
+
+
+class IssueAdminTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True, is_staff=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+        self.category = IssueCategory.objects.create(name="Bug")
+        self.issues = [Issue.objects.create(name="Test %d" % i, created_by=self.test_user_2, category=self.category,
+                                            description="Test description.") for i in range(3)]
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def test_changelist_queries(self):
+        """Test that the number of queries doesn't grow with the number of issues."""
+        self.client.get("/admin/tracker/issue/")
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get("/admin/tracker/issue/").status_code, 200)
+        for i in range(5):
+            Issue.objects.create(name="More %d" % i, created_by=self.test_user_1, solver=self.test_user_2,
+                                 description="Test description.")
+        with self.assertNumQueries(len(context)):
+            self.client.get("/admin/tracker/issue/")
+
+    def test_actions(self):
+        """Test that the bulk actions update the issues and report the changes."""
+        subscription = event_bus.subscribe()
+        self.addCleanup(subscription.close)
+        pks = [issue.pk for issue in self.issues]
+        self.client.post("/admin/tracker/issue/", {"action": "assign_to_me", "_selected_action": pks[:2]})
+        self.assertEqual(Issue.objects.filter(solver=self.test_user_1, state=ISSUE_ASSIGNED).count(), 2)
+        self.assertEqual(Notification.objects.filter(recipient=self.test_user_1, kind=NOTIFICATION_ASSIGNED).count(),
+                         2)
+
+        self.client.post("/admin/tracker/issue/", {"action": "mark_done", "_selected_action": pks[1:]})
+        self.client.post("/admin/tracker/issue/", {"action": "mark_canceled", "_selected_action": pks})
+        self.assertEqual([issue.state for issue in Issue.objects.order_by("pk")],
+                         [ISSUE_CANCELED, ISSUE_DONE, ISSUE_DONE])
+        self.assertIsNotNone(Issue.objects.get(pk=pks[2]).completed_in)
+        self.assertIsNone(Issue.objects.get(pk=pks[0]).completed_in)
+
+    def test_autocomplete(self):
+        """Test that solver, category and labels are picked by autocomplete widgets."""
+        response = self.client.get("/admin/tracker/issue/%d/change/" % self.issues[0].pk)
+        self.assertContains(response, 'class="admin-autocomplete', count=3)
+
+
+class AssignmentTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username="author")
+        self.solvers = [User.objects.create(username="solver_%d" % i) for i in range(3)]
+        self.category = IssueCategory.objects.create(name="Bug")
+        self.category.solvers.add(*self.solvers[:2])
+        self.other = IssueCategory.objects.create(name="Other")
+
+    def create(self, category=None, **kwargs) -> Issue:
+        return Issue.objects.create(name="Test", created_by=self.author, description="Test description.",
+                                    category=category, **kwargs)
+
+    def workloads(self):
+        return dict(SolverWorkload.objects.values_list("user__username", "open_issues"))
+
+    def test_counters(self):
+        """Test that the counters follow assignments, unassignments, closing and deletes."""
+        self.solvers[2].solver_categories.add(self.other)
+        issue = self.create(solver=self.solvers[0])
+        other = self.create(solver=self.solvers[2])
+        self.assertEqual(self.workloads(), {"solver_0": 1, "solver_1": 0, "solver_2": 1})
+
+        issue.solver = self.solvers[1]
+        issue.save()
+        Issue.objects.filter(pk=other.pk).mark_done()
+        self.assertEqual(self.workloads(), {"solver_0": 0, "solver_1": 1, "solver_2": 0})
+
+        Issue.objects.filter(pk=issue.pk).soft_delete()
+        self.assertEqual(self.workloads(), {"solver_0": 0, "solver_1": 0, "solver_2": 0})
+        self.assertEqual(recount_workloads(), 0)
+
+    def test_auto_assign(self):
+        """Test that new issues go to the solver with the least open issues."""
+        self.create(solver=self.solvers[0])
+        issues = [self.create(self.category) for _ in range(3)]
+        self.assertEqual([issue.solver for issue in issues], [self.solvers[1], self.solvers[0], self.solvers[1]])
+        self.assertEqual(Issue.objects.get(pk=issues[0].pk).state, ISSUE_ASSIGNED)
+        self.assertIsNone(self.create(self.other).solver)
+        self.assertEqual(self.workloads(), {"solver_0": 2, "solver_1": 2})
+
+    def test_inactive(self):
+        """Test that inactive solvers get no issues."""
+        User.objects.filter(pk=self.solvers[0].pk).update(is_active=False)
+        self.assertEqual({self.create(self.category).solver for _ in range(2)}, {self.solvers[1]})
+
+    def test_backlog(self):
+        """Test that the backlog is spread evenly over the solvers."""
+        self.category.solvers.clear()
+        for _ in range(7):
+            self.create(self.category)
+        self.create(self.other)
+        self.create()
+        self.category.solvers.add(*self.solvers)
+
+        out = StringIO()
+        call_command("assign_issues", "--batch-size", "3", "--recount", stdout=out)
+        self.assertIn("Assigned 7 issues.", out.getvalue())
+        self.assertEqual(self.workloads(), {"solver_0": 3, "solver_1": 2, "solver_2": 2})
+        self.assertEqual(Issue.objects.filter(solver__isnull=True).count(), 2)
+        self.assertEqual(recount_workloads(), 0)
+        self.assertEqual(assign_backlog(), 0)
+
+
+class CounterTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+        self.category = IssueCategory.objects.create(name="Bug")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def create(self, **kwargs) -> Issue:
+        return Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.",
+                                    **kwargs)
+
+    def test_transitions(self):
+        """Test that the counters follow every kind of change."""
+        issues = [self.create(category=self.category) for _ in range(4)]
+        issues[0].solver = self.test_user_2
+        issues[0].save()
+        Issue.objects.filter(pk__in=[issues[1].pk, issues[2].pk]).assign(self.test_user_2)
+        Issue.objects.filter(pk=issues[1].pk).mark_done()
+        Issue.objects.filter(pk=issues[2].pk).soft_delete()
+        self.create().delete()
+        self.assertEqual(get_counts(), ({ISSUE_CREATED: 1, ISSUE_ASSIGNED: 1, ISSUE_DONE: 1},
+                                        {self.test_user_2.pk: 1}))
+
+        self.category.delete()
+        self.test_user_2.delete()
+        self.assertEqual(get_counts(), ({ISSUE_CREATED: 1, ISSUE_ASSIGNED: 1, ISSUE_DONE: 1}, {}))
+        self.assertEqual(reconcile_counters(), 0)
+
+    def test_repeated_transition(self):
+        """Test that repeated and late requests to close the issue change nothing."""
+        issue = self.create(solver=self.test_user_2)
+        client = Client()
+        client.force_login(self.test_user_2)
+        with mock.patch.object(IssueQuerySet, "select_for_update", autospec=True,
+                               side_effect=lambda queryset: queryset) as lock:
+            client.get("/issue/done/%d/" % issue.pk)
+        lock.assert_called_once()
+        client.get("/issue/done/%d/" % issue.pk)
+        client.get("/issue/cancel/%d/" % issue.pk)
+        self.assertEqual(Issue.objects.get(pk=issue.pk).state, ISSUE_DONE)
+        self.assertEqual(get_counts(), ({ISSUE_ASSIGNED: 0, ISSUE_DONE: 1}, {self.test_user_2.pk: 0}))
+        self.assertEqual(reconcile_counters(), 0)
+
+    def test_update_locks(self):
+        """Test that set-based updates lock the issues and update them only if they still match."""
+        issue = self.create()
+        with mock.patch.object(IssueQuerySet, "select_for_update", autospec=True,
+                               side_effect=lambda queryset: queryset) as lock, \
+                CaptureQueriesContext(connection) as context:
+            self.assertEqual(Issue.objects.filter(pk=issue.pk).mark_canceled(), 1)
+        lock.assert_called_once()
+        update = [query["sql"] for query in context if query["sql"].startswith("UPDATE")][0]
+        self.assertIn('"state" IN', update)
+        self.assertEqual(Issue.objects.filter(pk=issue.pk).mark_canceled(), 0)
+        self.assertEqual(get_counts()[0], {ISSUE_CREATED: 0, ISSUE_CANCELED: 1})
+
+    def test_reconcile(self):
+        """Test that changes bypassing the signals are fixed by the reconciliation."""
+        issue = self.create()
+        Issue.objects.filter(pk=issue.pk).update(state=ISSUE_CANCELED)
+
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("Fixed 2 issue counters.", out.getvalue())
+        self.assertEqual(get_counts()[0], {ISSUE_CANCELED: 1})
+
+    def test_list(self):
+        """Test that the list shows the numbers of issues read with one query and filters by state."""
+        self.create(solver=self.test_user_2)
+        self.create(solver=self.test_user_2)
+        self.create()
+
+        response = self.client.get("/")
+        self.assertEqual(response.context["total"], 3)
+        self.assertIn((ISSUE_ASSIGNED, "Assigned", 2), response.context["states"])
+        self.assertEqual([issue.solver_open_issues for issue in response.context["object_list"]], [2, 2, 0])
+
+        response = self.client.get("/", {"state": ISSUE_CREATED})
+        self.assertEqual(len(response.context["object_list"]), 1)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/", {"state": ISSUE_CREATED})
+        self.assertEqual(len([query for query in context if "tracker_issuecounter" in query["sql"]]), 1)
+
+
+class DependencyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def create(self, name: str = "Test") -> Issue:
+        return Issue.objects.create(name=name, created_by=self.test_user_1, description="Test description.")
+
+    def test_cycle(self):
+        """Test that direct and transitive cycles are rejected."""
+        first, second, third = self.create(), self.create(), self.create()
+        add_dependency(first, second)
+        add_dependency(second, third)
+
+        with self.assertRaises(ValidationError):
+            add_dependency(first, first)
+        with self.assertRaises(ValidationError):
+            add_dependency(second, first)
+        with self.assertRaises(ValidationError):
+            add_dependency(third, first)
+        add_dependency(first, third)
+        self.assertEqual(IssueDependency.objects.count(), 3)
+
+        self.assertTrue(remove_dependency(second, third))
+        add_dependency(third, second)
+        self.assertEqual(IssueDependency.objects.count(), 3)
+
+    def test_deep_graph(self):
+        """Test that the whole chain is read with one query however deep it is."""
+        issues = [self.create(name=str(i)) for i in range(1000)]
+        IssueDependency.objects.bulk_create(
+            [IssueDependency(blocker=blocker, blocked=blocked) for blocker, blocked in zip(issues, issues[1:])])
+        Issue.objects.filter(pk=issues[0].pk).soft_delete()
+
+        with self.assertNumQueries(1):
+            graph = get_graph(issues[500])
+        self.assertEqual([issue.pk for issue in graph["upstream"]], [issue.pk for issue in issues[1:500]])
+        self.assertEqual([issue.pk for issue in graph["downstream"]], [issue.pk for issue in issues[501:]])
+        self.assertFalse(graph["upstream"][0].blocked)
+        self.assertTrue(graph["downstream"][0].blocked)
+
+        with self.assertRaises(ValidationError):
+            add_dependency(issues[-1], issues[1])
+
+    def test_done(self):
+        """Test that marking a blocker as done reports issues it doesn't block anymore."""
+        first, second, blocked = self.create(), self.create(), self.create()
+        add_dependency(first, blocked)
+        add_dependency(second, blocked)
+
+        response = self.client.get("/issue/done/%d/" % first.pk, follow=True)
+        self.assertEqual(list(response.context["messages"]), [])
+        self.assertEqual([issue.blocked for issue in response.context["downstream"]], [True])
+
+        response = self.client.get("/issue/done/%d/" % second.pk, follow=True)
+        self.assertEqual([str(message) for message in response.context["messages"]],
+                         ["Issues %s are not blocked anymore." % blocked])
+        self.assertEqual([issue.blocked for issue in response.context["downstream"]], [False])
+
+    def test_api(self):
+        """Test that dependencies are added, rejected and removed through the API."""
+        blocker, blocked = self.create(name="Blocker"), self.create(name="Blocked")
+        url = "/issue/%d/dependencies/" % blocked.pk
+
+        response = self.client.post(url, {"blocker": blocker.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode()), {"upstream": [
+            {"id": blocker.pk, "name": "Blocker", "state": ISSUE_CREATED, "blocked": False}], "downstream": []})
+        response = self.client.post("/issue/%d/dependencies/" % blocker.pk, {"blocker": blocked.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post(url, {"blocker": "x"}).status_code, 400)
+
+        response = self.client.post(url, {"blocker": blocker.pk, "remove": 1})
+        self.assertEqual(json.loads(response.content.decode()), {"upstream": [], "downstream": []})
+
+        self.client.force_login(self.test_user_2)
+        self.assertEqual(self.client.post(url, {"blocker": blocker.pk}).status_code, 403)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_etag(self):
+        """Test that the detail page changes when an issue it shows as dependency changes."""
+        blocker, blocked = self.create(), self.create()
+        etag = self.client.get("/issue/%d/" % blocked.pk)["ETag"]
+        add_dependency(blocker, blocked)
+        response = self.client.get("/issue/%d/" % blocked.pk, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        self.assertEqual(self.client.get("/issue/%d/" % blocked.pk, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        blocker.state = ISSUE_DONE
+        blocker.save()
+        self.assertEqual(self.client.get("/issue/%d/" % blocked.pk, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class SimilarityTestCase(TestCase):
+    def setUp(self):
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def create(self, name: str, description: str = "Test description.") -> Issue:
+        return Issue.objects.create(name=name, created_by=self.test_user_1, description=description)
+
+    def test_index(self):
+        """Test that open issues are indexed on every change of their text and closed ones are removed."""
+        issue = self.create("Login page crashes")
+        self.assertEqual(IssueBand.objects.filter(issue=issue).count(), BANDS)
+        self.assertEqual([i.pk for i in find_similar("Login page crashes", "Test description.")], [issue.pk])
+
+        issue.name = "Search is slow"
+        issue.save()
+        self.assertEqual(IssueBand.objects.filter(issue=issue).count(), BANDS)
+        self.assertEqual(find_similar("Login page crashes", "Test description.", threshold=0.9), [])
+
+        Issue.objects.filter(pk=issue.pk).mark_done()
+        self.assertFalse(IssueSignature.objects.exists())
+        self.assertFalse(IssueBand.objects.exists())
+
+        other = self.create("Search is slow")
+        Issue.objects.filter(pk=other.pk).soft_delete()
+        self.assertFalse(IssueBand.objects.exists())
+
+    def test_reopen(self):
+        """Test that reopened issue is indexed again."""
+        issue = self.create("Login page crashes")
+        Issue.objects.filter(pk=issue.pk).mark_done()
+        issue = Issue.objects.get(pk=issue.pk)
+        self.assertEqual(find_similar("Login page crashes", "Test description."), [])
+
+        issue.state = ISSUE_CREATED
+        issue.save()
+        self.assertEqual(IssueBand.objects.filter(issue=issue).count(), BANDS)
+        self.assertEqual([i.pk for i in find_similar("Login page crashes", "Test description.")], [issue.pk])
+
+    def test_find(self):
+        """Test that near-duplicates are found with few queries and unrelated issues aren't."""
+        description = "After entering the password and pressing the button the whole page goes blank."
+        duplicate = self.create("Login page crashes after submit", description)
+        self.create("Export of the issue list to CSV", "The exported file is missing the category column.")
+        self.create("Typo in footer")
+
+        with self.assertNumQueries(3):
+            similar = find_similar("Login page crashes on submit", description)
+        self.assertEqual([issue.pk for issue in similar], [duplicate.pk])
+        self.assertGreater(similar[0].similarity, 0.5)
+        self.assertEqual(find_similar("Login page crashes on submit", description, exclude=duplicate.pk), [])
+
+    def test_create(self):
+        """Test that creating a near-duplicate shows the similar issues until it's confirmed."""
+        duplicate = self.create("Login page crashes after submit")
+        data = {"name": "Login page crashes on submit", "description": "Test description."}
+
+        response = self.client.post("/issue/create/", data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([issue.pk for issue in response.context["similar"]], [duplicate.pk])
+        self.assertEqual(Issue.objects.count(), 1)
+
+        response = self.client.post("/issue/create/", dict(data, confirm=1))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Issue.objects.count(), 2)
+
+        response = self.client.post("/issue/create/", {"name": "Typo in footer", "description": "Missing dot."})
+        self.assertEqual(response.status_code, 302)
+
+    def test_lookup(self):
+        """Test that the lookup endpoint returns the similar issues."""
+        duplicate = self.create("Login page crashes after submit")
+        response = self.client.get("/issue/similar/", {"name": "Login page crashes on submit",
+                                                       "description": "Test description."})
+        self.assertEqual(json.loads(response.content.decode())["issues"][0]["id"], duplicate.pk)
+        self.assertEqual(self.client.get("/issue/similar/", {"limit": "x"}).status_code, 400)
+        self.assertEqual(self.client.get("/issue/similar/", {"limit": "-1"}).status_code, 400)
+        self.assertEqual(self.client.get("/issue/similar/", {"limit": "0"}).status_code, 400)
+
+    def test_rebuild(self):
+        """Test that the index is built from scratch for open issues only."""
+        open_issue, done_issue = self.create("Login page crashes"), self.create("Search is slow")
+        Issue.objects.filter(pk=done_issue.pk).update(state=ISSUE_DONE)
+        IssueBand.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_similarity", "--batch-size", "1", stdout=out)
+        self.assertIn("Indexed 1 issues.", out.getvalue())
+        self.assertEqual(set(IssueBand.objects.values_list("issue_id", flat=True)), {open_issue.pk})
+        self.assertEqual(rebuild_index(), 1)
+
+
+class AttachmentTestCase(TransactionTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.settings = override_settings(TRACKER_ATTACHMENT_STORAGE_OPTIONS={"location": self.root})
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.category = IssueCategory.objects.create(name="Bug")
+        self.issue = self.create()
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def create(self) -> Issue:
+        return Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.",
+                                    category=self.category)
+
+    def upload(self, issue: Issue, content: bytes, name: str = "log.txt", client: Client = None):
+        return (client or self.client).post("/issue/%d/attachments/" % issue.pk,
+                                            {"file": SimpleUploadedFile(name, content)})
+
+    def stored_files(self) -> list:
+        return [name for _, _, names in os.walk(self.root) for name in names]
+
+    def test_upload(self):
+        """Test that the same content is stored once but charged to the category for every attachment."""
+        response = self.upload(self.issue, b"Traceback")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode())["size"], 9)
+        self.assertEqual(self.upload(self.create(), b"Traceback", "other.txt").status_code, 200)
+
+        self.assertEqual(Attachment.objects.count(), 2)
+        self.assertEqual(AttachmentBlob.objects.count(), 1)
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(Attachment.objects.first().content_type, "text/plain")
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.attachment_usage, 18)
+
+        response = self.client.get("/issue/%d/" % self.issue.pk)
+        self.assertEqual([attachment.name for attachment in response.context["attachments"]], ["log.txt"])
+
+    def test_archive(self):
+        """Test that archived issue keeps its attachments, labels and dependencies."""
+        self.upload(self.issue, b"Traceback")
+        self.issue.labels.add(Label.objects.create(name="bug"))
+        blocked = self.create()
+        add_dependency(self.issue, blocked)
+        Issue.objects.filter(pk=self.issue.pk).mark_canceled()
+        Issue.objects.filter(pk=self.issue.pk).update(updated_at=get_cutoff() - timedelta(days=1))
+        Notification.objects.update(sent_at=timezone.now())
+        self.assertEqual(archive_issues(), 1)
+        delete_unused_blobs()
+
+        attachment = Attachment.objects.get()
+        self.assertEqual((attachment.issue_id, attachment.archived_issue_id), (None, self.issue.pk))
+        self.assertEqual(len(self.stored_files()), 1)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.attachment_usage, 9)
+        self.assertEqual(recount_usage(), 0)
+        self.assertEqual(b"".join(self.client.get("/attachment/%d/" % attachment.pk).streaming_content),
+                         b"Traceback")
+        self.assertEqual(self.client.post("/attachment/delete/%d/" % attachment.pk).status_code, 404)
+
+        response = self.client.get("/issue/%d/" % self.issue.pk)
+        self.assertTrue(response.context["archived"])
+        self.assertEqual([attachment.name for attachment in response.context["attachments"]], ["log.txt"])
+        self.assertEqual([label.name for label in response.context["labels"]], ["bug"])
+        self.assertEqual(response.context["downstream"], [blocked])
+        self.assertEqual(response.context["upstream"], [])
+
+    def test_limits(self):
+        """Test that too large files and files exceeding the quota of the category are rejected."""
+        IssueCategory.objects.filter(pk=self.category.pk).update(attachment_max_size=10, attachment_quota=15)
+        self.assertEqual(self.upload(self.issue, b"x" * 11).status_code, 413)
+        self.assertEqual(self.upload(self.issue, b"x" * 10).status_code, 200)
+        response = self.upload(self.issue, b"y" * 10)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(b"quota", response.content)
+        self.assertEqual(Attachment.objects.count(), 1)
+        self.assertEqual(self.stored_files(), [AttachmentBlob.objects.get().sha256])
+
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.test_user_1)
+        self.assertEqual(self.upload(self.issue, b"x", client=client).status_code, 403)
+
+    def test_download(self):
+        """Test conditional and range requests of the download."""
+        self.upload(self.issue, b"0123456789")
+        url = "/attachment/%d/" % Attachment.objects.get().pk
+
+        response = self.client.get(url)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["Content-Disposition"].startswith("inline"))
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(url, HTTP_RANGE="bytes=2-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        response = self.client.get(url, HTTP_RANGE="bytes=-3", HTTP_IF_RANGE=etag)
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+        response = self.client.get(url, HTTP_RANGE="bytes=-3", HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=5-", 10), (5, 9))
+        self.assertEqual(parse_range("bytes=5-100", 10), (5, 9))
+        self.assertEqual(parse_range("bytes=-100", 10), (0, 9))
+        self.assertIsNone(parse_range("bytes=0-1,3-4", 10))
+        self.assertIsNone(parse_range("bytes=4-3", 10))
+        self.assertIsNone(parse_range(None, 10))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=-0", 10)
+
+    def test_delete(self):
+        """Test that deleting attachments releases the quota and deletes unused files only."""
+        other = self.create()
+        self.upload(self.issue, b"Traceback")
+        self.upload(other, b"Traceback")
+
+        response = self.client.post("/attachment/delete/%d/" % Attachment.objects.get(issue=self.issue).pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.stored_files()), 1)
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.attachment_usage, 9)
+
+        Issue.objects.filter(pk=other.pk).soft_delete()
+        self.assertEqual(self.client.get("/attachment/%d/" % Attachment.objects.get().pk).status_code, 404)
+        purge_deleted_issues()
+        self.assertFalse(Attachment.objects.exists())
+        self.assertFalse(AttachmentBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.attachment_usage, 0)
+
+    def test_delete_batches(self):
+        """Test that every batch deletes its own files when the batches commit together."""
+        self.upload(self.issue, b"Traceback")
+        self.upload(self.issue, b"Segfault")
+        Attachment.objects.all().delete()
+        self.assertEqual(len(self.stored_files()), 2)
+        with transaction.atomic():
+            self.assertEqual(delete_unused_blobs(batch_size=1), 2)
+        self.assertEqual(self.stored_files(), [])
+
+
+class LabelTestCase(TestCase):
+    def setUp(self):
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+        self.bug, self.backend, self.wontfix = [
+            Label.objects.create(name=name) for name in ("bug", "backend", "wontfix")]
+
+    def create(self, *labels: Label) -> Issue:
+        issue = Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.")
+        issue.labels.add(*labels)
+        return issue
+
+    def pks(self, expression: str, state: str = ISSUE_CREATED) -> set:
+        bitmap = filter_by_labels(expression)[state]
+        return {(number << 16) + position for number, bits in bitmap.items()
+                for position in range(bits.bit_length()) if bits >> position & 1}
+
+    def test_parse(self):
+        """Test precedence of the operators and errors of invalid filters."""
+        self.assertEqual(parse("a OR b AND NOT c"),
+                         ("or", ("label", "a"), ("and", ("label", "b"), ("not", ("label", "c")))))
+        self.assertEqual(parse('(a or b) and "c d"'), ("and", ("or", ("label", "a"), ("label", "b")), ("label", "c d")))
+        for expression in ("a AND", "(a OR b", "a b", "NOT", 'a AND "b', ")"):
+            with self.assertRaises(ValueError):
+                parse(expression)
+
+    def test_filter(self):
+        """Test that the filter finds the matching issues and their numbers by state."""
+        first = self.create(self.bug, self.backend)
+        self.create(self.bug, self.backend, self.wontfix)
+        self.create(self.bug)
+        done = self.create(self.bug, self.backend)
+        Issue.objects.filter(pk=done.pk).mark_done()
+
+        self.assertEqual(self.pks("bug AND backend AND NOT wontfix"), {first.pk})
+        self.assertEqual(self.pks("bug AND backend AND NOT wontfix", ISSUE_DONE), {done.pk})
+        self.assertEqual(self.pks("backend AND NOT bug OR unknown"), set())
+        counts = {state: popcount(bitmap) for state, bitmap in filter_by_labels("bug").items()}
+        self.assertEqual(counts, {ISSUE_CREATED: 3, ISSUE_ASSIGNED: 0, ISSUE_DONE: 1, ISSUE_CANCELED: 0})
+
+    def test_index(self):
+        """Test that the bitmaps follow label, state and delete changes."""
+        first, second = self.create(self.bug), self.create(self.bug, self.backend)
+        self.assertEqual(self.pks("bug"), {first.pk, second.pk})
+
+        second.labels.remove(self.bug)
+        self.assertEqual(self.pks("bug"), {first.pk})
+        self.backend.issues.add(first)
+        self.assertEqual(self.pks("backend"), {first.pk, second.pk})
+        first.labels.clear()
+        self.assertEqual(self.pks("backend OR bug"), {second.pk})
+
+        second.state = ISSUE_CANCELED
+        second.save()
+        self.assertEqual(self.pks("backend"), set())
+        self.assertEqual(self.pks("backend", ISSUE_CANCELED), {second.pk})
+
+        third, fourth = self.create(self.bug), self.create(self.bug)
+        Issue.objects.filter(pk=third.pk).soft_delete()
+        fourth.delete()
+        self.assertEqual(self.pks("bug"), set())
+        wontfix_key = label_key(self.wontfix.pk)
+        self.wontfix.delete()
+        self.assertFalse(IssueBitmap.objects.filter(key=wontfix_key).exists())
+        self.assertEqual(reconcile_bitmaps(), 0)
+
+    def test_reconcile(self):
+        """Test that bitmaps changed bypassing the signals are fixed."""
+        issue = self.create(self.bug)
+        Issue.labels.through.objects.create(issue=issue, label=self.backend)
+        IssueBitmapChunk.objects.filter(bitmap__key=state_key(ISSUE_CREATED)).delete()
+        self.assertEqual(self.pks("backend"), set())
+
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("Fixed 2 label bitmaps.", out.getvalue())
+        self.assertEqual(self.pks("backend"), {issue.pk})
+        self.assertEqual(load_bitmaps([label_key(self.bug.pk)])[label_key(self.bug.pk)],
+                         {issue.pk >> 16: 1 << (issue.pk & 0xffff)})
+
+    def test_list(self):
+        """Test that the filtered list is paginated over the bitmap and invalid filters are shown."""
+        issues = [self.create(self.bug) for _ in range(60)]
+        self.create(self.backend)
+
+        with self.assertNumQueries(11):
+            response = self.client.get("/", {"labels": "bug", "page": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([issue.pk for issue in response.context["object_list"]], [issue.pk for issue in issues[50:]])
+        self.assertEqual(response.context["total"], 60)
+        self.assertContains(response, "labels=bug&amp;page=1")
+
+        response = self.client.get("/", {"labels": "bug AND (backend"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["label_error"])
+        self.assertEqual(response.context["total"], 61)
+
+    def test_edit(self):
+        """Test that labels are added and removed on the detail page and set on creation."""
+        issue = self.create()
+        response = self.client.post("/issue/%d/labels/" % issue.pk, {"label": "frontend"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"labels": ["frontend"]})
+        self.assertEqual(self.pks("frontend"), {issue.pk})
+        self.assertEqual(self.client.post("/issue/%d/labels/" % issue.pk, {"label": "a b"}).status_code, 400)
+        response = self.client.post("/issue/%d/labels/" % issue.pk, {"label": "frontend", "remove": "1"})
+        self.assertEqual(response.json(), {"labels": []})
+
+        response = self.client.post("/issue/create/", {
+            "name": "Labeled", "description": "Test description.", "labels": [self.bug.pk, self.backend.pk],
+            "confirm": "1"})
+        self.assertEqual(response.status_code, 302)
+        created = Issue.objects.get(name="Labeled")
+        self.assertEqual(set(created.labels.all()), {self.bug, self.backend})
+        self.assertEqual(self.pks("bug AND backend"), {created.pk})
+        self.assertContains(self.client.get("/issue/%d/" % created.pk), "backend")
+
+
+class SLATestCase(TestCase):
+    def setUp(self):
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b", email="b@example.com")
+        self.category = IssueCategory.objects.create(name="Support")
+        self.policy = SLAPolicy.objects.create(
+            category=self.category, response_time=timedelta(hours=1), resolution_time=timedelta(days=1))
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def create(self, **kwargs) -> Issue:
+        return Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.",
+                                    category=self.category, **kwargs)
+
+    def test_schedule(self):
+        """Test that the deadline follows the state, the category and the policy."""
+        issue = self.create()
+        self.assertEqual(issue.due_at, issue.created_at + timedelta(hours=1))
+        issue.solver = self.test_user_2
+        issue.save()
+        issue.refresh_from_db()
+        self.assertEqual(issue.due_at, issue.created_at + timedelta(days=1))
+
+        self.policy.resolution_time = timedelta(days=2)
+        self.policy.save()
+        issue.refresh_from_db()
+        self.assertEqual(issue.due_at, issue.created_at + timedelta(days=2))
+
+        Issue.objects.filter(pk=issue.pk).mark_done()
+        issue.refresh_from_db()
+        self.assertIsNone(issue.due_at)
+
+        other = self.create()
+        other.category = None
+        other.save()
+        self.assertIsNone(Issue.objects.get(pk=other.pk).due_at)
+        third = self.create()
+        self.category.delete()
+        self.assertIsNone(Issue.objects.get(pk=third.pk).due_at)
+
+    def test_scan(self):
+        """Test that missed deadlines are escalated once from an index range and counted in the statistics."""
+        late, assigned = self.create(), self.create(solver=self.test_user_1)
+        self.create()
+        # unassigned issues are escalated to the solvers of the category
+        self.category.solvers.add(self.test_user_2)
+        Issue.objects.filter(pk=assigned.pk).update(created_at=timezone.now() - timedelta(days=2))
+        Issue.objects.filter(pk__in=[late.pk, assigned.pk]).update(due_at=timezone.now() - timedelta(minutes=1))
+
+        queryset = Issue.objects.filter(sla_escalated_at__isnull=True, due_at__lte=timezone.now()).order_by("due_at")
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            self.assertIn("tracker_iss_sla_esc_a443d1_idx", " ".join(str(row) for row in cursor.fetchall()))
+
+        with self.assertNumQueries(14):
+            self.assertEqual(scan_sla(batch_size=1), 2)
+        self.assertEqual(scan_sla(), 0)
+        self.assertEqual(sorted(Notification.objects.filter(kind=NOTIFICATION_SLA).values_list(
+            "issue_id", "recipient__username")), [(late.pk, "user_b"), (assigned.pk, "user_a")])
+
+        response = self.client.get("/")
+        self.assertEqual((response.context["breached"], response.context["overdue"]), (2, 2))
+        Issue.objects.filter(pk=assigned.pk).mark_canceled()
+        self.assertEqual(completion_stats()["overdue"], 1)
+        self.assertEqual(completion_stats()["breached"], 2)
+        archive_issues(timezone.now() + timedelta(seconds=1))
+        self.assertEqual(completion_stats()["breached"], 2)
+
+        mail.outbox = []
+        send_digests(timezone.now() + timedelta(seconds=settings.TRACKER_NOTIFICATION_WINDOW + 1))
+        self.assertIn("missed its SLA deadline", mail.outbox[0].body)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("scan_sla", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Escalated 0 issues.")
+
+
+class SavedFilterTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.test_user_1 = User.objects.create(username="user_a", is_superuser=True)
+        self.test_user_2 = User.objects.create(username="user_b")
+        self.backend, self.frontend = IssueCategory.objects.create(name="Backend"), \
+            IssueCategory.objects.create(name="Frontend")
+
+        self.client = Client()
+        self.client.force_login(self.test_user_1)
+
+    def create(self, **kwargs) -> Issue:
+        return Issue.objects.create(name="Test", created_by=self.test_user_1, description="Test description.",
+                                    **kwargs)
+
+    def cached(self, query: str) -> bool:
+        return cache.get(cache_key(query, timezone.localdate())) is not None
+
+    def test_canonical(self):
+        """Test that equal conditions have the same text and invalid ones are rejected."""
+        self.assertEqual(canonical_query({"state": [ISSUE_DONE, ISSUE_ASSIGNED, ISSUE_DONE], "solver": "2"}),
+                         canonical_query({"solver": 2, "state": [ISSUE_ASSIGNED, ISSUE_DONE]}))
+        for conditions in ({"state": []}, {"state": ["xxx"]}, {"created_days": 0}, {"labels": "bug"}):
+            with self.assertRaises(ValueError):
+                canonical_query(conditions)
+
+    def test_invalidate(self):
+        """Test that an issue change drops only cached results of filters it matches."""
+        mine = canonical_query({"state": [ISSUE_ASSIGNED], "solver": self.test_user_2.pk})
+        backend = canonical_query({"category": self.backend.pk, "created_days": 7})
+        for name, query in (("Mine", mine), ("Backend", backend)):
+            SavedFilter.objects.create(user=self.test_user_1, name=name, query=query)
+        issue = self.create(category=self.backend)
+        self.create(category=self.frontend)
+        self.assertEqual({query: result["count"] for query, result in get_results(
+            Issue.objects.all(), [mine, backend], 50).items()}, {mine: 0, backend: 1})
+
+        other = self.create(category=self.frontend, solver=self.test_user_1)
+        Issue.objects.filter(pk=other.pk).mark_canceled()
+        issue.name = "Renamed"
+        issue.save()
+        self.assertTrue(self.cached(mine))
+        self.assertTrue(self.cached(backend))
+
+        Issue.objects.filter(pk=issue.pk).assign(self.test_user_2)
+        self.assertFalse(self.cached(mine))
+        self.assertFalse(self.cached(backend))
+        self.assertEqual(get_results(Issue.objects.all(), [mine], 50)[mine], {"count": 1, "ids": [issue.pk]})
+
+        self.create(category=self.frontend)
+        self.assertTrue(self.cached(mine))
+        with transaction.atomic():
+            Issue.objects.filter(pk=issue.pk).soft_delete()
+            self.assertTrue(self.cached(mine))
+        self.assertFalse(self.cached(mine))
+
+    def test_list(self):
+        """Test that saved filters are shown as tabs and their first page is read from the cache."""
+        issues = [self.create(solver=self.test_user_1) for _ in range(3)]
+        self.create(solver=self.test_user_2)
+
+        response = self.client.post("/filters/", {"name": "Mine", "state": [ISSUE_ASSIGNED], "solver": "me"})
+        saved = SavedFilter.objects.get()
+        self.assertRedirects(response, "/?filter=%d" % saved.pk)
+        self.assertEqual(saved.query, canonical_query({"state": [ISSUE_ASSIGNED], "solver": self.test_user_1.pk}))
+
+        response = self.client.get("/", {"filter": saved.pk})
+        self.assertEqual(response.context["saved_filters"], [(saved, 3)])
+        self.assertEqual([issue.pk for issue in response.context["object_list"]], [issue.pk for issue in issues])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/", {"filter": saved.pk})
+        self.assertFalse([query for query in queries.captured_queries if "COUNT(*)" in query["sql"]])
+
+        other = SavedFilter.objects.create(user=self.test_user_2, name="Other", query=canonical_query({}))
+        self.assertEqual(self.client.get("/", {"filter": other.pk}).context["saved_filter"], None)
+        self.assertEqual(self.client.post("/filters/delete/%d/" % other.pk).status_code, 404)
+        self.client.post("/filters/delete/%d/" % saved.pk)
+        self.assertEqual(list(SavedFilter.objects.all()), [other])
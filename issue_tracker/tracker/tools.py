@@ -1,12 +1,22 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
 from functools import reduce
-from typing import Callable, Dict, List, Optional, Union
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 from django.core.exceptions import ImproperlyConfigured
-from django.db import models
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
 from django.db.models import Q, QuerySet
+from django.db.models.expressions import BaseExpression
 from django.forms import forms
-from django.http import HttpResponse, HttpResponseForbidden, HttpResponseRedirect, JsonResponse
+from django.http import (
+    HttpResponse, HttpResponseForbidden, HttpResponseRedirect, StreamingHttpResponse)
+from django.utils.functional import cached_property
 from django.views import View
+from django.views.decorators.http import condition
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.edit import DeleteView, FormMixin
 
@@ -186,13 +196,22 @@ class BootstrapEditableView(FormMixin, SingleObjectMixin, View):
 
 
 class AjaxBootstrapSelectView(View):
-    """Return JSON data from search for Ajax-Bootstrap-Select."""
+    """Return JSON data from search for Ajax-Bootstrap-Select.
+
+    Only the columns in `projection` are fetched from the database, e.g.:
+      {"ID": "pk", "Name": Concat("first_name", Value(" "), "last_name")}
+    Keys are the keys in the JSON objects, values are model fields or expressions computed
+    by the database. Results longer than `stream_threshold` are streamed in chunks.
+    """
 
     # names to be compatible with SingleObjectMixin
     search_model = None
     search_queryset = None
     field = "name"
     enable_empty_requests = False
+    projection: Optional[Dict[str, Union[str, BaseExpression]]] = None
+    stream_threshold = 1000
+    stream_chunk_size = 1000
 
     def get_query(self) -> Q:
         """Return query used for looking for object."""
@@ -242,16 +261,53 @@ class AjaxBootstrapSelectView(View):
                 )
         return self.search_queryset.all()
 
-    def prepare_json_list(self, obj_list) -> List[Dict[str, str]]:
-        """Create list of dicts for json."""
-        return [{"ID": obj.pk, "Name": getattr(obj, self.get_field())}
-                for obj in obj_list]
+    def get_projection(self) -> Dict[str, Union[str, BaseExpression]]:
+        """Return self.projection, by default the primary key and self.field."""
+        if self.projection is None:
+            return OrderedDict([("ID", "pk"), ("Name", self.get_field())])
+        return self.projection
+
+    def project(self, queryset: QuerySet) -> QuerySet:
+        """Return queryset of tuples with values of the projected fields."""
+        annotations = {}
+        columns = []
+        for i, value in enumerate(self.get_projection().values()):
+            if isinstance(value, str):
+                columns.append(value)
+            else:
+                annotations["projection_%d" % i] = value
+                columns.append("projection_%d" % i)
+        return queryset.annotate(**annotations).values_list(*columns)
+
+    @staticmethod
+    def encode(keys: List[str], rows: Iterable[tuple]) -> str:
+        """Encode rows as JSON list of objects."""
+        return json.dumps([dict(zip(keys, row)) for row in rows], cls=DjangoJSONEncoder)
+
+    def stream(self, keys: List[str], rows: Iterator[tuple]) -> Iterator[str]:
+        """Encode rows as JSON list of objects chunk by chunk."""
+        yield "["
+        separator = ""
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                break
+            yield separator + self.encode(keys, chunk)[1:-1]
+            separator = ", "
+        yield "]"
 
-    def post(self, request, *args, **kwargs) -> JsonResponse:
+    def post(self, request, *args, **kwargs) -> HttpResponse:
         """Handle POST requests."""
         objects = self.get_objects()
-        json_list = self.prepare_json_list(objects)
-        return JsonResponse(json_list, safe=False)
+        keys = list(self.get_projection())
+        if not isinstance(objects, QuerySet):
+            return HttpResponse(self.encode(keys, []), content_type="application/json")
+
+        rows = self.project(objects).iterator(chunk_size=self.stream_chunk_size)
+        head = list(islice(rows, self.stream_threshold + 1))
+        if len(head) <= self.stream_threshold:
+            return HttpResponse(self.encode(keys, head), content_type="application/json")
+        return StreamingHttpResponse(self.stream(keys, chain(head, rows)), content_type="application/json")
 
 
 class DeleteRedirectView(DeleteView):
@@ -260,3 +316,50 @@ class DeleteRedirectView(DeleteView):
     def get(self, request, *args, **kwargs) -> Union[HttpResponseRedirect, HttpResponseForbidden]:
         """Overwrite get method to skip confirmation."""
         return self.delete(request, *args, **kwargs)
+
+
+class ConditionalGetMixin(object):
+    """Answer conditional requests with 304 Not Modified without rendering the response.
+
+    Override `get_etag` and/or `get_last_modified` with a cheap lookup of the content version.
+    """
+
+    def get_etag(self, request, *args, **kwargs) -> Optional[str]:
+        """Return ETag of the response or None."""
+        return None
+
+    def get_last_modified(self, request, *args, **kwargs) -> Optional[datetime]:
+        """Return last modification time of the response or None."""
+        return None
+
+    def dispatch(self, request, *args, **kwargs) -> HttpResponse:
+        """Wrap the view in the condition decorator."""
+        view = condition(etag_func=self.get_etag, last_modified_func=self.get_last_modified)(super().dispatch)
+        return view(request, *args, **kwargs)
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Return number of rows of the queryset estimated by the PostgreSQL planner."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator which doesn't count large querysets on PostgreSQL, the planner's estimate is used instead.
+
+    Results estimated to have less than `exact_threshold` rows are counted exactly.
+    """
+    exact_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet) and connections[self.object_list.db].vendor == "postgresql":
+            estimate = estimate_count(self.object_list)
+            if estimate >= self.exact_threshold:
+                return estimate
+        return super().count
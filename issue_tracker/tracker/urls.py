@@ -1,8 +1,10 @@
 from django.contrib.auth import views as auth_views
 from django.urls import path
 
-from .views import (CancelIssueView, CreateIssueView, DeleteIssueView, DetailIssueView, DoneIssueView, EditIssueView,
-                    ListIssueView, UnassignedIssueView, UserSelectView)
+from .views import (AttachmentView, BulkDeleteIssueView, CancelIssueView, CreateIssueView, DeleteAttachmentView,
+                    DeleteFilterView, DeleteIssueView, DetailIssueView, DoneIssueView, EditIssueView,
+                    IssueDependenciesView, IssueEventsView, IssueLabelsView, ListIssueView, SaveFilterView,
+                    SimilarIssuesView, UnassignedIssueView, UploadAttachmentView, UserSelectView)
 
 urlpatterns = [
     path('accounts/login/', auth_views.login,
@@ -15,11 +17,21 @@ urlpatterns = [
     path('', ListIssueView.as_view(), name="issues-list"),
     path('issue/create/', CreateIssueView.as_view(), name="issue-create"),
     path('issue/<int:pk>/', DetailIssueView.as_view(), name='issue-detail'),
+    path('issue/<int:pk>/dependencies/', IssueDependenciesView.as_view(), name='issue-dependencies'),
+    path('issue/<int:pk>/labels/', IssueLabelsView.as_view(), name='issue-labels'),
+    path('issue/<int:pk>/attachments/', UploadAttachmentView.as_view(), name='issue-attachments'),
+    path('attachment/<int:pk>/', AttachmentView.as_view(), name='attachment'),
+    path('attachment/delete/<int:pk>/', DeleteAttachmentView.as_view(), name='attachment-delete'),
     path('issue/edit/<int:pk>/', EditIssueView.as_view(), name="issue-edit"),
     path('issue/delete/<int:pk>/', DeleteIssueView.as_view(), name="issue-delete"),
+    path('issue/delete/', BulkDeleteIssueView.as_view(), name="issues-delete"),
     path('issue/cancel/<int:pk>/', CancelIssueView.as_view(), name="issue-cancel"),
     path('issue/unassign/<int:pk>/', UnassignedIssueView.as_view(), name="issue-unassign"),
     path('issue/done/<int:pk>/', DoneIssueView.as_view(), name="issue-done"),
+    path('issue/similar/', SimilarIssuesView.as_view(), name="issues-similar"),
+    path('issue/events/', IssueEventsView.as_view(), name="issue-events"),
     path('users/', UserSelectView.as_view(), name="user-select"),
+    path('filters/', SaveFilterView.as_view(), name="filter-save"),
+    path('filters/delete/<int:pk>/', DeleteFilterView.as_view(), name="filter-delete"),
 
 ]
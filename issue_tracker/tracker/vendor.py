@@ -0,0 +1,55 @@
+"""Third party assets used by the templates.
+
+Each asset is loaded from its CDN unless `TRACKER_VENDOR_STATIC` is enabled, then the copy
+downloaded by `manage.py vendor_static` into `tracker/static/tracker/vendor/` is used.
+"""
+import os
+from collections import OrderedDict
+
+from django.conf import settings
+
+VENDOR_STATIC_PREFIX = "tracker/vendor/"
+VENDOR_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "tracker", "vendor")
+
+BOOTSTRAP = "https://maxcdn.bootstrapcdn.com/bootstrap/3.3.4/"
+FONT_AWESOME = "https://maxcdn.bootstrapcdn.com/font-awesome/4.4.0/"
+X_EDITABLE = "https://cdnjs.cloudflare.com/ajax/libs/x-editable/"
+BOOTSTRAP_SELECT = "https://cdnjs.cloudflare.com/ajax/libs/bootstrap-select/1.7.3/"
+
+VENDOR_ASSETS = OrderedDict([
+    ("bootstrap/css/bootstrap.min.css", BOOTSTRAP + "css/bootstrap.min.css"),
+    ("bootstrap/js/bootstrap.min.js", BOOTSTRAP + "js/bootstrap.min.js"),
+    ("bootstrap/fonts/glyphicons-halflings-regular.eot", BOOTSTRAP + "fonts/glyphicons-halflings-regular.eot"),
+    ("bootstrap/fonts/glyphicons-halflings-regular.svg", BOOTSTRAP + "fonts/glyphicons-halflings-regular.svg"),
+    ("bootstrap/fonts/glyphicons-halflings-regular.ttf", BOOTSTRAP + "fonts/glyphicons-halflings-regular.ttf"),
+    ("bootstrap/fonts/glyphicons-halflings-regular.woff", BOOTSTRAP + "fonts/glyphicons-halflings-regular.woff"),
+    ("bootstrap/fonts/glyphicons-halflings-regular.woff2", BOOTSTRAP + "fonts/glyphicons-halflings-regular.woff2"),
+    ("font-awesome/css/font-awesome.min.css", FONT_AWESOME + "css/font-awesome.min.css"),
+    ("font-awesome/fonts/FontAwesome.otf", FONT_AWESOME + "fonts/FontAwesome.otf"),
+    ("font-awesome/fonts/fontawesome-webfont.eot", FONT_AWESOME + "fonts/fontawesome-webfont.eot"),
+    ("font-awesome/fonts/fontawesome-webfont.svg", FONT_AWESOME + "fonts/fontawesome-webfont.svg"),
+    ("font-awesome/fonts/fontawesome-webfont.ttf", FONT_AWESOME + "fonts/fontawesome-webfont.ttf"),
+    ("font-awesome/fonts/fontawesome-webfont.woff", FONT_AWESOME + "fonts/fontawesome-webfont.woff"),
+    ("font-awesome/fonts/fontawesome-webfont.woff2", FONT_AWESOME + "fonts/fontawesome-webfont.woff2"),
+    ("x-editable/css/bootstrap-editable.css", X_EDITABLE + "1.5.0/bootstrap3-editable/css/bootstrap-editable.css"),
+    ("x-editable/img/loading.gif", X_EDITABLE + "1.5.0/bootstrap3-editable/img/loading.gif"),
+    ("x-editable/img/clear.png", X_EDITABLE + "1.5.0/bootstrap3-editable/img/clear.png"),
+    ("x-editable/js/bootstrap-editable.min.js",
+     X_EDITABLE + "1.5.1/bootstrap3-editable/js/bootstrap-editable.min.js"),
+    ("bootstrap-select/css/bootstrap-select.min.css", BOOTSTRAP_SELECT + "css/bootstrap-select.min.css"),
+    ("bootstrap-select/js/bootstrap-select.min.js", BOOTSTRAP_SELECT + "js/bootstrap-select.min.js"),
+    ("jquery/jquery.min.js", "https://ajax.googleapis.com/ajax/libs/jquery/2.1.4/jquery.min.js"),
+    ("js-cookie/js.cookie.min.js", "https://cdnjs.cloudflare.com/ajax/libs/js-cookie/2.1.2/js.cookie.min.js"),
+    ("html5shiv/html5shiv.min.js", "https://oss.maxcdn.com/html5shiv/3.7.2/html5shiv.min.js"),
+    ("respond/respond.min.js", "https://oss.maxcdn.com/respond/1.4.2/respond.min.js"),
+])
+
+
+def use_vendor_static() -> bool:
+    """Return True when the vendored copies should be used instead of CDNs."""
+    return getattr(settings, "TRACKER_VENDOR_STATIC", False)
+
+
+def missing_vendor_assets() -> list:
+    """Return names of assets which were not downloaded yet."""
+    return [name for name in VENDOR_ASSETS if not os.path.exists(os.path.join(VENDOR_STATIC_DIR, name))]
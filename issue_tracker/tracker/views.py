@@ -1,41 +1,221 @@
-from typing import Dict, List
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+from urllib.parse import quote, urlencode
 
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib.auth.models import User
-from django.db.models import Avg, Max, Min, Q
-from django.http import HttpResponseRedirect
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.functions import Concat
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse)
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import filesizeformat
 from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext as _
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import CreateView, DetailView, ListView
 from django.views.generic.detail import SingleObjectMixin
 
-from .forms import IssueEditForm
-from .models import ISSUE_ASSIGNED, ISSUE_CANCELED, ISSUE_CREATED, ISSUE_DONE, Issue, IssueCategory
+from .archive import completion_stats
+from .attachments import (
+    FileRange, HashingUploadHandler, delete_attachment, get_max_size, get_storage, parse_range,
+    store_attachment)
+from .backends import PERMISSION_CACHE_NAMESPACE, USER_CACHE_NAMESPACE
+from .bitmaps import Bitmap, BitmapIssueList, filter_by_labels, popcount, union
+from .caching import get_version
+from .counters import get_counts
+from .dependencies import (
+    add_dependency, get_archived_graph, get_graph, remove_dependency, unblocked_by)
+from .events import event_bus, format_event
+from .forms import IssueEditForm, SavedFilterForm
+from .models import (
+    CATEGORY_CACHE_NAMESPACE, DEPENDENCY_CACHE_NAMESPACE, ISSUE_ASSIGNED, ISSUE_CACHE_NAMESPACE,
+    ISSUE_CANCELED, ISSUE_CREATED, ISSUE_DONE, ISSUE_STATE_CHOICES, SAVED_FILTER_CACHE_NAMESPACE,
+    ArchivedIssue, Attachment, Issue, IssueCategory, Label, SavedFilter)
+from .savedfilters import SavedFilterIssueList, get_results
+from .similarity import find_similar
 from .tools import (
-    AjaxBootstrapSelectView, BootstrapEditableView, DeleteRedirectView, and_merge_queries)
+    AjaxBootstrapSelectView, BootstrapEditableView, ConditionalGetMixin, DeleteRedirectView,
+    and_merge_queries, http_response_code)
 
 
-class ListIssueView(LoginRequiredMixin, ListView):
-    """List all the issues and add time statistics."""
+class IssueConditionalGetMixin(ConditionalGetMixin):
+    """Conditional responses for pages rendered from issues.
+
+    The pages depend on the user and their permissions and show category and user names, so all of
+    them are part of the ETag together with the version of the issues.
+    """
+
+    def get_issues_version(self) -> Optional[str]:
+        """Return version of the issues shown on the page or None if there is nothing to show.
+
+        Pages without a version are answered without ETag.
+        """
+        return None
+
+    def get_etag(self, request, *args, **kwargs) -> Optional[str]:
+        version = self.get_issues_version()
+        if version is None:
+            return None
+        return "%s-%d-%d-%d-%d-%d" % (
+            version, request.user.pk, request.user.is_superuser, get_version(PERMISSION_CACHE_NAMESPACE),
+            get_version(CATEGORY_CACHE_NAMESPACE), get_version(USER_CACHE_NAMESPACE))
+
+
+class ListIssueView(LoginRequiredMixin, IssueConditionalGetMixin, ListView):
+    """List the issues, optionally of one state given by GET parameter `state`, and add statistics.
+
+    GET parameter `labels` filters the issues by labels, e.g. `bug AND (backend OR api) AND NOT wontfix`,
+    the matching issues are read from the bitmap index of labels.
+    """
     model = Issue
+    paginate_by = 50
+
+    def get_state(self) -> Optional[str]:
+        state = self.request.GET.get("state")
+        return state if state in dict(ISSUE_STATE_CHOICES) else None
+
+    def get_label_filter(self) -> str:
+        return self.request.GET.get("labels", "").strip()
+
+    def get_label_bitmaps(self) -> Optional[Dict[str, Bitmap]]:
+        """Return bitmaps of the issues matching the label filter by state, None without a valid filter."""
+        if not hasattr(self, "_label_bitmaps"):
+            self._label_bitmaps, self.label_error = None, None
+            if self.get_label_filter():
+                try:
+                    self._label_bitmaps = filter_by_labels(self.get_label_filter())
+                except ValueError as e:
+                    self.label_error = str(e)
+        return self._label_bitmaps
+
+    def get_saved_filter(self) -> Optional[SavedFilter]:
+        """Return saved filter of the user with primary key from GET parameter `filter`."""
+        if not hasattr(self, "_saved_filter"):
+            pk = self.request.GET.get("filter", "")
+            self._saved_filter = self.request.user.saved_filters.filter(pk=pk).first() if pk.isdigit() else None
+        return self._saved_filter
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related("created_by", "solver", "category").prefetch_related(
+            "labels").order_by("pk")
+        if self.get_saved_filter() is not None:
+            return SavedFilterIssueList(queryset, self.get_saved_filter().query, self.paginate_by)
+        bitmaps = self.get_label_bitmaps()
+        if bitmaps is not None:
+            states = [self.get_state()] if self.get_state() is not None else list(bitmaps)
+            return BitmapIssueList(union(bitmaps[state] for state in states), queryset)
+        if self.get_state() is not None:
+            queryset = queryset.filter(state=self.get_state())
+        return queryset
+
+    def get_issues_version(self) -> Optional[str]:
+        """Use the version of all the issues, which is changed by every save, update and delete.
+
+        The numbers of issues in other states are shown too, so any change of any issue counts. Saved
+        filters of issues created in the last days change with the day.
+        """
+        return "%d-%d-%s" % (get_version(ISSUE_CACHE_NAMESPACE), get_version(SAVED_FILTER_CACHE_NAMESPACE),
+                             timezone.localdate())
 
     def get_context_data(self, *args, **kwargs) -> dict:
         context = super().get_context_data(*args, **kwargs)
-        numbers = Issue.objects.exclude(completed_in__isnull=True).aggregate(
-            Avg('completed_in'), Max('completed_in'), Min('completed_in'))
-        context["avg"] = numbers["completed_in__avg"]
-        context["min"] = numbers["completed_in__min"]
-        context["max"] = numbers["completed_in__max"]
+        context.update(completion_stats())
+        states, solvers = get_counts()
+        bitmaps = self.get_label_bitmaps()
+        if bitmaps is not None:
+            states = {state: popcount(bitmap) for state, bitmap in bitmaps.items()}
+        context["state"] = self.get_state()
+        context["total"] = sum(states.values())
+        context["states"] = [(state, label, states.get(state, 0)) for state, label in ISSUE_STATE_CHOICES]
+        context["labels"] = self.get_label_filter()
+        context["label_error"] = self.label_error
+        context["labels_query"] = urlencode({"labels": self.get_label_filter()}) if self.get_label_filter() else ""
+        query = self.request.GET.copy()
+        query.pop("page", None)
+        context["page_query"] = query.urlencode()
+        saved_filters = list(self.request.user.saved_filters.all())
+        results = get_results(Issue.objects.all(), [saved.query for saved in saved_filters], self.paginate_by)
+        context["saved_filters"] = [(saved, results[saved.query]["count"]) for saved in saved_filters]
+        context["saved_filter"] = self.get_saved_filter()
+        context["saved_filter_form"] = SavedFilterForm()
+        for issue in context["object_list"]:
+            issue.solver_open_issues = solvers.get(issue.solver_id, 0)
         return context
 
 
-class DetailIssueView(LoginRequiredMixin, DetailView):
-    """Show detail for one specific issue."""
+class SaveFilterView(LoginRequiredMixin, View):
+    """Save filter of the user from POST parameters, a filter with the same name is replaced."""
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        form = SavedFilterForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, _("The filter can't be saved: %s") % " ".join(
+                "%s: %s" % (field, " ".join(errors)) for field, errors in form.errors.items()))
+            return HttpResponseRedirect(reverse("issues-list"))
+        saved, _created = SavedFilter.objects.update_or_create(
+            user=request.user, name=form.cleaned_data["name"], defaults={"query": form.get_query(request.user)})
+        return HttpResponseRedirect("%s?filter=%d" % (reverse("issues-list"), saved.pk))
+
+
+class DeleteFilterView(LoginRequiredMixin, View):
+    """Delete saved filter of the user."""
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        get_object_or_404(request.user.saved_filters, pk=kwargs["pk"]).delete()
+        return HttpResponseRedirect(reverse("issues-list"))
+
+
+class DetailIssueView(LoginRequiredMixin, IssueConditionalGetMixin, DetailView):
+    """Show detail for one specific issue, archived issues are looked up in the archive."""
     model = Issue
+    template_name = "tracker/issue_detail.html"
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            if queryset is not None:
+                raise
+            return super().get_object(ArchivedIssue.objects.all())
+
+    def get_updated_at(self) -> Optional[datetime]:
+        """Return modification time of the issue without loading it."""
+        if not hasattr(self, "_updated_at"):
+            self._updated_at = None
+            for queryset in (self.get_queryset(), ArchivedIssue.objects.all()):
+                self._updated_at = queryset.filter(pk=self.kwargs["pk"]).values_list("updated_at", flat=True).first()
+                if self._updated_at is not None:
+                    break
+        return self._updated_at
+
+    def get_issues_version(self) -> Optional[str]:
+        """Dependencies show other issues, so any change of them changes the version too."""
+        updated_at = self.get_updated_at()
+        if updated_at is None:
+            return None
+        return "%s-%d" % (updated_at.timestamp(), get_version(DEPENDENCY_CACHE_NAMESPACE))
+
+    def get_last_modified(self, request, *args, **kwargs) -> Optional[datetime]:
+        return self.get_updated_at()
 
     def get_context_data(self, *args, **kwargs) -> dict:
         context = super().get_context_data(*args, **kwargs)
-        context["categories"] = [(c.pk, c.name) for c in IssueCategory.objects.all()]
+        context["archived"] = isinstance(self.object, ArchivedIssue)
+        if context["archived"]:
+            context.update(get_archived_graph(self.object))
+        else:
+            context["categories"] = [(c.pk, c.name) for c in IssueCategory.objects.all()]
+            context.update(get_graph(self.object))
+        context["attachments"] = list(self.object.attachments.all())
+        context["labels"] = list(self.object.labels.all())
         return context
 
 
@@ -53,6 +233,17 @@ class UserSelectView(LoginRequiredMixin, PermissionRequiredMixin, AjaxBootstrapS
     """Ajax lookup for users."""
     search_model = User
     permission_required = "tracker.change_issue"
+    # Name is computed by the database the same way as User.get_full_name() or username.
+    projection = OrderedDict([
+        ("ID", "pk"),
+        ("Name", Case(
+            When(first_name="", last_name="", then=F("username")),
+            When(first_name="", then=F("last_name")),
+            When(last_name="", then=F("first_name")),
+            default=Concat("first_name", Value(" "), "last_name"),
+            output_field=CharField())),
+        ("Username", "username"),
+    ])
 
     def get_query(self) -> Q:
         """Make query to look in user in first_name, last_name and username."""
@@ -63,32 +254,52 @@ class UserSelectView(LoginRequiredMixin, PermissionRequiredMixin, AjaxBootstrapS
                            Q(username__icontains=q))
         return and_merge_queries(queries)
 
-    def prepare_json_list(self, obj_list) -> List[Dict[str, str]]:
-        """Create list of dicts for json."""
-        return [{"ID": obj.pk, "Name": obj.get_full_name() or obj.username, "Username": obj.username} for obj in
-                obj_list]
-
 
 class CreateIssueView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     """Crate new issue."""
     permission_required = "tracker.create_issue"
     model = Issue
-    fields = ("name", "category", "description")
+    fields = ("name", "category", "labels", "description")
+
+    def form_valid(self, form) -> HttpResponse:
+        """If the form is valid, save the associated model.
 
-    def form_valid(self, form) -> HttpResponseRedirect:
-        """If the form is valid, save the associated model."""
+        When similar open issues exist the form is shown again with them, until the creation is confirmed.
+        """
+        if "confirm" not in self.request.POST:
+            similar = find_similar(form.cleaned_data["name"], form.cleaned_data["description"])
+            if similar:
+                return self.render_to_response(self.get_context_data(form=form, similar=similar))
         self.object = form.save(commit=False)
         self.object.created_by = self.request.user
         self.object.save()
+        form.save_m2m()
         return HttpResponseRedirect(self.get_success_url())
 
 
 class DeleteIssueView(LoginRequiredMixin, PermissionRequiredMixin, DeleteRedirectView):
-    """Delete issue."""
+    """Delete issue, the issue is hidden right away and purged in the background."""
     permission_required = "tracker.delete_issue"
     model = Issue
     success_url = reverse_lazy("issues-list")
 
+    def delete(self, request, *args, **kwargs) -> HttpResponseRedirect:
+        self.object = self.get_object()
+        Issue.objects.filter(pk=self.object.pk).soft_delete()
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class BulkDeleteIssueView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """Delete issues with primary keys from POST parameters `pk`, return number of the deleted issues."""
+    permission_required = "tracker.delete_issue"
+
+    def post(self, request, *args, **kwargs) -> JsonResponse:
+        try:
+            pks = [int(pk) for pk in request.POST.getlist("pk")]
+        except ValueError:
+            return http_response_code(400)
+        return JsonResponse({"deleted": Issue.objects.filter(pk__in=pks).soft_delete()})
+
 
 class UnassignedIssueView(LoginRequiredMixin, PermissionRequiredMixin, SingleObjectMixin, View):
     """Unassign solver from isssue."""
@@ -111,11 +322,17 @@ class DoneIssueView(LoginRequiredMixin, SingleObjectMixin, View):
     model = Issue
 
     def get(self, request, *args, **kwargs) -> HttpResponseRedirect:
-        self.object = self.get_object()
-        if self.object.state in [ISSUE_ASSIGNED, ISSUE_CREATED] and request.user.has_perm(
-                "tracker.change_issue") or request.user == self.object.solver:
-            self.object.state = ISSUE_DONE
-            self.object.save()
+        # the issue is locked, so a repeated or concurrent request sees the new state and does nothing
+        with transaction.atomic():
+            self.object = self.get_object(self.get_queryset().select_for_update())
+            if self.object.state in [ISSUE_ASSIGNED, ISSUE_CREATED] and (request.user.has_perm(
+                    "tracker.change_issue") or request.user == self.object.solver):
+                self.object.state = ISSUE_DONE
+                self.object.save()
+                unblocked = unblocked_by(self.object)
+                if unblocked:
+                    messages.info(request, _("Issues %s are not blocked anymore.") % ", ".join(
+                        str(issue) for issue in unblocked))
         return HttpResponseRedirect(reverse("issue-detail", args=[self.object.pk]))
 
 
@@ -124,9 +341,221 @@ class CancelIssueView(LoginRequiredMixin, SingleObjectMixin, View):
     model = Issue
 
     def get(self, request, *args, **kwargs) -> HttpResponseRedirect:
-        self.object = self.get_object()
-        if self.object.state not in [ISSUE_DONE, ISSUE_CANCELED] and request.user.has_perm(
-                "tracker.change_issue") or request.user == self.object.solver:
-            self.object.state = ISSUE_CANCELED
-            self.object.save()
+        with transaction.atomic():
+            self.object = self.get_object(self.get_queryset().select_for_update())
+            if self.object.state not in [ISSUE_DONE, ISSUE_CANCELED] and (request.user.has_perm(
+                    "tracker.change_issue") or request.user == self.object.solver):
+                self.object.state = ISSUE_CANCELED
+                self.object.save()
         return HttpResponseRedirect(reverse("issue-detail", args=[self.object.pk]))
+
+
+class IssueLabelsView(LoginRequiredMixin, PermissionRequiredMixin, SingleObjectMixin, View):
+    """Add label with name from POST parameter `label` to the issue, with `remove` it is removed.
+
+    New labels are created, return names of all labels of the issue.
+    """
+    permission_required = "tracker.change_issue"
+    model = Issue
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        self.object = self.get_object()
+        name = request.POST.get("label", "").strip()
+        if "remove" in request.POST:
+            self.object.labels.remove(*Label.objects.filter(name=name))
+        else:
+            label = Label.objects.filter(name=name).first() or Label(name=name)
+            try:
+                label.full_clean()
+            except ValidationError as e:
+                return http_response_code(400, " ".join(e.messages))
+            label.save()
+            self.object.labels.add(label)
+        return JsonResponse({"labels": [label.name for label in self.object.labels.all()]})
+
+
+class SimilarIssuesView(LoginRequiredMixin, View):
+    """Return open issues similar to GET parameters `name` and `description`, the most similar first."""
+    max_limit = 20
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        try:
+            limit = int(request.GET.get("limit", 5))
+            exclude = int(request.GET["exclude"]) if "exclude" in request.GET else None
+        except ValueError:
+            return http_response_code(400)
+        if limit < 1:
+            return http_response_code(400)
+        limit = min(limit, self.max_limit)
+        similar = find_similar(request.GET.get("name", ""), request.GET.get("description", ""), limit, exclude)
+        return JsonResponse({"issues": [{"id": issue.pk, "name": issue.name, "state": issue.state,
+                                         "similarity": round(issue.similarity, 2)} for issue in similar]})
+
+
+class IssueDependenciesView(LoginRequiredMixin, SingleObjectMixin, View):
+    """Return all issues the issue waits for and all issues waiting for it.
+
+    POST parameter `blocker` adds a blocker of the issue, with `remove` it is removed.
+    """
+    model = Issue
+
+    def get(self, request, *args, **kwargs) -> JsonResponse:
+        self.object = self.get_object()
+        graph = get_graph(self.object)
+        return JsonResponse({direction: [{"id": issue.pk, "name": issue.name, "state": issue.state,
+                                          "blocked": issue.blocked} for issue in issues]
+                             for direction, issues in graph.items()})
+
+    def post(self, request, *args, **kwargs) -> JsonResponse:
+        if not request.user.has_perm("tracker.change_issue"):
+            return http_response_code(403)
+        self.object = self.get_object()
+        try:
+            blocker = Issue.objects.get(pk=int(request.POST["blocker"]))
+        except (KeyError, ValueError, Issue.DoesNotExist):
+            return http_response_code(400, _("Unknown blocker."))
+        if "remove" in request.POST:
+            remove_dependency(blocker, self.object)
+        else:
+            try:
+                add_dependency(blocker, self.object)
+            except ValidationError as e:
+                return http_response_code(400, " ".join(e.messages))
+        return self.get(request, *args, **kwargs)
+
+
+class UploadAttachmentView(LoginRequiredMixin, SingleObjectMixin, View):
+    """Attach file from POST parameter `file` to the issue.
+
+    The upload is streamed to disk, so the upload handler is installed before the CSRF check reads the body.
+    """
+    model = Issue
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("category")
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs) -> HttpResponse:
+        return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        self.object = self.get_object()
+        if not request.user.has_perm("tracker.change_issue") and request.user != self.object.solver:
+            return http_response_code(403)
+        self.upload_handler = HashingUploadHandler(request, get_max_size(self.object.category))
+        request.upload_handlers = [self.upload_handler]
+        return self.upload(request)
+
+    @method_decorator(csrf_protect)
+    def upload(self, request) -> HttpResponse:
+        uploaded = request.FILES.get("file")  # the body is parsed here unless the CSRF check did it
+        if self.upload_handler.exceeded:
+            return http_response_code(413, _("The file is larger than %s.") % filesizeformat(
+                self.upload_handler.max_size))
+        if uploaded is None:
+            return http_response_code(400, _("No file was uploaded."))
+        try:
+            attachment = store_attachment(self.object, uploaded, request.user)
+        except ValidationError as e:
+            return http_response_code(400, " ".join(e.messages))
+        return JsonResponse({"id": attachment.pk, "name": attachment.name, "size": attachment.size,
+                             "url": reverse("attachment", args=[attachment.pk])})
+
+
+class AttachmentView(LoginRequiredMixin, ConditionalGetMixin, View):
+    """Download attachment, single byte ranges are supported.
+
+    Only images and plain text are shown in the browser, other files are always downloaded.
+    """
+    inline_content_types = ("image/png", "image/jpeg", "image/gif", "text/plain")
+
+    def get_attachment(self) -> Attachment:
+        if not hasattr(self, "attachment"):
+            self.attachment = get_object_or_404(
+                Attachment.objects.select_related("blob").filter(issue__deleted_at__isnull=True), pk=self.kwargs["pk"])
+        return self.attachment
+
+    def get_etag(self, request, *args, **kwargs) -> Optional[str]:
+        return self.get_attachment().blob.sha256
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        attachment, etag = self.get_attachment(), '"%s"' % self.get_attachment().blob.sha256
+        size = attachment.blob.size
+        byte_range = None
+        if request.META.get("HTTP_IF_RANGE", etag) == etag:
+            try:
+                byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+            except ValueError:
+                response = http_response_code(416)
+                response["Content-Range"] = "bytes */%d" % size
+                return response
+
+        file = get_storage().open(attachment.blob.file_name, "rb")
+        if byte_range is None:
+            response = FileResponse(file, content_type=attachment.content_type)
+            response["Content-Length"] = size
+        else:
+            first, last = byte_range
+            response = FileResponse(FileRange(file, first, last - first + 1), content_type=attachment.content_type)
+            response.status_code = 206
+            response["Content-Length"] = last - first + 1
+            response["Content-Range"] = "bytes %d-%d/%d" % (first, last, size)
+        response["Accept-Ranges"] = "bytes"
+        response["Cache-Control"] = "private, no-cache"
+        response["X-Content-Type-Options"] = "nosniff"
+        response["Content-Disposition"] = "%s; filename*=UTF-8''%s" % (
+            "inline" if attachment.content_type in self.inline_content_types else "attachment",
+            quote(attachment.name))
+        return response
+
+
+class DeleteAttachmentView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """Delete attachment, its file is deleted once no attachment has the same content."""
+    permission_required = "tracker.change_issue"
+
+    def post(self, request, *args, **kwargs) -> JsonResponse:
+        attachment = get_object_or_404(Attachment, pk=kwargs["pk"], issue__isnull=False)
+        delete_attachment(attachment)
+        return JsonResponse({"deleted": attachment.name})
+
+
+class IssueEventsView(LoginRequiredMixin, View):
+    """Stream changes of issues as server-sent events.
+
+    Optional GET parameter `issue` limits the stream to one issue. Every open stream holds only
+    a subscription queue, so many idle connections are cheap on an async (e.g. gevent) worker.
+    """
+    heartbeat = 20
+    retry = 5000
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        try:
+            issue = int(request.GET["issue"])
+        except (KeyError, ValueError):
+            issue = None
+        try:
+            last_event_id = int(request.META["HTTP_LAST_EVENT_ID"])
+        except (KeyError, ValueError):
+            last_event_id = None
+
+        response = StreamingHttpResponse(self.stream(last_event_id, issue), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def stream(self, last_event_id: Optional[int], issue: Optional[int]) -> Iterator[str]:
+        """Yield events until the client disconnects, comments keep the connection open.
+
+        The subscription is opened on the first iteration, so a response which is never sent holds none.
+        """
+        subscription = event_bus.subscribe(last_event_id)
+        try:
+            yield "retry: %d\n\n" % self.retry
+            while True:
+                event = subscription.get(timeout=self.heartbeat)
+                if event is None:
+                    yield ": heartbeat\n\n"
+                elif issue is None or event[1]["id"] == issue:
+                    yield format_event(event)
+        finally:
+            subscription.close()